@@ -0,0 +1,233 @@
+"""
+Quản lý tài nguyên game: ảnh và âm thanh.
+
+- Mỗi file chỉ được đọc một lần, giải mã trong thread pool (pygame nhả GIL khi
+  giải mã ảnh) để chạy song song với việc tìm camera và tạo cửa sổ.
+- Ảnh đã giải mã được lưu dạng pixel thô vào thư mục cache, lần chạy sau đọc
+  lại nhanh hơn giải mã PNG. Cache tự mất hiệu lực khi file gốc thay đổi.
+- Âm thanh chỉ được nạp (và mixer chỉ được khởi tạo) khi cần.
+- StartupProfiler đo thời gian và bộ nhớ (RSS) từng giai đoạn khởi động.
+"""
+
+# Import các thư viện cần thiết
+import os  # Đường dẫn và thông tin file
+import sys  # Kiểm tra các module đã nạp
+import json  # Ghi báo cáo khởi động dạng JSONL
+import struct  # Header của file cache
+import time  # Đo thời gian khởi động
+from concurrent.futures import ThreadPoolExecutor  # Thread pool giải mã
+from contextlib import contextmanager  # Đo thời gian theo khối lệnh
+import pygame  # Thư viện game chính
+
+# pygame >= 2.1.3 đổi tên tostring/fromstring thành tobytes/frombytes
+_tobytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+_frombytes = getattr(pygame.image, 'frombytes', None) or pygame.image.fromstring
+
+_CACHE_MAGIC = b'FBAC'
+_CACHE_HEADER = struct.Struct('<4sIIqq')  # magic, rộng, cao, mtime_ns, kích thước file gốc
+
+
+# Lớp AssetManager - đọc, giải mã và cache ảnh
+class AssetManager:
+    def __init__(self, cache_dir=None, workers=4):
+        self.cache_dir = cache_dir  # None = không dùng cache trên đĩa
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='assets')
+        self._decoded = {}  # đường dẫn -> Future (bề mặt thô, đọc từ cache hay không)
+        self._converted = {}  # (đường dẫn, alpha) -> bề mặt đã chuyển định dạng màn hình
+
+    def _cache_path(self, path):
+        name = path.replace('/', '_').replace('\\', '_')
+        return os.path.join(self.cache_dir, name + '.raw')
+
+    def _decode(self, path):
+        """
+        Giải mã một ảnh (chạy trong thread pool): dùng cache nếu còn khớp file gốc
+        """
+        st = os.stat(path)
+        if self.cache_dir is not None:
+            try:
+                with open(self._cache_path(path), 'rb') as f:
+                    data = f.read()
+                magic, w, h, mtime, size = _CACHE_HEADER.unpack_from(data)
+                if magic == _CACHE_MAGIC and mtime == st.st_mtime_ns and size == st.st_size:
+                    return _frombytes(data[_CACHE_HEADER.size:], (w, h), 'RGBA'), True
+            except (OSError, struct.error, ValueError):
+                pass  # Chưa có cache hoặc cache hỏng: giải mã lại
+        return pygame.image.load(path), False
+
+    def _write_cache(self, path, surface):
+        """
+        Lưu pixel thô của ảnh vào cache (chạy trong thread pool)
+        """
+        st = os.stat(path)
+        w, h = surface.get_size()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(path), 'wb') as f:
+                f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, w, h, st.st_mtime_ns, st.st_size))
+                f.write(_tobytes(surface, 'RGBA'))
+        except OSError as err:
+            print("[WARN] Không ghi được cache ảnh:", err)
+
+    def request(self, *paths):
+        """
+        Bắt đầu giải mã các ảnh trong nền (mỗi file chỉ một lần)
+        """
+        for path in paths:
+            if path not in self._decoded:
+                self._decoded[path] = self.executor.submit(self._decode, path)
+
+    def image(self, path, alpha=True):
+        """
+        Lấy ảnh đã chuyển sang định dạng màn hình (gọi ở luồng chính sau set_mode)
+        """
+        key = (path, alpha)
+        surface = self._converted.get(key)
+        if surface is None:
+            self.request(path)
+            raw, cached = self._decoded[path].result()
+            if self.cache_dir is not None and not cached:
+                self.executor.submit(self._write_cache, path, raw)
+            surface = raw.convert_alpha() if alpha else raw.convert()
+            self._converted[key] = surface
+        return surface
+
+
+# Lớp LazySounds - từ điển âm thanh chỉ nạp khi cần
+class LazySounds:
+    """
+    Dùng như dict {tên: pygame.mixer.Sound}. Mixer được khởi tạo và file được
+    nạp ở lần truy cập đầu tiên, hoặc trước đó trong nền qua preload_async().
+    """
+
+    def __init__(self, paths, executor=None):
+        self.paths = paths  # tên -> đường dẫn file
+        self.executor = executor
+        self._sounds = {}
+        self._futures = {}
+        self._mixer = None  # Future khởi tạo mixer
+
+    def _init_mixer(self):
+        if pygame.mixer.get_init() is None:
+            pygame.mixer.init()
+
+    def _load(self, name):
+        if self._mixer is not None:
+            self._mixer.result()  # Chờ mixer được khởi tạo trong nền
+        else:
+            self._init_mixer()
+        return pygame.mixer.Sound(self.paths[name])
+
+    def preload_async(self):
+        """
+        Khởi tạo mixer và nạp tất cả âm thanh trong thread pool
+        """
+        if self.executor is None or self._mixer is not None:
+            return
+        self._mixer = self.executor.submit(self._init_mixer)
+        for name in self.paths:
+            if name not in self._sounds and name not in self._futures:
+                self._futures[name] = self.executor.submit(self._load, name)
+
+    def __getitem__(self, name):
+        sound = self._sounds.get(name)
+        if sound is None:
+            future = self._futures.pop(name, None)
+            sound = future.result() if future is not None else self._load(name)
+            self._sounds[name] = sound
+        return sound
+
+    def __contains__(self, name):
+        return name in self.paths
+
+
+HEAVY_MODULES = ('numpy', 'cv2', 'mediapipe')  # Các thư viện nặng cần theo dõi khi khởi động
+
+
+def rss_mb():
+    """
+    Bộ nhớ thường trú (MB) hiện tại của tiến trình; đỉnh RSS nếu không đọc
+    được giá trị hiện tại, None nếu hệ điều hành không hỗ trợ
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # Chỉ có trên Unix
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10  # macOS: byte, Linux: KB
+    except ImportError:
+        return None
+
+
+# Lớp StartupProfiler - đo thời gian và bộ nhớ các giai đoạn khởi động
+class StartupProfiler:
+    def __init__(self, t0=None, enabled=False, export_path=None):
+        self.t0 = t0 if t0 is not None else time.perf_counter()  # Thời điểm bắt đầu chương trình
+        self.enabled = enabled  # In báo cáo khi finish() được gọi
+        self.export_path = export_path  # File JSONL, mỗi lần chạy thêm một dòng báo cáo
+        self.phases = []  # (tên giai đoạn, thời gian giây, RSS MB sau giai đoạn)
+        self._done = False
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Đo thời gian của một khối lệnh khởi động
+        """
+        t_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t_start)
+
+    def add(self, name, seconds):
+        """
+        Ghi một giai đoạn đã đo sẵn
+        """
+        self.phases.append((name, seconds, rss_mb()))
+
+    def note(self, name, seconds):
+        """
+        Ghi một giai đoạn chạy trong nền (ví dụ import MediaPipe); nếu báo cáo
+        đã in thì in riêng giai đoạn này
+        """
+        self.add(name, seconds)
+        if self._done and self.enabled:
+            print(f"[STARTUP] {name} (nền): {seconds*1000:.1f} ms, RSS {self._format_rss(self.phases[-1][2])}")
+
+    @staticmethod
+    def _format_rss(rss):
+        return f"{rss:.0f} MB" if rss is not None else "?"
+
+    def finish(self, label='khung hình đầu tiên'):
+        """
+        Đánh dấu kết thúc khởi động (chỉ lần đầu), in và ghi báo cáo nếu được bật
+        """
+        if self._done:
+            return
+        self._done = True
+        total = time.perf_counter() - self.t0
+        rss = rss_mb()
+        modules = [name for name in HEAVY_MODULES if name in sys.modules]
+        if self.export_path:
+            report = {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'phases': {name: round(seconds * 1000, 1) for name, seconds, _ in self.phases},
+                'total_ms': round(total * 1000, 1),
+                'rss_mb': round(rss, 1) if rss is not None else None,
+                'modules': modules,
+            }
+            try:
+                with open(self.export_path, 'a') as f:
+                    f.write(json.dumps(report) + '\n')
+            except OSError as err:
+                print("[WARN] Không ghi được báo cáo khởi động:", err)
+        if not self.enabled:
+            return
+        print("[STARTUP] Thời gian khởi động theo giai đoạn:")
+        for name, seconds, phase_rss in self.phases:
+            print(f"  {name:<30} {seconds*1000:8.1f} ms   RSS {self._format_rss(phase_rss):>7}")
+        print(f"  {'tổng đến ' + label:<30} {total*1000:8.1f} ms   RSS {self._format_rss(rss):>7}")
+        print(f"  Thư viện nặng đã nạp: {', '.join(modules) or 'không có'}")
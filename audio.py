@@ -0,0 +1,133 @@
+"""
+Phát âm thanh game với độ trễ thấp.
+
+- configure_mixer() đặt bộ đệm mixer nhỏ (pygame.mixer.pre_init) trước khi mixer
+  được khởi tạo; tần số trùng với file trong gallery/audio nên không phải
+  chuyển mẫu khi nạp.
+- AudioEngine nhận sự kiện âm thanh từ vòng lặp game qua hàng đợi không chặn
+  (play() chỉ đưa tên vào hàng đợi). Luồng nền của nó khởi tạo mixer, nạp sẵn
+  mọi âm thanh (pygame.mixer.Sound giải mã cả file khi nạp, lúc phát không còn
+  đọc đĩa), rồi phát từng sự kiện trên các kênh dành riêng cho loại sự kiện
+  đó: vỗ cánh liên tục không chiếm kênh của âm thanh ghi điểm hay va chạm, và
+  không bị xếp hàng sau nhau. Âm thanh không nạp được chỉ bị bỏ qua; nếu mixer
+  không khởi tạo được, luồng dừng và play() bỏ qua mọi sự kiện sau đó.
+- Mỗi loại sự kiện có khoảng cách tối thiểu giữa hai lần phát; sự kiện đến
+  sớm hơn (ví dụ cử chỉ tay vỗ cánh dồn dập) hoặc đã quá cũ bị bỏ qua.
+
+Khi tắt tiếng (IS_MUTED), game không tạo AudioEngine và mixer không bao giờ
+được khởi tạo.
+"""
+
+# Import các thư viện cần thiết
+import time  # Thời điểm phát sinh sự kiện
+import queue  # Hàng đợi không chặn giữa vòng lặp game và luồng âm thanh
+import threading  # Luồng nền phát âm thanh
+import pygame  # pygame.mixer
+
+MIXER_FREQUENCY = 44100  # Tần số mẫu (Hz), trùng với file âm thanh của game
+MIXER_BUFFER = 512  # Số mẫu mỗi lần mixer đẩy ra thiết bị (~12 ms ở 44.1 kHz)
+MAX_DELAY = 0.1  # Sự kiện chờ lâu hơn (giây), ví dụ khi âm thanh còn đang nạp, bị bỏ qua
+
+# Loại sự kiện -> (số kênh dành riêng, khoảng cách tối thiểu giữa hai lần phát (giây))
+CHANNELS = {
+    'wing': (2, 0.06),  # Hai kênh luân phiên: lần vỗ mới không cắt ngang lần trước ngay
+    'point': (1, 0.0),
+    'hit': (1, 0.0),
+    'die': (1, 0.0),
+    'swoosh': (1, 0.0),
+}
+
+
+def configure_mixer(frequency=MIXER_FREQUENCY, buffer=MIXER_BUFFER):
+    """
+    Đặt thông số cho lần khởi tạo mixer sau đó (phải gọi trước pygame.mixer.init)
+    """
+    pygame.mixer.pre_init(frequency=frequency, size=-16, channels=2, buffer=buffer)
+
+
+# Lớp AudioEngine - hàng đợi sự kiện âm thanh và luồng nền phát trên kênh dành riêng
+class AudioEngine:
+    def __init__(self, sounds, channels=CHANNELS):
+        self.sounds = sounds  # Nguồn âm thanh dạng dict (assets.LazySounds)
+        self.channels = channels
+        self.played = 0  # Số sự kiện đã phát
+        self.dropped = 0  # Số sự kiện bị bỏ qua (quá dày, quá cũ, hoặc luồng đã dừng)
+        self._dead = False  # True khi luồng âm thanh đã dừng: không ai lấy sự kiện khỏi hàng đợi
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='audio', daemon=True)
+        self._thread.start()
+
+    def play(self, name):
+        """
+        Gửi sự kiện âm thanh từ vòng lặp game (không chặn, không chạm vào mixer)
+        """
+        if self._dead:
+            self.dropped += 1  # Không đưa vào hàng đợi không giới hạn khi không còn luồng đọc
+            return
+        self._queue.put_nowait((name, time.perf_counter()))
+
+    def close(self, timeout=1.0):
+        """
+        Dừng luồng âm thanh
+        """
+        if self._dead:
+            return
+        self._queue.put_nowait(None)
+        self._thread.join(timeout)
+
+    def _setup(self):
+        """
+        Nạp sẵn mọi âm thanh (khởi tạo mixer nếu cần) rồi dành riêng các kênh
+        đầu tiên cho từng loại sự kiện; trả về {tên: (âm thanh, danh sách kênh)}
+        """
+        sounds = {}
+        for name in self.channels:
+            if name not in self.sounds:
+                continue
+            try:
+                sounds[name] = self.sounds[name]
+            except (pygame.error, OSError) as err:  # Thiếu file hoặc file hỏng: bỏ qua âm thanh này
+                print(f"[AUDIO] Không nạp được âm thanh '{name}':", err)
+        reserved = sum(count for count, _ in self.channels.values())
+        if pygame.mixer.get_num_channels() < reserved:
+            pygame.mixer.set_num_channels(reserved)
+        pygame.mixer.set_reserved(reserved)  # Sound.play() tự chọn kênh sẽ không dùng các kênh này
+        routes, first = {}, 0
+        for name, (count, _) in self.channels.items():
+            if name in sounds:
+                routes[name] = (sounds[name], [pygame.mixer.Channel(first + k) for k in range(count)])
+            first += count
+        return routes
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            self._dead = True
+
+    def _loop(self):
+        try:
+            routes = self._setup()
+        except pygame.error as err:
+            print("[AUDIO] Không khởi tạo được âm thanh:", err)
+            return
+        last = {}  # Tên -> thời điểm sự kiện được phát gần nhất
+        turn = {}  # Tên -> số lần đã phát (chọn kênh luân phiên)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, t = item
+            route = routes.get(name)
+            if route is None:
+                continue
+            interval = self.channels[name][1]
+            if t - last.get(name, float('-inf')) < interval or time.perf_counter() - t > MAX_DELAY:
+                self.dropped += 1
+                continue
+            last[name] = t
+            sound, channels = route
+            n = turn.get(name, 0)
+            channels[n % len(channels)].play(sound)  # Kênh riêng: phát ngay, không xếp hàng
+            turn[name] = n + 1
+            self.played += 1
@@ -0,0 +1,206 @@
+"""
+Autopilot: tự chơi bằng bảng khả năng tới được (reachability) tính sẵn.
+
+Vật lý của chim là rời rạc: y là số nguyên, mỗi bước vận tốc hoặc bị đặt về
+player_flap_acc_v (vỗ cánh), hoặc tăng player_acc_y đến player_max_vel_y, và y
+tăng đúng bằng vận tốc mới. Mọi trạng thái (y, v) của chim vì vậy được đánh số
+một lần, cùng bảng chuyển trạng thái của hai hành động (vỗ / không vỗ).
+
+Màn chơi là tất định theo seed, nên khi biết các ống phía trước (các ống trong
+PipeRing, ống kế tiếp và LOOKAHEAD ống sau đó trong LevelGenerator), Plan tính
+bằng quy nạp ngược bảng reach[k, trạng thái]: bước xa nhất chim còn sống tới
+được từ trạng thái đó ở bước k, tối đa là lúc chim đi qua ống cuối cùng đã
+biết. Va chạm với ống của mỗi bước được kiểm tra giống hệt collision.Collider
+(quét theo quãng đường, thời điểm vào / ra khỏi ống không nguyên). Nếu màn chơi
+không thể vượt qua (khe quá hẹp so với độ chênh giữa hai ống), chim vẫn sống
+lâu nhất có thể. Mỗi quyết định chỉ kiểm tra hai bước kế tiếp bằng
+Collider.check rồi tra bảng, nên là O(1).
+
+Plan không được tính sẵn một lần cho cả ván mà được tính lại định kỳ, khi phần
+màn chơi đã xét phía trước chim còn ít hơn hai khoảng cách ống: màn chơi không
+có điểm kết thúc và LevelGenerator chỉ sinh ống theo từng đoạn, nên lúc bắt đầu
+chỉ biết vài ống phía trước; bảng reach lớn theo số bước x số trạng thái, nên
+chỉ giữ cửa sổ LOOKAHEAD ống thì bộ nhớ có giới hạn và chi phí tính lại chia
+đều cho mỗi ống. Đổi lại, mỗi quyết định chỉ tối ưu trên phần màn chơi đã
+biết (một trạng thái sống qua cửa sổ vẫn có thể dẫn vào ngõ cụt ở ống sau đó).
+
+Cách dùng (policy của engine, thay cho greedy_policy):
+    pilot = Autopilot(config)
+    while not state.crashed:
+        step(state, pilot(state))
+"""
+
+# Import các thư viện cần thiết
+import math  # Làm tròn số bước
+import numpy as np  # Bảng bool và quy nạp ngược vector hóa
+
+from game_engine import greedy_policy  # Dự phòng khi không còn cách nào sống sót
+
+LOOKAHEAD = 5  # Số ống xem trước trong LevelGenerator, sau ống kế tiếp của state
+MAX_PLANS = 8  # Số ván giữ Plan cùng lúc (nhiều người chơi dùng chung một Autopilot)
+
+
+# Lớp Transitions - bảng chuyển trạng thái (y, v) của hai hành động, tính một lần
+class Transitions:
+    def __init__(self, config):
+        self.floor = config.ground_y - config.player_height - 1  # Thấp hơn mức này là chạm đất
+        # Các vận tốc có thể có (từ vận tốc ban đầu và vận tốc vỗ cánh)
+        start = [config.player_start_vel_y, config.player_flap_acc_v]
+        velocities, todo = set(start), list(start)
+        while todo:
+            v = todo.pop()
+            nv = v + config.player_acc_y if v < config.player_max_vel_y else v
+            if nv not in velocities:
+                velocities.add(nv)
+                todo.append(nv)
+        self.velocities = sorted(velocities)
+        self.velocity_index = {v: i for i, v in enumerate(self.velocities)}
+        count = len(self.velocities)
+        self.heights = math.floor(self.floor) + 1  # y nguyên từ 0 đến floor
+        self.size = self.heights * count
+
+        y = np.repeat(np.arange(self.heights), count)  # y của trạng thái s = y * count + chỉ số vận tốc
+        v = np.tile(np.array(self.velocities), self.heights)
+        fall = np.where(v < config.player_max_vel_y, v + config.player_acc_y, v)
+        flap = np.where(y > 0, config.player_flap_acc_v, fall)  # Engine bỏ qua vỗ cánh ở y <= 0
+        # Hàng 0: không vỗ cánh, hàng 1: vỗ cánh
+        nv = np.stack([fall, flap])
+        y1 = np.maximum(y + nv, 0)  # Engine giữ chim trong màn hình ở mép trên
+        self.y0 = y.astype(np.float64)
+        self.dy = (y1 - y).astype(np.float64)  # Độ dịch y trong bước
+        self.alive = y + nv <= self.floor  # Thấp hơn floor là chạm đất
+        vi = np.searchsorted(self.velocities, nv)
+        self.target = np.where(self.alive, np.minimum(y1, self.heights - 1) * count + vi, 0)  # Trạng thái kế tiếp
+
+    def index(self, y, v):
+        """
+        Số thứ tự của trạng thái (y, v), None nếu y không nguyên hoặc ngoài bảng
+        """
+        vi = self.velocity_index.get(v)
+        if vi is None or y != int(y) or not 0 <= y < self.heights:
+            return None
+        return int(y) * len(self.velocities) + vi
+
+
+# Lớp Plan - bảng reach[k, trạng thái] cho các ống đã biết của một ván
+class Plan:
+    def __init__(self, autopilot, state):
+        config = autopilot.config
+        moves = autopilot.moves
+        self.frame = state.frame  # Bước ứng với k = 0
+        pipes = autopilot.known_pipes(state)
+        px, pw, pipe_w, rx = state.player_x, config.player_width, config.pipe_width, autopilot.rx
+        # Số bước đến khi chim đi qua ống cuối cùng đã biết
+        self.horizon = max([0] + [math.ceil((x + pipe_w - px) / rx) for x, _, _ in pipes])
+
+        # Các ống chồng lên chim theo X ở từng bước: (t_in, t_out, đáy ống trên, đỉnh ống dưới)
+        overlaps = [[] for _ in range(self.horizon)]
+        for x, top, bottom in pipes:
+            first = max(0, math.floor((x - px - pw) / rx))
+            for k in range(first, min(self.horizon, first + math.ceil((pipe_w + pw) / rx) + 2)):
+                # Khoảng thời gian hai hộp chồng nhau theo X trong bước k (như Collider.check)
+                xk = x - rx * k
+                t_in, t_out = (xk - px - pw) / rx, (xk + pipe_w - px) / rx
+                if t_in < 0.0: t_in = 0.0
+                if t_out > 1.0: t_out = 1.0
+                if t_in < t_out:
+                    overlaps[k].append((t_in, t_out, top, bottom))
+
+        reach = np.empty((self.horizon + 1, moves.size), dtype=np.int16)
+        reach[self.horizon] = self.horizon  # Sau ống cuối cùng đã biết: coi như sống sót
+        for k in range(self.horizon - 1, -1, -1):
+            ok = moves.alive
+            for t_in, t_out, top, bottom in overlaps[k]:
+                ok = ok & autopilot.clear(t_in, t_out, top, bottom)
+            far = np.where(ok, reach[k + 1][moves.target], k)  # Va chạm trong bước k: dừng ở k
+            far.max(axis=0, out=reach[k])
+        self.reach = reach
+
+
+# Lớp Autopilot - policy tự chơi tra bảng, dùng như greedy_policy
+class Autopilot:
+    def __init__(self, config):
+        self.config = config
+        self.rx = -config.pipe_vel_x  # Chim đi sang phải so với ống rx mỗi bước
+        self.moves = Transitions(config)  # Tính một lần cho cả ván
+        self._clear = {}  # (t_in, t_out, đáy ống trên, đỉnh ống dưới) -> mặt nạ không va chạm
+        self._plans = {}  # id(LevelGenerator) -> (LevelGenerator, Plan)
+        # Số bước phía trước chim luôn được Plan xét: hết ống kế tiếp và ống sau đó
+        spacing = max(config.pipe_spacing, config.pipe_spacing_end)
+        self.margin = math.ceil((2 * spacing + config.pipe_width + config.player_width) / self.rx)
+
+    def known_pipes(self, state):
+        """
+        Các ống chim chưa đi qua đã biết: (x, đáy ống trên, đỉnh ống dưới trừ chiều cao chim)
+        """
+        config = self.config
+        pipes = state.pipes
+        found = [(pipes.x[i], pipes.upper_y[i], pipes.lower_y[i]) for i in pipes.live
+                 if pipes.x[i] + config.pipe_width > state.player_x]
+        x = state.next_pipe_x
+        found.append((x, state.next_upper_y, state.next_lower_y))
+        # Màn chơi tất định: các ống sau đó đã có sẵn trong LevelGenerator
+        for spacing, upper_y, lower_y in state.level.peek(LOOKAHEAD):
+            x += spacing
+            found.append((x, upper_y, lower_y))
+        return [(x, upper_y + config.pipe_height, lower_y - config.player_height)
+                for x, upper_y, lower_y in found]
+
+    def clear(self, t_in, t_out, top, bottom):
+        """
+        Mặt nạ (hành động, trạng thái) đi qua được một ống trong bước có khoảng
+        chồng X [t_in, t_out): y tuyến tính theo t nên chỉ cần xét hai đầu khoảng
+        """
+        key = (t_in, t_out, top, bottom)
+        mask = self._clear.get(key)
+        if mask is None:
+            if len(self._clear) > 4096:
+                self._clear.clear()
+            y_in = self.moves.y0 + self.moves.dy * t_in
+            y_out = self.moves.y0 + self.moves.dy * t_out
+            mask = self._clear[key] = ((y_in >= top) & (y_in <= bottom) & (y_out >= top) & (y_out <= bottom))
+        return mask
+
+    def plan(self, state):
+        """
+        Plan của ván state, tính lại khi phần còn lại phía trước chim ngắn hơn margin
+        """
+        level = state.level
+        entry = self._plans.get(id(level))
+        plan = entry[1] if entry is not None and entry[0] is level else None
+        if plan is None or not 0 <= state.frame - plan.frame < plan.horizon - self.margin:
+            if len(self._plans) >= MAX_PLANS and id(level) not in self._plans:
+                self._plans.clear()
+            plan = Plan(self, state)
+            self._plans[id(level)] = (level, plan)
+        return plan
+
+    def __call__(self, state):
+        """
+        Có vỗ cánh ở bước này hay không
+        """
+        config = self.config
+        plan = self.plan(state)
+        k = state.frame + 1 - plan.frame
+        y, v = state.player_y, state.player_vel_y
+        moves = self.moves
+        choice, far = None, -1
+        for flap in (False, True):  # Ưu tiên không vỗ cánh khi đi xa như nhau
+            if flap and y > 0:
+                nv = config.player_flap_acc_v
+            else:
+                nv = v + config.player_acc_y if v < config.player_max_vel_y else v
+            y1 = y + nv
+            if y1 > moves.floor:
+                continue  # Chạm đất
+            y1 = max(y1, 0)
+            # Bước này được kiểm tra bằng chính Collider của ván
+            if state.collider.check(state.player_x, y, y1, state.pipes):
+                continue
+            s = moves.index(y1, nv)
+            reach = plan.reach[k, s] if s is not None else k  # Ngoài bảng: chỉ biết sống qua bước này
+            if reach > far:
+                choice, far = flap, reach
+        if choice is None:
+            return greedy_policy(state)  # Không còn cách nào tránh va chạm
+        return choice
@@ -0,0 +1,289 @@
+"""
+Bộ mô phỏng theo lô: chạy N ván Flappy Bird cùng lúc bằng NumPy.
+
+Mỗi trường trạng thái là một mảng (structure-of-arrays) thay vì một đối tượng
+GameState cho mỗi ván; ống được lưu trong ring buffer cố định (N, capacity)
+với chỉ số đầu (head) và số ống (count) cho từng ván. Luật vật lý, sinh ống,
+tính điểm và va chạm giống hệt game_engine.step() (khe và khoảng cách ống theo
+level.difficulty), nhưng một lần gọi step() tiến tất cả các ván còn sống thêm
+một frame.
+
+Lưu ý: số ngẫu nhiên lấy từ một np.random.Generator chung cho cả lô nên dãy ống
+không trùng với GameState(seed) của engine vô hướng, nhưng vẫn tái lập được
+theo (n, seed).
+
+Mỗi bước có chi phí cố định của các lời gọi NumPy, nên lô nhỏ chậm hơn vòng
+lặp vô hướng; so sánh hai cách theo số ván để thấy điểm giao nhau:
+    python batch_game.py --games 1 10 100 1000 10000
+"""
+
+# Import các thư viện cần thiết
+import time  # Đo thời gian chạy
+import argparse  # Đọc tham số dòng lệnh
+import numpy as np  # Thư viện xử lý mảng số
+
+from game_engine import GameConfig
+
+
+# Lớp BatchGame - N ván chơi dưới dạng các mảng NumPy
+class BatchGame:
+    def __init__(self, n, config=None, seed=None, capacity=None):
+        self.n = n
+        self.config = config if config is not None else GameConfig()
+        # Số ống tối đa đồng thời của mỗi ván
+        self.capacity = capacity if capacity is not None else self.config.pipe_capacity()
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n)  # Chỉ số hàng dùng cho fancy indexing
+        self.slots = np.arange(self.capacity)  # Chỉ số ô trong ring buffer
+        self.reset()
+
+    def reset(self):
+        """
+        Đưa tất cả các ván về trạng thái ban đầu
+        """
+        c = self.config
+        n, k = self.n, self.capacity
+
+        # Trạng thái chim
+        self.player_x = int(c.screen_width/5)  # Giống nhau cho mọi ván
+        self.player_y = np.full(n, float(int(c.screen_width/2)))
+        self.player_vel_y = np.full(n, float(c.player_start_vel_y))
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)  # Số frame đã sống
+        self.alive = np.ones(n, dtype=bool)
+
+        # Ring buffer ống: vị trí x, y ống trên, y ống dưới
+        self.pipe_x = np.zeros((n, k))
+        self.upper_y = np.zeros((n, k))
+        self.lower_y = np.zeros((n, k))
+        self.head = np.zeros(n, dtype=np.int64)  # Ô chứa ống đầu tiên (bên trái nhất)
+        self.count = np.zeros(n, dtype=np.int64)  # Số ống đang có
+        self.spawned = np.zeros(n, dtype=np.int64)  # Số ống đã thêm (số thứ tự ống kế tiếp)
+        self.next_x = np.full(n, float(c.first_pipe_x))  # Vị trí X của ống kế tiếp
+        self._spawn(self.alive)
+
+    # Các mảng có một hàng cho mỗi ván (bị cắt bớt khi compact)
+    _ROW_FIELDS = ('player_y', 'player_vel_y', 'score', 'frame', 'alive', 'pipe_x', 'upper_y',
+                   'lower_y', 'head', 'count', 'spawned', 'next_x')
+
+    def compact(self):
+        """
+        Bỏ các ván đã kết thúc khỏi lô để mỗi bước chỉ tính trên các ván còn
+        sống. Trả về (điểm, số frame) của các ván bị bỏ; các ván còn lại được
+        đánh số lại theo thứ tự cũ.
+        """
+        keep = self.alive
+        done = (self.score[~keep], self.frame[~keep])
+        for name in self._ROW_FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
+        self.n = len(self.alive)
+        self.rows = np.arange(self.n)
+        return done
+
+    def _difficulty(self, n):
+        """
+        Phiên bản theo lô của level.difficulty: (khe, khoảng cách) của ống thứ n
+        """
+        c = self.config
+        t = np.minimum(1.0, n / c.difficulty_ramp) if c.difficulty_ramp > 0 else np.zeros(n.shape)
+        return (c.pipe_gap + (c.pipe_gap_end - c.pipe_gap) * t,
+                c.pipe_spacing + (c.pipe_spacing_end - c.pipe_spacing) * t)
+
+    def _spawn(self, mask):
+        """
+        Thêm ống kế tiếp vào cuối ring buffer của các ván trong mask khi nó tới spawn_x
+        """
+        c = self.config
+        limit = c.screen_height - c.base_height
+        while True:
+            rows = self.rows[mask & (self.next_x <= c.spawn_x)]
+            if rows.size == 0:
+                return
+            if np.any(self.count[rows] >= self.capacity):
+                raise RuntimeError("Ring buffer ống bị đầy, hãy tăng capacity")
+            gap, _ = self._difficulty(self.spawned[rows])
+            top = self.rng.integers(0, np.maximum(1, (limit - 1.2 * gap).astype(np.int64)))  # Đáy ống trên
+            slot = (self.head[rows] + self.count[rows]) % self.capacity
+            self.pipe_x[rows, slot] = self.next_x[rows]
+            self.upper_y[rows, slot] = top - c.pipe_height
+            self.lower_y[rows, slot] = top + gap
+            self.count[rows] += 1
+            self.spawned[rows] += 1
+            self.next_x[rows] += self._difficulty(self.spawned[rows])[1]
+
+    def valid(self):
+        """
+        Mặt nạ (N, capacity) các ô đang chứa ống
+        """
+        return ((self.slots - self.head[:, None]) % self.capacity) < self.count[:, None]
+
+    def step(self, flap):
+        """
+        Tiến tất cả các ván còn sống thêm một frame.
+        flap: mảng bool (N,) hoặc một giá trị bool cho cả lô.
+        Trả về mảng bool (N,) các ván vừa ghi điểm.
+        """
+        c = self.config
+        act = self.alive.copy()
+
+        # Vỗ cánh
+        flapped = act & np.asarray(flap, dtype=bool) & (self.player_y > 0)
+        self.player_vel_y[flapped] = c.player_flap_acc_v
+
+        # Kiểm tra điểm số
+        valid = self.valid()
+        playerMidPos = self.player_x + c.player_width/2
+        pipeMidPos = self.pipe_x + c.pipe_width/2
+        passed = valid & (pipeMidPos <= playerMidPos) & (playerMidPos < pipeMidPos + 4)
+        scored = act & np.any(passed, axis=1)
+        self.score += np.where(act, passed.sum(axis=1), 0)
+
+        # Áp dụng trọng lực rồi cập nhật vị trí chim
+        fall = act & (self.player_vel_y < c.player_max_vel_y) & ~flapped
+        self.player_vel_y[fall] += c.player_acc_y
+        maxY = c.ground_y - c.player_height
+        y0 = self.player_y
+        y1 = np.clip(y0 + np.minimum(self.player_vel_y, maxY - y0), 0, maxY)
+
+        # Kiểm tra va chạm trên cả quãng đường của bước; ván va chạm dừng tại thời điểm chạm
+        crash = np.zeros(self.n, dtype=bool)
+        if not c.god_mode:
+            t_hit = self._collide(valid, y0, y1)
+            crash = act & (t_hit <= 1.0)
+            t = t_hit[crash]
+            y1[crash] = y0[crash] + (y1[crash] - y0[crash]) * t
+            self.pipe_x[crash] += c.pipe_vel_x * t[:, None]
+            self.alive &= ~crash
+            act &= ~crash
+        self.player_y = np.where(act | crash, y1, y0)
+
+        # Di chuyển ống sang trái rồi thêm ống kế tiếp khi nó tới mép phải
+        self.pipe_x[act] += c.pipe_vel_x
+        self.next_x[act] += c.pipe_vel_x
+        self._spawn(act)
+
+        # Xóa ống đã ra khỏi màn hình
+        front_x = self.pipe_x[self.rows, self.head]
+        retire = act & (self.count > 0) & (front_x < -c.pipe_width)
+        self.head[retire] = (self.head[retire] + 1) % self.capacity
+        self.count[retire] -= 1
+
+        self.frame[act | crash] += 1
+        return scored
+
+    def _collide(self, valid, y0, y1):
+        """
+        Phiên bản theo lô của collision.Collider.check (không có mặt nạ điểm ảnh).
+        Trả về mảng (N,) thời điểm chạm sớm nhất trong bước, inf nếu không chạm.
+        """
+        c = self.config
+        dy = (y1 - y0)[:, None]
+        y0 = y0[:, None]
+        t_hit = np.full(self.n, np.inf)
+
+        # Mặt đất và trần
+        floor = c.ground_y - c.player_height - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_ground = np.where(dy[:, 0] > 0, np.clip((floor - y0[:, 0]) / dy[:, 0], 0, 1), 0.0)
+            t_ceiling = np.where(dy[:, 0] < 0, np.clip(y0[:, 0] / -dy[:, 0], 0, 1), 0.0)
+        t_hit = np.where(y1 > floor, t_ground, np.where(y1 < 0, t_ceiling, t_hit))
+
+        # Khoảng thời gian chim (đi sang phải rx so với ống) chồng lên từng ống theo X
+        rx = -c.pipe_vel_x
+        near = self.pipe_x - self.player_x - c.player_width
+        far = self.pipe_x + c.pipe_width - self.player_x
+        if rx > 0:
+            t_in, t_out = np.maximum(0.0, near / rx), np.minimum(1.0, far / rx)
+        elif rx < 0:
+            t_in, t_out = np.maximum(0.0, far / rx), np.minimum(1.0, near / rx)
+        else:
+            inside = (near < 0) & (far > 0)
+            t_in, t_out = np.where(inside, 0.0, 1.0), np.ones_like(near)
+        overlap = valid & (t_in < t_out)
+
+        # Thời điểm sớm nhất chim ra khỏi khe giữa ống trên và ống dưới
+        top = self.upper_y + c.pipe_height
+        bottom = self.lower_y - c.player_height
+        y_in = y0 + dy * t_in
+        y_out = y0 + dy * t_out
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_up = np.where((dy < 0) & (y_out < top), np.maximum((top - y0) / dy, t_in), np.inf)
+            t_low = np.where((dy > 0) & (y_out > bottom), np.maximum((bottom - y0) / dy, t_in), np.inf)
+        t_pipe = np.where((y_in < top) | (y_in > bottom), t_in, np.minimum(t_up, t_low))
+        t_pipe = np.where(overlap & (t_pipe < t_out), t_pipe, np.inf)
+        return np.minimum(t_hit, t_pipe.min(axis=1))
+
+    def next_lower_y(self):
+        """
+        Y của ống dưới kế tiếp phía trước chim cho mỗi ván (mặt đất nếu không có)
+        """
+        c = self.config
+        ahead = self.valid() & (self.pipe_x + c.pipe_width > self.player_x)
+        order = np.where(ahead, (self.slots - self.head[:, None]) % self.capacity, self.capacity)
+        slot = np.argmin(order, axis=1)
+        return np.where(ahead.any(axis=1), self.lower_y[self.rows, slot], c.ground_y)
+
+
+def greedy_policy(batch):
+    """
+    Phiên bản theo lô của game_engine.greedy_policy
+    """
+    c = batch.config
+    return (batch.player_vel_y >= 0) & (batch.player_y + c.player_height > batch.next_lower_y() - 20)
+
+
+def run_batch(n, config=None, seed=0, max_frames=100000, policy=greedy_policy):
+    """
+    Chạy N ván song song đến khi tất cả chết hoặc hết max_frames, trả về thống kê.
+    Khi còn không quá một nửa số ván sống, lô được compact để các ván đã kết
+    thúc không còn tốn thời gian ở mỗi bước.
+    """
+    batch = BatchGame(n, config, seed=seed)
+    scores, frames = [], []  # Kết quả của các ván đã bỏ khỏi lô
+    t_start = time.perf_counter()
+    for _ in range(max_frames):
+        alive = np.count_nonzero(batch.alive)
+        if alive == 0:
+            break
+        if alive * 2 <= batch.n:
+            score, frame = batch.compact()
+            scores.append(score)
+            frames.append(frame)
+        batch.step(policy(batch))
+    elapsed = time.perf_counter() - t_start
+    scores = np.concatenate(scores + [batch.score])
+    total = int(np.concatenate(frames + [batch.frame]).sum())
+    return {
+        'games': n,
+        'frames': total,
+        'seconds': elapsed,
+        'fps': total / elapsed if elapsed > 0 else float('inf'),
+        'mean_score': float(scores.mean()) if n else 0,
+        'max_score': int(scores.max()) if n else 0,
+    }
+
+
+if __name__ == "__main__":
+    from game_engine import run_headless
+
+    parser = argparse.ArgumentParser(description='So sánh BatchGame với engine vô hướng theo số ván')
+    parser.add_argument('--games', type=int, nargs='+', default=[1, 10, 100, 1000, 10000],
+                        help='Các số ván để đo')
+    parser.add_argument('--seed', type=int, default=0, help='Seed của các ván')
+    parser.add_argument('--frames', type=int, default=5000, help='Số frame tối đa mỗi ván')
+    args = parser.parse_args()
+
+    config = GameConfig()
+    crossover = None
+    print(f"{'ván':>7} {'vô hướng':>12} {'theo lô':>12} {'lô/vô hướng':>12}")
+    for n in args.games:
+        scalar = run_headless(config, games=n, seed=args.seed, max_frames=args.frames)
+        batch = run_batch(n, config, seed=args.seed, max_frames=args.frames)
+        ratio = batch['fps'] / scalar['fps']
+        if crossover is None and ratio >= 1.0:
+            crossover = n
+        print(f"{n:>7} {scalar['fps']:>10.0f}/s {batch['fps']:>10.0f}/s {ratio:>11.2f}x")
+    if crossover is None:
+        print("[BATCH] BatchGame chưa nhanh hơn engine vô hướng ở các số ván đã đo")
+    else:
+        print(f"[BATCH] BatchGame nhanh hơn engine vô hướng từ {crossover} ván")
@@ -0,0 +1,118 @@
+"""
+Tìm camera trong nền thay vì dò tuần tự lúc import.
+
+CameraSource.open() dò các index song song (index đã dùng lần trước được thử
+trước), trả về camera đầu tiên đọc được frame và ghi nhớ index/backend/độ phân
+giải vào file cấu hình cục bộ cho lần chạy sau. Hàm này được gọi từ luồng
+GesturePipeline nên vòng lặp game không bao giờ phải chờ.
+"""
+
+# Import các thư viện cần thiết
+import json  # Đọc/ghi file cấu hình camera
+from concurrent.futures import ThreadPoolExecutor, as_completed  # Dò camera song song
+import cv2  # Thư viện xử lý hình ảnh và camera
+
+CONFIG_PATH = '.camera.json'  # File ghi nhớ camera hoạt động gần nhất
+
+
+def probe(index, backend=cv2.CAP_ANY, width=None, height=None):
+    """
+    Mở camera tại index và đọc thử một frame. Trả về VideoCapture hoặc None
+    """
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    if width and height:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    ret, frame = cap.read()
+    if not ret:
+        cap.release()
+        return None
+    return cap
+
+
+def _release_result(future):
+    cap = future.result()
+    if cap is not None:
+        cap.release()
+
+
+# Lớp CameraSource - tìm và mở camera, ghi nhớ camera hoạt động
+class CameraSource:
+    def __init__(self, force_index=None, max_index=5, config_path=CONFIG_PATH):
+        self.force_index = force_index  # Chỉ dùng camera này nếu được chỉ định (--camera)
+        self.max_index = max_index  # Thử camera 0..max_index-1
+        self.config_path = config_path  # None = không đọc/ghi cấu hình (ví dụ nhiều người chơi)
+        self.index = None  # Index của camera đang mở
+
+    def _load_config(self):
+        if self.config_path is None:
+            return {}
+        try:
+            with open(self.config_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_config(self, index, cap):
+        if self.config_path is None:
+            return
+        config = {
+            'index': index,
+            'backend': int(cap.get(cv2.CAP_PROP_BACKEND)),
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+        try:
+            with open(self.config_path, 'w') as f:
+                json.dump(config, f)
+        except OSError as err:
+            print("[WARN] Không ghi được cấu hình camera:", err)
+
+    def open(self):
+        """
+        Tìm camera khả dụng. Trả về VideoCapture hoặc None nếu không có
+        """
+        config = self._load_config()
+        remembered = config.get('index')
+
+        # Camera được chỉ định hoặc camera lần trước: thử trước, đúng backend và độ phân giải cũ
+        first = self.force_index if self.force_index is not None else remembered
+        if first is not None:
+            same = first == remembered
+            cap = probe(first, config.get('backend', cv2.CAP_ANY) if same else cv2.CAP_ANY,
+                        config.get('width') if same else None, config.get('height') if same else None)
+            if cap is None and same:
+                cap = probe(first)  # Backend/độ phân giải cũ không còn hợp lệ
+            if cap is not None or self.force_index is not None:
+                return self._opened(first, cap)
+
+        # Dò song song các index còn lại, lấy camera đầu tiên trả về frame
+        indices = [i for i in range(self.max_index) if i != first]
+        if not indices:
+            return None
+        pool = ThreadPoolExecutor(max_workers=len(indices), thread_name_prefix='camera-probe')
+        futures = {pool.submit(probe, i): i for i in indices}
+        winner = None
+        for future in as_completed(futures):
+            if future.result() is not None:
+                winner = future
+                break
+        # Không chờ các lần dò còn lại; camera nào mở muộn sẽ được giải phóng
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(_release_result)
+        pool.shutdown(wait=False)
+        if winner is None:
+            return None
+        return self._opened(futures[winner], winner.result())
+
+    def _opened(self, index, cap):
+        if cap is None:
+            return None
+        self.index = index
+        self._save_config(index, cap)
+        print(f"Tìm thấy camera tại index {index}")
+        return cap
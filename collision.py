@@ -0,0 +1,210 @@
+"""
+Kiểm tra va chạm giữa chim với mặt đất và các ống.
+
+Mỗi bước mô phỏng, chim đi từ y0 đến y1 trong khi các ống dịch pipe_vel_x
+theo trục X. Thay vì chỉ so vị trí cuối, Collider quét cả quãng đường đó
+(swept AABB) nên chim không thể "xuyên" qua ống khi tốc độ lớn:
+    - chỉ xét các ống trong cửa sổ X mà chim quét qua (ống được sắp theo x,
+      tìm đầu cửa sổ bằng chia đôi),
+    - với mỗi ống tính khoảng thời gian [t_in, t_out] hai hộp chồng nhau theo
+      X, rồi thời điểm sớm nhất chim ra khỏi khe giữa ống trên và ống dưới,
+    - tùy chọn xác nhận lại bằng mặt nạ điểm ảnh của sprite (SpriteMasks).
+
+Kết quả trả về là CollisionResult; module không phát âm thanh hay thay đổi
+trạng thái game.
+"""
+
+# Import các thư viện cần thiết
+import math  # Làm tròn lên số mẫu khi quét mặt nạ điểm ảnh
+
+# Loại va chạm trong CollisionResult.kind
+GROUND = 'ground'  # Chạm mặt đất
+CEILING = 'ceiling'  # Vượt lên trên màn hình
+UPPER_PIPE = 'upper'  # Chạm ống trên
+LOWER_PIPE = 'lower'  # Chạm ống dưới
+
+
+# Lớp CollisionResult - kết quả kiểm tra va chạm của một bước
+class CollisionResult:
+    """
+    hit   : có va chạm hay không (bool(result) cũng cho giá trị này)
+    kind  : GROUND, CEILING, UPPER_PIPE, LOWER_PIPE hoặc None
+    slot  : ô của cặp ống trong PipeRing (None nếu không phải ống)
+    t     : thời điểm chạm trong bước, 0 = đầu bước, 1 = cuối bước
+    """
+    __slots__ = ('hit', 'kind', 'slot', 't')
+
+    def __init__(self, kind=None, slot=None, t=1.0):
+        self.hit = kind is not None
+        self.kind = kind
+        self.slot = slot
+        self.t = t
+
+    def __bool__(self):
+        return self.hit
+
+    def __repr__(self):
+        if not self.hit:
+            return 'CollisionResult()'
+        return f'CollisionResult({self.kind!r}, slot={self.slot}, t={self.t:.3f})'
+
+
+NO_COLLISION = CollisionResult()  # Dùng chung, không cấp phát mỗi bước
+
+
+def pipe_window(pipes, left, right, pipe_width):
+    """
+    Các ô của PipeRing có ống chồng lên khoảng X [left, right). Ống được
+    thêm theo thứ tự x tăng dần nên tìm ống đầu tiên bằng chia đôi.
+    """
+    live = pipes.live
+    xs = pipes.x
+    n = len(live)
+    left -= pipe_width
+    lo, hi = 0, n
+    while lo < hi:  # Ống đầu tiên có mép phải vượt qua left
+        mid = (lo + hi) >> 1
+        if xs[live[mid]] <= left:
+            lo = mid + 1
+        else:
+            hi = mid
+    end, hi = lo, n
+    while end < hi:  # Ống đầu tiên bắt đầu từ right trở đi
+        mid = (end + hi) >> 1
+        if xs[live[mid]] < right:
+            end = mid + 1
+        else:
+            hi = mid
+    return live[lo:end]
+
+
+# Lớp SpriteMasks - mặt nạ điểm ảnh tính sẵn của chim và ống
+class SpriteMasks:
+    """
+    Tạo một lần từ sprite (pygame.mask.from_surface) để xác nhận va chạm
+    theo điểm ảnh thay vì theo hộp bao. Chỉ cần pygame khi tạo mặt nạ.
+    """
+
+    def __init__(self, player, upper_pipe, lower_pipe):
+        self.player = player  # pygame.mask.Mask của chim
+        self.upper_pipe = upper_pipe  # Mặt nạ ống trên (đã xoay)
+        self.lower_pipe = lower_pipe  # Mặt nạ ống dưới
+
+    @classmethod
+    def from_sprites(cls, sprites):
+        """
+        Tạo từ bảng sprite của game (GAME_SPRITES): 'player' và 'pipe' (trên, dưới)
+        """
+        import pygame  # Chỉ cần khi dùng va chạm theo điểm ảnh
+        upper, lower = sprites['pipe']
+        return cls(pygame.mask.from_surface(sprites['player']),
+                   pygame.mask.from_surface(upper),
+                   pygame.mask.from_surface(lower))
+
+    def overlap(self, kind, dx, dy):
+        """
+        Chim và ống có điểm ảnh chung không; (dx, dy) là vị trí ống trừ vị trí chim
+        """
+        mask = self.upper_pipe if kind == UPPER_PIPE else self.lower_pipe
+        return self.player.overlap(mask, (round(dx), round(dy))) is not None
+
+
+# Lớp Collider - kiểm tra va chạm theo quãng đường của một bước
+class Collider:
+    MAX_MASK_SAMPLES = 16  # Số vị trí tối đa kiểm tra mặt nạ trên một ống mỗi bước
+
+    def __init__(self, config, masks=None, swept=True):
+        self.config = config
+        self.masks = masks  # SpriteMasks hoặc None (chỉ dùng hộp bao)
+        self.swept = swept  # False: chỉ xét vị trí cuối bước
+        self.floor = config.ground_y - config.player_height - 1  # Thấp hơn mức này là chạm đất
+
+    def check(self, player_x, y0, y1, pipes):
+        """
+        Va chạm của chim tại x = player_x đi từ y0 đến y1 trong bước hiện tại,
+        khi các ống (vị trí đầu bước) dịch pipe_vel_x. Trả về CollisionResult
+        của lần chạm sớm nhất.
+        """
+        config = self.config
+        dy = y1 - y0
+        best = NO_COLLISION
+        floor = self.floor
+        if y1 > floor:
+            best = CollisionResult(GROUND, t=min(1.0, max(0.0, (floor - y0) / dy)) if dy > 0 else 0.0)
+        elif y1 < 0:
+            best = CollisionResult(CEILING, t=min(1.0, max(0.0, y0 / -dy)) if dy < 0 else 0.0)
+
+        # Trong hệ quy chiếu của ống, chim đi sang phải rx mỗi bước
+        rx = -config.pipe_vel_x
+        if not self.swept:
+            player_x, y0, dy = player_x + rx, y1, 0.0
+            rx = 0
+        pw = config.player_width
+        pipe_w = config.pipe_width
+        if rx >= 0:
+            window = pipe_window(pipes, player_x, player_x + pw + rx, pipe_w)
+        else:
+            window = pipe_window(pipes, player_x + rx, player_x + pw, pipe_w)
+
+        for i in window:
+            # Khoảng thời gian hai hộp chồng nhau theo X
+            x = pipes.x[i]
+            if rx == 0:
+                t_in, t_out = 0.0, 1.0
+            else:
+                t_in, t_out = (x - player_x - pw) / rx, (x + pipe_w - player_x) / rx
+                if rx < 0:
+                    t_in, t_out = t_out, t_in
+                if t_in < 0.0: t_in = 0.0
+                if t_out > 1.0: t_out = 1.0
+            if t_in >= t_out or t_in >= best.t:
+                continue
+            hit = self._gap_exit(i, pipes, y0, dy, t_in, t_out)
+            if hit is not None and self.masks is not None:
+                hit = self._confirm_pixels(hit, x, pipes, player_x, y0, rx, dy, t_out)
+            if hit is not None and hit.t < best.t:
+                best = hit
+        return best
+
+    def _gap_exit(self, i, pipes, y0, dy, t_in, t_out):
+        """
+        Thời điểm sớm nhất trong [t_in, t_out) chim ra khỏi khe giữa hai ống.
+        Ống trên kéo dài lên trên và ống dưới kéo dài xuống dưới vô hạn.
+        """
+        top = pipes.upper_y[i] + self.config.pipe_height  # Đáy ống trên
+        bottom = pipes.lower_y[i] - self.config.player_height  # Đỉnh ống dưới trừ chiều cao chim
+        y_in = y0 + dy * t_in
+        if y_in < top:
+            return CollisionResult(UPPER_PIPE, i, t_in)
+        if y_in > bottom:
+            return CollisionResult(LOWER_PIPE, i, t_in)
+        # y tuyến tính theo t nên chỉ có thể ra khỏi khe theo hướng đang đi
+        if dy < 0:
+            t = (top - y0) / dy
+            if t < t_out and y0 + dy * t_out < top:
+                return CollisionResult(UPPER_PIPE, i, max(t, t_in))
+        elif dy > 0:
+            t = (bottom - y0) / dy
+            if t < t_out and y0 + dy * t_out > bottom:
+                return CollisionResult(LOWER_PIPE, i, max(t, t_in))
+        return None
+
+    def _confirm_pixels(self, hit, x, pipes, player_x, y0, rx, dy, t_out):
+        """
+        Quét mặt nạ điểm ảnh từ lúc hộp bao chạm đến lúc hết chồng nhau theo X,
+        khoảng một điểm ảnh mỗi mẫu; trả về lần chạm điểm ảnh đầu tiên hoặc None
+        """
+        i = hit.slot
+        upper_y = pipes.upper_y[i]
+        lower_y = pipes.lower_y[i]
+        span = t_out - hit.t
+        samples = min(self.MAX_MASK_SAMPLES, 1 + math.ceil(max(abs(rx), abs(dy)) * span))
+        for k in range(samples):
+            t = hit.t + span * k / samples
+            bx = player_x + rx * t
+            by = y0 + dy * t
+            if self.masks.overlap(UPPER_PIPE, x - bx, upper_y - by):
+                return CollisionResult(UPPER_PIPE, i, t)
+            if self.masks.overlap(LOWER_PIPE, x - bx, lower_y - by):
+                return CollisionResult(LOWER_PIPE, i, t)
+        return None
@@ -0,0 +1,285 @@
+"""
+Engine mô phỏng Flappy Bird không phụ thuộc màn hình.
+
+Toàn bộ vật lý, sinh ống, tính điểm và va chạm được tách khỏi mainGame() để
+chạy được mà không cần pygame display, OpenCV hay đồng hồ thời gian thực.
+Dãy ống của mỗi ván lấy từ level.LevelGenerator theo seed.
+Kích thước sprite được truyền vào dưới dạng số thuần qua GameConfig.
+
+Cách dùng:
+    config = GameConfig()
+    state = GameState(config, seed=0)
+    while not state.crashed:
+        events = step(state, flap=False)
+"""
+
+# Import các thư viện cần thiết
+import math  # Tính dung lượng ring buffer ống
+import time  # Đo thời gian khi chạy headless
+
+from collision import Collider, NO_COLLISION  # Va chạm quét theo quãng đường mỗi bước
+from level import LevelGenerator  # Dãy ống tính trước theo seed
+
+# Cờ sự kiện trả về từ step() (bitmask) để tầng hiển thị phát âm thanh
+EVENT_FLAP = 1  # Chim vỗ cánh
+EVENT_POINT = 2  # Chim đi qua ống
+EVENT_HIT = 4  # Chim va chạm
+
+
+# Lớp GameConfig - các thông số cố định của game dưới dạng số thuần
+class GameConfig:
+    def __init__(self, screen_width=289, screen_height=511,
+                 player_width=34, player_height=24,
+                 pipe_width=52, pipe_height=320, base_height=112,
+                 god_mode=False, pipe_gap=None, pipe_gap_end=None,
+                 pipe_spacing=None, pipe_spacing_end=None, difficulty_ramp=0):
+        # Kích thước màn hình và mặt đất
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.ground_y = screen_height * 0.8  # Vị trí Y của mặt đất
+
+        # Kích thước sprite (mặc định theo ảnh trong gallery/sprites)
+        self.player_width = player_width
+        self.player_height = player_height
+        self.pipe_width = pipe_width
+        self.pipe_height = pipe_height
+        self.base_height = base_height
+
+        # Tốc độ di chuyển của ống
+        self.pipe_vel_x = -4
+
+        # Màn chơi: khe giữa hai ống và khoảng cách giữa các ống, thay đổi tuyến tính
+        # từ giá trị đầu đến giá trị cuối trong difficulty_ramp ống đầu tiên (0 = không đổi)
+        self.pipe_gap = pipe_gap if pipe_gap is not None else screen_height/3
+        self.pipe_gap_end = pipe_gap_end if pipe_gap_end is not None else self.pipe_gap
+        self.pipe_spacing = pipe_spacing if pipe_spacing is not None else screen_width/2
+        self.pipe_spacing_end = pipe_spacing_end if pipe_spacing_end is not None else self.pipe_spacing
+        self.difficulty_ramp = difficulty_ramp
+        self.first_pipe_x = screen_width + 200  # Vị trí X của ống đầu tiên
+        self.spawn_x = screen_width + 10  # Ống được thêm vào khi tới vị trí X này
+
+        # Các thông số vật lý của chim
+        self.player_start_vel_y = -9  # Tốc độ Y ban đầu
+        self.player_max_vel_y = 10  # Tốc độ Y tối đa
+        self.player_min_vel_y = -8  # Tốc độ Y tối thiểu
+        self.player_acc_y = 1  # Gia tốc Y
+        self.player_flap_acc_v = -8  # Tốc độ khi vỗ cánh
+
+        self.god_mode = god_mode  # Nếu True, chim không bao giờ chết
+
+    @classmethod
+    def from_metrics(cls, metrics, screen_width, screen_height, god_mode=False, **level):
+        """
+        Tạo config từ bảng kích thước sprite (renderer.sprite_metrics)
+        """
+        return cls(screen_width, screen_height,
+                   player_width=metrics['player'][0],
+                   player_height=metrics['player'][1],
+                   pipe_width=metrics['pipe'][0][0],
+                   pipe_height=metrics['pipe'][0][1],
+                   base_height=metrics['base'][1],
+                   god_mode=god_mode, **level)
+
+    def pipe_capacity(self):
+        """
+        Số ống tối đa cùng lúc từ mép trái (-pipe_width) đến spawn_x
+        """
+        spacing = min(self.pipe_spacing, self.pipe_spacing_end)
+        return math.ceil((self.spawn_x + self.pipe_width) / spacing) + 1
+
+
+# Lớp PipeRing - bộ lưu ống dung lượng cố định dạng ring buffer
+class PipeRing:
+    """
+    Các cặp ống (trên/dưới dùng chung vị trí x) lưu trong mảng cấp phát sẵn
+    với chỉ số đầu (head) và số ống (count). Thêm ống ở cuối và xóa ống ở đầu
+    đều O(1), không cấp phát bộ nhớ mỗi frame. Thuộc tính live là tuple chỉ số
+    ô của các ống theo thứ tự từ trái sang phải (lấy từ bảng tính sẵn).
+    """
+    __slots__ = ('capacity', 'x', 'upper_y', 'lower_y', 'head', 'count', 'live', '_orders')
+
+    def __init__(self, capacity=4):
+        self.capacity = capacity
+        self.x = [0.0] * capacity  # Vị trí X của cặp ống
+        self.upper_y = [0.0] * capacity  # Vị trí Y của ống trên
+        self.lower_y = [0.0] * capacity  # Vị trí Y của ống dưới
+        self.head = 0  # Ô chứa ống đầu tiên (bên trái nhất)
+        self.count = 0  # Số ống đang có
+        # Bảng thứ tự duyệt tính sẵn: _orders[head][count] -> tuple chỉ số ô
+        self._orders = [[tuple((h + k) % capacity for k in range(c)) for c in range(capacity + 1)]
+                        for h in range(capacity)]
+        self.live = ()  # Chỉ số ô của các ống đang có
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.live)
+
+    def push(self, x, upper_y, lower_y):
+        """
+        Thêm một cặp ống vào cuối ring
+        """
+        if self.count == self.capacity:
+            raise RuntimeError("Ring buffer ống bị đầy, hãy tăng capacity")
+        i = (self.head + self.count) % self.capacity
+        self.x[i] = x
+        self.upper_y[i] = upper_y
+        self.lower_y[i] = lower_y
+        self.count += 1
+        self.live = self._orders[self.head][self.count]
+
+    def pop_front(self):
+        """
+        Xóa cặp ống đầu tiên
+        """
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+        self.live = self._orders[self.head][self.count]
+
+    def front_x(self):
+        """
+        Vị trí X của cặp ống đầu tiên
+        """
+        return self.x[self.head]
+
+    def move(self, dx):
+        """
+        Dịch tất cả các ống theo trục X
+        """
+        xs = self.x
+        for i in self.live:
+            xs[i] += dx
+
+
+# Lớp GameState - trạng thái của một ván chơi
+class GameState:
+    def __init__(self, config, seed=None, collider=None):
+        self.config = config
+        self.level = LevelGenerator(config, seed)  # Dãy ống của ván
+        self.collider = collider if collider is not None else Collider(config)
+        self.score = 0
+        self.frame = 0  # Số bước đã mô phỏng
+        self.crashed = False
+        self.collision = NO_COLLISION  # CollisionResult của lần va chạm (nếu có)
+
+        # Vị trí và tốc độ ban đầu của chim
+        self.player_x = int(config.screen_width/5)
+        self.player_y = int(config.screen_width/2)
+        self.player_vel_y = config.player_start_vel_y
+        self.player_flapped = False  # True khi chim vừa vỗ cánh
+
+        # Ống được thêm khi tới spawn_x; ống đầu tiên bắt đầu ở first_pipe_x
+        self.pipes = PipeRing(config.pipe_capacity())
+        _, self.next_upper_y, self.next_lower_y = next(self.level)
+        self.next_pipe_x = config.first_pipe_x  # Vị trí X (đã tính cuộn) của ống kế tiếp
+        spawn_pipes(self)
+
+
+def spawn_pipes(state):
+    """
+    Thêm các ống kế tiếp của màn chơi đã tới spawn_x (lấy từ bộ đệm sinh sẵn)
+    """
+    while state.next_pipe_x <= state.config.spawn_x:
+        state.pipes.push(state.next_pipe_x, state.next_upper_y, state.next_lower_y)
+        spacing, state.next_upper_y, state.next_lower_y = next(state.level)
+        state.next_pipe_x += spacing
+
+
+def step(state, flap):
+    """
+    Mô phỏng một frame. Trả về bitmask các sự kiện EVENT_* đã xảy ra
+    """
+    if state.crashed:
+        return 0
+    config = state.config
+    events = 0
+
+    # Vỗ cánh (bàn phím hoặc cử chỉ tay)
+    if flap and state.player_y > 0:
+        state.player_vel_y = config.player_flap_acc_v
+        state.player_flapped = True
+        events |= EVENT_FLAP
+
+    # Kiểm tra điểm số
+    pipes = state.pipes
+    playerMidPos = state.player_x + config.player_width/2
+    for i in pipes.live:
+        pipeMidPos = pipes.x[i] + config.pipe_width/2
+        if pipeMidPos <= playerMidPos < pipeMidPos + 4:  # Chim đi qua ống
+            state.score += 1
+            events |= EVENT_POINT
+
+    # Áp dụng trọng lực / tốc độ SAU vòng lặp ghi điểm (một lần mỗi frame)
+    if state.player_vel_y < config.player_max_vel_y and not state.player_flapped:
+        state.player_vel_y += config.player_acc_y
+    state.player_flapped = False
+    playerHeight = config.player_height
+    y0 = state.player_y
+    y1 = y0 + min(state.player_vel_y, config.ground_y - y0 - playerHeight)
+    # Giữ chim trong màn hình
+    if y1 < 0: y1 = 0
+    if y1 > config.ground_y - playerHeight: y1 = config.ground_y - playerHeight
+
+    # Kiểm tra va chạm trên cả quãng đường của bước (chim y0 -> y1, ống dịch pipe_vel_x)
+    if not config.god_mode:
+        hit = state.collider.check(state.player_x, y0, y1, pipes)
+        if hit:
+            # Dừng chim và ống tại thời điểm chạm
+            state.player_y = y0 + (y1 - y0) * hit.t
+            pipes.move(config.pipe_vel_x * hit.t)
+            state.collision = hit
+            state.crashed = True
+            state.frame += 1
+            return events | EVENT_HIT
+    state.player_y = y1
+
+    # Di chuyển ống sang trái rồi thêm ống kế tiếp khi nó tới mép phải
+    pipes.move(config.pipe_vel_x)
+    state.next_pipe_x += config.pipe_vel_x
+    spawn_pipes(state)
+
+    # Nếu ống ra khỏi màn hình, xóa nó
+    if pipes.count and pipes.front_x() < -config.pipe_width:
+        pipes.pop_front()
+
+    state.frame += 1
+    return events
+
+
+def greedy_policy(state):
+    """
+    Chính sách đơn giản cho chế độ headless: vỗ cánh khi chim rơi gần miệng ống dưới kế tiếp
+    """
+    config = state.config
+    target = config.ground_y
+    pipes = state.pipes
+    for i in pipes.live:
+        if pipes.x[i] + config.pipe_width > state.player_x:
+            target = pipes.lower_y[i]
+            break
+    return state.player_vel_y >= 0 and state.player_y + config.player_height > target - 20
+
+
+def run_headless(config, games=1, seed=0, max_frames=100000, policy=greedy_policy):
+    """
+    Chạy nhiều ván liên tiếp không giới hạn tốc độ, trả về thống kê
+    """
+    scores = []
+    total_frames = 0
+    t_start = time.perf_counter()
+    for g in range(games):
+        state = GameState(config, seed=seed + g)
+        while not state.crashed and state.frame < max_frames:
+            step(state, policy(state))
+        scores.append(state.score)
+        total_frames += state.frame
+    elapsed = time.perf_counter() - t_start
+    return {
+        'games': games,
+        'frames': total_frames,
+        'seconds': elapsed,
+        'fps': total_frames / elapsed if elapsed > 0 else float('inf'),
+        'mean_score': sum(scores) / games if games else 0,
+        'max_score': max(scores) if scores else 0,
+    }
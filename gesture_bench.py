@@ -0,0 +1,332 @@
+"""
+Ghi và đánh giá cử chỉ tay offline, không cần webcam.
+
+Một clip là một thư mục các file .npy (đọc được bằng np.load(mmap_mode='r')):
+    t.npy      : float64 [T]           thời điểm của từng frame (giây, từ đầu clip)
+    hand.npy   : int8    [T,tay]       0 = không có tay, 1 = trái, 2 = phải
+    angle.npy  : float32 [T,tay,15]    góc khớp
+    joint.npy  : float32 [T,tay,21,3]  khớp 3D tương đối
+    keypt.npy  : float32 [T,tay,21,2]  điểm then chốt (pixel)
+    frames.npy : uint8   [T,cao,rộng,3] ảnh camera gốc (tùy chọn, --frames)
+    flaps.npy  : float64 [K]           thời điểm các cú vỗ cánh thật (nhãn, tùy chọn)
+
+Cách dùng:
+    python gesture_bench.py record clips/a --seconds 30 --frames   # ghi từ camera, SPACE = đánh dấu vỗ cánh
+    python gesture_bench.py synth clips/synthetic                   # clip tổng hợp có nhiễu, cho CI
+    python gesture_bench.py run clips/a                             # so sánh backend x bộ lọc
+
+Kết quả đo: số frame/giây của backend, phân vị thời gian forward() và
+precision/recall của cú vỗ cánh so với nhãn (khớp trong khoảng --tolerance giây).
+Ngưỡng và khoảng nghỉ mặc định lấy từ main.py (như khi chơi), đổi bằng
+--high/--low/--refractory; mỗi dòng kết quả ghi lại các giá trị đã dùng.
+"""
+
+# Import các thư viện cần thiết
+import os  # Đường dẫn file clip
+import sys  # Thoát với mã lỗi
+import time  # Đo thời gian
+import argparse  # Đọc tham số dòng lệnh
+import numpy as np  # Thư viện xử lý mảng số
+
+from gesture_filter import GestureFilter  # Lọc góc tay và phát hiện vỗ cánh
+
+HAND_CODES = {None: 0, 'Left': 1, 'Right': 2}
+FILTERS = ('none', 'ema', 'one_euro')
+
+
+# Lớp GestureRecorder - ghi kết quả hand tracking (và ảnh) của từng frame
+class GestureRecorder:
+    def __init__(self, path, num_hands=2, save_frames=False):
+        self.path = path
+        self.num_hands = num_hands
+        os.makedirs(path, exist_ok=True)
+        self.t0 = None
+        self.times = []
+        self.hand = []
+        self.angle = []
+        self.joint = []
+        self.keypt = []
+        self.flaps = []
+        # Ảnh được ghi thẳng ra file thô (không giữ trong RAM), chuyển sang .npy khi đóng
+        self._frames = open(os.path.join(path, 'frames.raw'), 'wb') if save_frames else None
+        self._frame_shape = None
+
+    def add(self, t, param, img=None):
+        """
+        Ghi một frame: thời điểm, tham số tay từ forward() và ảnh camera gốc
+        """
+        if self.t0 is None:
+            self.t0 = t
+        self.times.append(t - self.t0)
+        hand = np.zeros(self.num_hands, dtype=np.int8)
+        angle = np.full((self.num_hands, 15), np.nan, dtype=np.float32)
+        joint = np.full((self.num_hands, 21, 3), np.nan, dtype=np.float32)
+        keypt = np.full((self.num_hands, 21, 2), np.nan, dtype=np.float32)
+        for h, p in enumerate(param[:self.num_hands]):
+            if p['class'] is not None:
+                hand[h] = HAND_CODES.get(p['class'], 0)
+                angle[h] = p['angle']
+                joint[h] = p['joint']
+                keypt[h] = p['keypt']
+        self.hand.append(hand)
+        self.angle.append(angle)
+        self.joint.append(joint)
+        self.keypt.append(keypt)
+        if self._frames is not None and img is not None:
+            if self._frame_shape is None:
+                self._frame_shape = img.shape
+            self._frames.write(np.ascontiguousarray(img, dtype=np.uint8).tobytes())
+
+    def mark_flap(self, t):
+        """
+        Đánh dấu thời điểm người dùng thật sự vỗ cánh (nhãn để tính precision/recall)
+        """
+        if self.t0 is not None:
+            self.flaps.append(t - self.t0)
+
+    def close(self):
+        save = lambda name, data: np.save(os.path.join(self.path, name + '.npy'), data)
+        n = len(self.times)
+        save('t', np.asarray(self.times, dtype=np.float64))
+        save('hand', np.asarray(self.hand, dtype=np.int8).reshape(n, self.num_hands))
+        save('angle', np.asarray(self.angle, dtype=np.float32).reshape(n, self.num_hands, 15))
+        save('joint', np.asarray(self.joint, dtype=np.float32).reshape(n, self.num_hands, 21, 3))
+        save('keypt', np.asarray(self.keypt, dtype=np.float32).reshape(n, self.num_hands, 21, 2))
+        save('flaps', np.asarray(self.flaps, dtype=np.float64))
+        if self._frames is not None:
+            self._frames.close()
+            raw = os.path.join(self.path, 'frames.raw')
+            if self._frame_shape is not None:
+                shape = (n,) + self._frame_shape
+                frames = np.lib.format.open_memmap(os.path.join(self.path, 'frames.npy'), mode='w+',
+                                                   dtype=np.uint8, shape=shape)
+                frames[:] = np.memmap(raw, dtype=np.uint8, mode='r', shape=shape)
+                frames.flush()
+                del frames
+            os.remove(raw)
+
+
+def load_clip(path):
+    """
+    Đọc clip dạng memory-map; 'frames' và 'flaps' là None nếu không có
+    """
+    clip = {}
+    for name in ('t', 'hand', 'angle', 'joint', 'keypt', 'frames', 'flaps'):
+        file = os.path.join(path, name + '.npy')
+        clip[name] = np.load(file, mmap_mode='r') if os.path.exists(file) else None
+    if clip['t'] is None:
+        raise ValueError(f"Không phải thư mục clip: {path}")
+    return clip
+
+
+def make_backend(name, clip):
+    """
+    Tạo backend hand tracking: 'replay' (kết quả đã ghi), 'mock' hoặc 'mediapipe'
+    (chạy lại MediaPipe trên ảnh đã ghi, cần frames.npy)
+    """
+    num_hands = clip['hand'].shape[1]
+    if name == 'replay':
+        from utils_mediapipe_mock import ReplayHand
+        return ReplayHand(clip)
+    if name == 'mediapipe' and clip['frames'] is None:
+        raise ValueError("Clip không có frames.npy (ghi lại với --frames)")
+    if name not in ('mock', 'mediapipe'):
+        raise ValueError(f"Backend không hợp lệ: {name}")
+    from input_backends import hand_factory
+    return hand_factory(name, static_image_mode=(name == 'mock'), max_num_hands=num_hands)()
+
+
+def match_flaps(detected, labels, tolerance):
+    """
+    Ghép mỗi cú vỗ cánh phát hiện được với nhãn chưa ghép gần nhất trong
+    khoảng tolerance giây; trả về (precision, recall, độ trễ phát hiện từng cặp)
+    """
+    labels = sorted(labels)
+    used = [False] * len(labels)
+    delays = []
+    for t in detected:
+        best = None
+        for j, label in enumerate(labels):
+            if not used[j] and abs(t - label) <= tolerance and (best is None or abs(t - label) < abs(t - labels[best])):
+                best = j
+        if best is not None:
+            used[best] = True
+            delays.append(t - labels[best])
+    precision = len(delays) / len(detected) if detected else 1.0
+    recall = len(delays) / len(labels) if labels else 1.0
+    return precision, recall, delays
+
+
+def game_thresholds():
+    """
+    (ngưỡng, ngưỡng thả, khoảng nghỉ) của cử chỉ tay mà game đang dùng (main.py)
+    """
+    import main as game  # Import main không mở cửa sổ hay camera
+    return game.GESTURE_THRESHOLD, game.GESTURE_RELEASE, game.FLAP_REFRACTORY
+
+
+def run_benchmark(clip, backend, smoothing, tolerance=0.25, high=None, low=None, refractory=None):
+    """
+    Chạy một backend với một bộ lọc trên toàn bộ clip (tuần tự, tất định).
+    high/low/refractory là None thì dùng giá trị của game.
+    """
+    if high is None or low is None or refractory is None:
+        game_high, game_low, game_refractory = game_thresholds()
+        high = game_high if high is None else high
+        low = game_low if low is None else low
+        refractory = game_refractory if refractory is None else refractory
+    hand = make_backend(backend, clip)
+    num_hands = clip['hand'].shape[1]
+    gestureFilter = GestureFilter(num_hands, smoothing=smoothing, high=high, low=low, refractory=refractory)
+    times = clip['t']
+    frames = clip['frames']
+    blank = np.zeros((480, 640, 3), dtype=np.uint8)  # Ảnh đầu vào khi clip không có frames
+    durations = np.empty(len(times))
+    detected = []
+    for i, t in enumerate(times):
+        img = frames[i] if frames is not None else blank
+        t_start = time.perf_counter()
+        param = hand.forward(img, flip=True)
+        durations[i] = time.perf_counter() - t_start
+        angles = [float(np.mean(p['angle'])) if p['class'] is not None else None for p in param[:num_hands]]
+        if gestureFilter.update(float(t), angles):
+            detected.append(float(t))
+
+    result = {
+        'backend': backend,
+        'filter': smoothing,
+        'high': high,
+        'low': low,
+        'refractory': refractory,
+        'frames': len(times),
+        'fps': len(times) / durations.sum() if durations.sum() > 0 else float('inf'),
+        'p50_ms': float(np.percentile(durations, 50) * 1000) if len(times) else 0.0,
+        'p95_ms': float(np.percentile(durations, 95) * 1000) if len(times) else 0.0,
+        'p99_ms': float(np.percentile(durations, 99) * 1000) if len(times) else 0.0,
+        'flaps': len(detected),
+    }
+    if clip['flaps'] is not None and len(clip['flaps']):
+        precision, recall, delays = match_flaps(detected, list(clip['flaps']), tolerance)
+        result.update(precision=precision, recall=recall,
+                      delay_ms=float(np.mean(delays) * 1000) if delays else float('nan'))
+    return result
+
+
+def record(args):
+    """
+    Ghi clip từ camera; SPACE đánh dấu cú vỗ cánh thật, ESC/q để dừng sớm
+    """
+    import cv2  # Chỉ cần OpenCV khi ghi từ camera
+    from camera import CameraSource
+    try:
+        from utils_mediapipe import MediaPipeHand
+    except Exception as e:
+        print("[ERROR] Cần MediaPipe thật để ghi clip:", e)
+        sys.exit(1)
+    cap = CameraSource(force_index=args.camera).open()
+    if cap is None:
+        print("[ERROR] Không tìm thấy camera")
+        sys.exit(1)
+    hand = MediaPipeHand(static_image_mode=False, max_num_hands=args.hands)
+    recorder = GestureRecorder(args.clip, num_hands=args.hands, save_frames=args.frames)
+    t_end = time.perf_counter() + args.seconds
+    print("Đang ghi... nhấn SPACE mỗi lần vỗ cánh, ESC để dừng")
+    try:
+        while time.perf_counter() < t_end:
+            ret, img = cap.read()
+            if not ret:
+                continue
+            t = time.perf_counter()
+            param = hand.forward(img, flip=True)
+            recorder.add(t, param, img)
+            cv2.imshow('Ghi cử chỉ', hand.draw2d(cv2.flip(img, 1), param))
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord(' '):
+                recorder.mark_flap(t)
+            elif key in (27, ord('q')):
+                break
+    finally:
+        cap.release()
+        recorder.close()
+    print(f"Đã ghi {len(recorder.times)} frame, {len(recorder.flaps)} nhãn vỗ cánh vào {args.clip}")
+
+
+def synth(args):
+    """
+    Tạo clip tổng hợp: tay thả ~40 độ, giơ ~75 độ ở các thời điểm ngẫu nhiên, có nhiễu
+    """
+    rng = np.random.default_rng(args.seed)
+    n = int(args.seconds * args.rate)
+    t = np.arange(n) / args.rate
+    base = np.full(n, 40.0)
+    flaps = []
+    s = 1.0
+    while s < args.seconds - 1:
+        duration = rng.uniform(0.25, 0.5)
+        rise = (t >= s) & (t < s + duration)
+        base[rise] = 75.0
+        flaps.append(float(t[rise][0]) if rise.any() else s)
+        s += duration + rng.uniform(0.4, 1.5)
+    angle = base[:, None] + rng.normal(0, args.noise, (n, 15))
+    recorder = GestureRecorder(args.clip, num_hands=1)
+    for i in range(n):
+        param = [{'class': 'Right', 'angle': angle[i], 'joint': np.zeros((21, 3)), 'keypt': np.zeros((21, 2))}]
+        recorder.add(t[i], param)
+    recorder.flaps = flaps
+    recorder.close()
+    print(f"Đã tạo clip tổng hợp {n} frame, {len(flaps)} cú vỗ cánh: {args.clip}")
+
+
+def run(args):
+    clip = load_clip(args.clip)
+    backends = args.backend or ['replay', 'mock'] + (['mediapipe'] if clip['frames'] is not None else [])
+    filters = args.filter or list(FILTERS)
+    print(f"[BENCH] Ngưỡng {args.high:g}, ngưỡng thả {args.low:g}, khoảng nghỉ {args.refractory:g} s")
+    print(f"{'backend':<10} {'filter':<9} {'frame/s':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'flaps':>6} {'prec':>6} {'recall':>6} {'trễ':>7}")
+    for backend in backends:
+        for smoothing in filters:
+            try:
+                r = run_benchmark(clip, backend, smoothing, args.tolerance,
+                                  args.high, args.low, args.refractory)
+            except (ImportError, ValueError) as err:
+                print(f"{backend:<10} {smoothing:<9} bỏ qua: {err}")
+                break
+            extra = (f" {r['precision']:6.2f} {r['recall']:6.2f} {r['delay_ms']:5.0f}ms" if 'precision' in r else '')
+            print(f"{backend:<10} {smoothing:<9} {r['fps']:9.0f} {r['p50_ms']:6.2f}ms {r['p95_ms']:5.2f}ms "
+                  f"{r['p99_ms']:5.2f}ms {r['flaps']:6d}{extra}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ghi và đánh giá cử chỉ tay offline')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('record', help='Ghi clip từ camera')
+    p.add_argument('clip', help='Thư mục clip')
+    p.add_argument('--seconds', type=float, default=30, help='Thời lượng ghi tối đa')
+    p.add_argument('--frames', action='store_true', help='Ghi cả ảnh camera (để chạy lại MediaPipe)')
+    p.add_argument('--camera', type=int, help='Index camera')
+    p.add_argument('--hands', type=int, default=2, help='Số tay tối đa')
+    p.set_defaults(func=record)
+
+    p = sub.add_parser('synth', help='Tạo clip tổng hợp có nhãn (không cần camera)')
+    p.add_argument('clip', help='Thư mục clip')
+    p.add_argument('--seconds', type=float, default=60)
+    p.add_argument('--rate', type=float, default=30, help='Số frame mỗi giây')
+    p.add_argument('--noise', type=float, default=8, help='Độ lệch chuẩn nhiễu góc (độ)')
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=synth)
+
+    p = sub.add_parser('run', help='Đo backend x bộ lọc trên một clip')
+    p.add_argument('clip', help='Thư mục clip')
+    p.add_argument('--backend', action='append', choices=('replay', 'mock', 'mediapipe'), help='Backend (lặp lại được; mặc định tất cả)')
+    p.add_argument('--filter', action='append', choices=FILTERS, help='Bộ lọc (lặp lại được; mặc định tất cả)')
+    p.add_argument('--tolerance', type=float, default=0.25, help='Sai lệch tối đa (giây) khi ghép với nhãn')
+    high, low, refractory = game_thresholds()
+    p.add_argument('--high', type=float, default=high, help=f'Ngưỡng góc vỗ cánh (mặc định như game: {high})')
+    p.add_argument('--low', type=float, default=low, help=f'Góc phải hạ xuống để vỗ lần sau (mặc định như game: {low})')
+    p.add_argument('--refractory', type=float, default=refractory,
+                   help=f'Khoảng nghỉ tối thiểu (giây) giữa hai cú vỗ (mặc định như game: {refractory})')
+    p.set_defaults(func=run)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,216 @@
+"""
+Lọc tín hiệu góc tay và phát hiện cú vỗ cánh.
+
+Mỗi tay có một chuỗi các bước xử lý nối tiếp (SignalChain), mỗi bước nhận
+(t, giá trị) và trả về giá trị mới cho bước sau:
+    EMAFilter     : làm mượt trung bình trượt hàm mũ
+    OneEuroFilter : làm mượt thích ứng (ít trễ khi tay chuyển động nhanh)
+    Calibration   : đưa khoảng góc của từng người/tay về khoảng chuẩn
+    Hysteresis    : hai ngưỡng lên/xuống, trả về True ở cạnh lên (vỗ cánh)
+    Refractory    : bỏ các cú vỗ cánh quá sát nhau
+Giá trị None (mất tay) đặt lại toàn bộ chuỗi. Góc dự đoán (predicted, chế độ
+thích ứng của GesturePipeline) chỉ đi qua các bước làm mượt: các bước có
+measured_only (hiệu chỉnh, ngưỡng, khoảng nghỉ) chỉ nhận góc đo được, nên chỉ
+góc đo được mới tạo ra cú vỗ cánh.
+
+Chỉ đưa vào chuỗi các mẫu mới từ camera (mỗi mẫu một lần), không phải mỗi
+frame vẽ, vì các bộ lọc phụ thuộc thời gian giữa các mẫu.
+"""
+
+# Import các thư viện cần thiết
+import math  # Hằng số pi cho bộ lọc One Euro
+
+
+# Lớp Calibration - chuẩn hóa khoảng góc của từng tay
+class Calibration:
+    """
+    Ánh xạ tuyến tính góc [rest, raised] của tay này về khoảng chuẩn
+    reference. Nếu auto=True, rest/raised được học từ cực trị gần đây (trôi
+    dần về giá trị hiện tại với tốc độ decay độ/giây).
+    """
+
+    MIN_SPAN = 20.0  # Khoảng [rest, raised] tối thiểu (độ) để bắt đầu ánh xạ
+    measured_only = True  # Không học cực trị từ góc dự đoán
+
+    def __init__(self, reference=(30.0, 80.0), rest=None, raised=None, auto=False, decay=2.0):
+        self.reference = reference  # (góc tay thả, góc tay giơ) chuẩn mà các ngưỡng dựa vào
+        self.rest = rest  # Góc tay thả của tay này (None = chưa biết)
+        self.raised = raised  # Góc tay giơ của tay này (None = chưa biết)
+        self.auto = auto
+        self.decay = decay
+        self._t = None
+
+    def reset(self):
+        self._t = None  # Giữ giá trị hiệu chỉnh khi mất tay, chỉ bỏ mốc thời gian
+
+    def __call__(self, t, x):
+        if self.auto:
+            dt = 0.0 if self._t is None else t - self._t
+            self._t = t
+            # Cực trị trôi chậm về giá trị hiện tại để theo kịp thay đổi tư thế
+            self.rest = x if self.rest is None else min(x, self.rest + self.decay * dt)
+            self.raised = x if self.raised is None else max(x, self.raised - self.decay * dt)
+        if self.rest is None or self.raised is None or self.raised - self.rest < self.MIN_SPAN:
+            return x  # Chưa đủ dữ liệu hiệu chỉnh
+        low, high = self.reference
+        return low + (x - self.rest) * (high - low) / (self.raised - self.rest)
+
+
+# Lớp EMAFilter - trung bình trượt hàm mũ
+class EMAFilter:
+    measured_only = False
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha  # Trọng số của mẫu mới
+        self.value = None
+
+    def reset(self):
+        self.value = None
+
+    def __call__(self, t, x):
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+# Lớp OneEuroFilter - bộ lọc thông thấp có tần số cắt thích ứng theo tốc độ
+class OneEuroFilter:
+    """
+    Casiez et al., "1€ Filter" (CHI 2012): tay đứng yên thì lọc mạnh để bỏ
+    rung, tay chuyển động nhanh thì tăng tần số cắt để giảm độ trễ.
+    """
+
+    measured_only = False
+
+    def __init__(self, min_cutoff=1.5, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # Tần số cắt (Hz) khi tay đứng yên
+        self.beta = beta  # Mức tăng tần số cắt theo tốc độ (Hz mỗi độ/giây)
+        self.d_cutoff = d_cutoff  # Tần số cắt (Hz) khi làm mượt đạo hàm
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.value = None
+        self.velocity = 0.0
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, t, x):
+        if self.value is None or t <= self.t:
+            self.t, self.value = t, x
+            return x
+        dt = t - self.t
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.velocity += a_d * ((x - self.value) / dt - self.velocity)
+        cutoff = self.min_cutoff + self.beta * abs(self.velocity)
+        self.value += self._alpha(cutoff, dt) * (x - self.value)
+        self.t = t
+        return self.value
+
+
+# Lớp Hysteresis - ngưỡng kép, trả về True ở cạnh lên
+class Hysteresis:
+    """
+    Vượt lên trên high thì kích hoạt (một lần), phải xuống dưới hoặc bằng
+    low mới được kích hoạt lại. high == low tương đương một ngưỡng đơn.
+    """
+
+    measured_only = True
+
+    def __init__(self, high=55.0, low=45.0):
+        self.high = high
+        self.low = low
+        self.above = False
+
+    def reset(self):
+        pass  # Giữ trạng thái khi mất tay: tay quay lại vẫn đang giơ thì không vỗ cánh
+
+    def __call__(self, t, x):
+        if not self.above and x > self.high:
+            self.above = True
+            return True
+        if self.above and x <= self.low:
+            self.above = False
+        return False
+
+
+# Lớp Refractory - khoảng nghỉ tối thiểu giữa hai cú vỗ cánh
+class Refractory:
+    measured_only = True
+    def __init__(self, period=0.15):
+        self.period = period  # Giây
+        self._last = None  # Thời điểm cú vỗ cánh gần nhất
+
+    def reset(self):
+        pass  # Khoảng nghỉ vẫn tính khi tay mất rồi xuất hiện lại
+
+    def __call__(self, t, fired):
+        if not fired:
+            return False
+        if self._last is not None and t - self._last < self.period:
+            return False
+        self._last = t
+        return True
+
+
+# Lớp SignalChain - chuỗi các bước xử lý cho một tay
+class SignalChain:
+    def __init__(self, stages):
+        self.stages = list(stages)
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def __call__(self, t, x, predicted=False):
+        if x is None:
+            self.reset()  # Mất tay
+            return None
+        for stage in self.stages:
+            if predicted and stage.measured_only:
+                continue
+            x = stage(t, x)
+        return False if predicted else x
+
+
+def make_chain(smoothing='one_euro', high=55.0, low=45.0, refractory=0.15, calibrate=False):
+    """
+    Tạo chuỗi xử lý chuẩn: [làm mượt] -> [hiệu chỉnh tự động] -> ngưỡng kép -> khoảng nghỉ.
+    Hiệu chỉnh đứng sau làm mượt để cực trị học được không bị nhiễu kéo giãn.
+    smoothing: 'one_euro', 'ema' hoặc 'none'
+    """
+    stages = []
+    if smoothing == 'one_euro':
+        stages.append(OneEuroFilter())
+    elif smoothing == 'ema':
+        stages.append(EMAFilter())
+    elif smoothing != 'none':
+        raise ValueError(f"Bộ lọc không hợp lệ: {smoothing}")
+    if calibrate:
+        stages.append(Calibration(auto=True))
+    stages.append(Hysteresis(high, low))
+    if refractory:
+        stages.append(Refractory(refractory))
+    return SignalChain(stages)
+
+
+# Lớp GestureFilter - phát hiện vỗ cánh từ góc của nhiều tay
+class GestureFilter:
+    """
+    Một SignalChain cho mỗi tay; update() trả về True nếu ít nhất một tay
+    vừa kích hoạt vỗ cánh (luôn False với góc dự đoán).
+    """
+
+    def __init__(self, num_hands=2, **chain_options):
+        self.chains = [make_chain(**chain_options) for _ in range(num_hands)]
+
+    def reset(self):
+        for chain in self.chains:
+            chain.reset()
+
+    def update(self, t, angles, predicted=False):
+        flap = False
+        for chain, angle in zip(self.chains, angles):
+            flap |= bool(chain(t, angle, predicted))
+        return flap
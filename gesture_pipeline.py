@@ -0,0 +1,320 @@
+# Import các thư viện cần thiết
+import threading  # Luồng nền cho camera và hand tracking
+import time  # Nghỉ ngắn khi camera chưa trả frame
+import cv2  # Thư viện xử lý hình ảnh và camera
+import numpy as np  # Thư viện xử lý mảng số
+
+
+# Lớp FramePool - vòng các buffer ảnh cấp phát sẵn
+class FramePool:
+    """
+    Trả lần lượt các buffer trong vòng, chỉ cấp phát lại khi kích thước đổi.
+    Dùng nhiều buffer để luồng chính vẫn đọc được frame trước trong khi luồng
+    nền ghi frame mới.
+    """
+
+    def __init__(self, size=3):
+        self.buffers = [None] * size
+        self.index = 0
+
+    def next(self, shape, dtype=np.uint8):
+        self.index = (self.index + 1) % len(self.buffers)
+        buf = self.buffers[self.index]
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            self.buffers[self.index] = buf
+        return buf
+
+
+# Lớp AnglePredictor - dự đoán góc tay giữa hai lần suy luận
+class AnglePredictor:
+    """
+    Bộ lọc vận tốc không đổi cho góc trung bình của một tay: giữ góc đo được
+    gần nhất và vận tốc góc đã làm mượt, ngoại suy góc tại thời điểm bất kỳ
+    giữa hai lần chạy hand tracking.
+    """
+
+    def __init__(self, smoothing=0.5, horizon=0.2):
+        self.smoothing = smoothing  # Trọng số của vận tốc mới đo khi làm mượt
+        self.horizon = horizon  # Không ngoại suy xa hơn khoảng thời gian này (giây)
+        self.reset()
+
+    def reset(self):
+        self.t = None  # Thời điểm đo gần nhất
+        self.angle = None  # Góc đo gần nhất (None = không có tay)
+        self.velocity = 0.0  # Vận tốc góc (độ/giây)
+
+    def update(self, t, angle):
+        """
+        Ghi một lần đo mới (angle=None khi mất tay)
+        """
+        if angle is None:
+            self.reset()
+            return
+        if self.angle is not None and t > self.t:
+            v = (angle - self.angle) / (t - self.t)
+            self.velocity += self.smoothing * (v - self.velocity)
+        self.t, self.angle = t, angle
+
+    def predict(self, t):
+        """
+        Góc dự đoán tại thời điểm t (None nếu không có tay)
+        """
+        if self.angle is None:
+            return None
+        dt = min(t - self.t, self.horizon)
+        return min(max(self.angle + self.velocity * dt, 0.0), 180.0)
+
+
+# Lớp GesturePipeline - luồng nền đọc camera và chạy hand tracking
+class GesturePipeline(threading.Thread):
+    """
+    Luồng nền sở hữu camera (cap) và đối tượng MediaPipeHand.
+    Vòng lặp game chỉ đọc kết quả góc mới nhất qua latest(), nên tốc độ khung
+    hình và độ trễ điều khiển không còn phụ thuộc vào camera hay thời gian suy luận.
+    Camera được tìm trong luồng này (camera.CameraSource); nếu camera bị rút ra
+    giữa chừng, luồng giải phóng nó, công bố "không có tay" và tìm lại.
+    """
+
+    RETRY_INTERVAL = 3.0  # Thời gian chờ (giây) giữa các lần tìm camera
+    LOST_TIMEOUT = 1.0  # Không đọc được frame quá thời gian này (giây) = mất camera
+    # Chế độ thích ứng: suy luận mọi frame khi tay chuyển động, thưa dần khi tay đứng yên
+    MOTION_SPEED = 90.0  # Vận tốc góc (độ/giây) được coi là đang chuyển động
+    MAX_INTERVAL = 0.15  # Khoảng cách tối đa (giây) giữa hai lần suy luận
+    INTERVAL_STEP = 0.025  # Mức tăng khoảng cách sau mỗi lần suy luận khi tay đứng yên
+
+    def __init__(self, camera, hand, max_num_hands=2, preview='full', preview_size=None, adaptive=False,
+                 monitor=None, sink=None, hand_factory=None):
+        # Luồng daemon: tự kết thúc khi chương trình chính thoát
+        super(GesturePipeline, self).__init__(name='GesturePipeline', daemon=True)
+        self.camera = camera  # Nguồn camera (CameraSource)
+        self.cap = None  # Camera đang mở (None = chưa có camera, chơi bằng bàn phím)
+        self.hand = hand  # Đối tượng hand tracking (None = tạo bằng hand_factory khi có camera)
+        self.hand_factory = hand_factory  # Hàm tạo hand (import MediaPipe trong luồng nền)
+        self.max_num_hands = max_num_hands
+        # Chế độ xem trước: 'off' = tắt, 'full' = mọi frame, số N = tối đa N frame/giây
+        if preview in ('off', False, None):
+            self.preview_interval = None  # Không vẽ xem trước
+        elif preview in ('full', True):
+            self.preview_interval = 0.0
+        else:
+            if float(preview) <= 0:
+                raise ValueError(f"Tần số xem trước phải lớn hơn 0: {preview}")
+            self.preview_interval = 1.0 / float(preview)
+        # (rộng, cao): xem trước là ảnh RGB thu nhỏ để vẽ trong cửa sổ game thay vì cửa sổ OpenCV
+        self.preview_size = preview_size
+        # Chế độ thích ứng: bỏ qua suy luận ở một số frame và công bố góc dự đoán
+        self.adaptive = adaptive
+        self.inference_interval = 0.0  # Khoảng cách hiện tại giữa hai lần suy luận (giây)
+        self._predictors = [AnglePredictor(horizon=self.MAX_INTERVAL) for _ in range(max_num_hands)]
+        self.monitor = monitor  # latency.LatencyMonitor đo thời gian từng giai đoạn (None = tắt)
+        self.sink = sink  # Hàm sink(seq, t_capture, angles, predicted) nhận mỗi kết quả mới (ví dụ ghi vào shared memory)
+        self._frame = None  # Buffer frame camera, được cap.read() ghi đè mỗi lần đọc
+        self._preview_pool = FramePool()  # Buffer cho hình ảnh xem trước
+        self._thumb_pool = FramePool()  # Buffer ảnh xem trước thu nhỏ (BGR)
+        self._rgb_pool = FramePool()  # Buffer ảnh xem trước thu nhỏ (RGB cho pygame)
+
+        # Khe kết quả mới nhất: (số thứ tự, thời điểm chụp, góc của từng tay, là góc dự đoán)
+        # Gán lại cả tuple là thao tác nguyên tử nên không cần khóa
+        self._latest = (0, 0.0, (None,) * max_num_hands, False)
+        # Hình ảnh xem trước mới nhất, được hiển thị ở luồng chính
+        self._preview_img = None
+        self._stop_event = threading.Event()
+
+    @property
+    def connected(self):
+        """
+        True nếu đang có camera (chế độ cử chỉ tay)
+        """
+        return self.cap is not None
+
+    @property
+    def using_mock(self):
+        """
+        True nếu đang dùng mock hand tracking (góc tay không đến từ người chơi)
+        """
+        return getattr(self.hand, 'is_mock', False)
+
+    def _connect(self):
+        """
+        Tìm và mở camera; trả về True nếu thành công
+        """
+        cap = self.camera.open()
+        if cap is None:
+            return False
+        # Giữ hàng đợi của driver ở 1 frame để luôn đọc frame mới nhất (bỏ frame cũ)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.cap = cap
+        return True
+
+    def _disconnect(self, seq):
+        """
+        Giải phóng camera bị mất và công bố kết quả "không có tay"
+        """
+        print("[WARN] Mất kết nối camera - chuyển sang chế độ bàn phím và tìm lại camera")
+        cap, self.cap = self.cap, None
+        cap.release()
+        for predictor in self._predictors:
+            predictor.reset()
+        self._publish(seq, time.perf_counter(), (None,) * self.max_num_hands)
+
+    def _publish(self, seq, t_capture, angles, predicted=False):
+        """
+        Công bố kết quả mới nhất (ghi đè kết quả cũ chưa được đọc).
+        predicted=True: góc ngoại suy, không phải góc đo được (chế độ thích ứng)
+        """
+        self._latest = (seq, t_capture, angles, predicted)
+        if self.sink is not None:
+            self.sink(seq, t_capture, angles, predicted)
+
+    def run(self):
+        seq = 0  # Số thứ tự kết quả đã công bố
+        announced = False  # Đã báo không tìm thấy camera hay chưa
+        last_frame = 0.0  # Thời điểm đọc được frame gần nhất
+        next_preview = 0.0  # Thời điểm sớm nhất được vẽ frame xem trước tiếp theo
+        next_inference = 0.0  # Thời điểm sớm nhất chạy suy luận tiếp theo (chế độ thích ứng)
+        while not self._stop_event.is_set():
+            if self.cap is None:
+                if not self._connect():
+                    if not announced:
+                        print("Không tìm thấy camera - chạy ở chế độ chỉ bàn phím")
+                        announced = True
+                    self._stop_event.wait(self.RETRY_INTERVAL)
+                    continue
+                announced = False
+                if self.hand is None:
+                    # Chỉ import backend hand tracking khi đã có camera
+                    try:
+                        self.hand = self.hand_factory()
+                    except Exception as err:
+                        print("[ERROR] Không khởi tạo được hand tracking - chỉ dùng bàn phím:", err)
+                        self.cap.release()
+                        self.cap = None
+                        return
+                last_frame = time.perf_counter()
+
+            t_read = time.perf_counter()
+            ret, img = self.cap.read(self._frame)  # Đọc vào buffer có sẵn
+            if not ret:
+                if time.perf_counter() - last_frame > self.LOST_TIMEOUT:
+                    seq += 1
+                    self._disconnect(seq)
+                else:
+                    time.sleep(0.01)  # Camera chưa sẵn sàng, thử lại sau
+                continue
+            t_capture = time.perf_counter()  # Thời điểm nhận được frame
+            last_frame = t_capture
+            self._frame = img
+
+            if self.adaptive and t_capture < next_inference:
+                # Tay đứng yên: bỏ qua suy luận, công bố góc ngoại suy từ các lần đo trước
+                # (được đánh dấu để bộ lọc không vỗ cánh theo góc chưa đo được)
+                seq += 1
+                self._publish(seq, t_capture, tuple(p.predict(t_capture) for p in self._predictors), True)
+                continue
+
+            try:
+                # Lật ngang được áp dụng lên tọa độ landmark thay vì lật pixel
+                param = self.hand.forward(img, flip=True)  # Xử lý hand tracking
+            except Exception as err:
+                print("[ERROR] Lỗi xử lý tay:", err)
+                param = []
+
+            # Lấy góc trung bình cho từng tay
+            angles = [None] * self.max_num_hands
+            for i in range(min(self.max_num_hands, len(param))):
+                if param[i]['class'] is not None:
+                    angles[i] = float(np.mean(param[i]['angle']))
+
+            if self.adaptive:
+                next_inference = t_capture + self._adapt_interval(t_capture, angles)
+
+            # Công bố kết quả mới nhất (ghi đè kết quả cũ chưa được đọc)
+            seq += 1
+            self._publish(seq, t_capture, tuple(angles))
+            t_publish = time.perf_counter()
+
+            # Chỉ vẽ xem trước khi được bật và đã đến lượt (bỏ qua hoàn toàn các frame còn lại)
+            if self.preview_interval is not None and t_capture >= next_preview:
+                next_preview = t_capture + self.preview_interval
+                self._preview_img = self._render_preview(img, param, angles)
+                t_draw = time.perf_counter() - t_publish
+            else:
+                t_draw = None  # Không vẽ xem trước ở frame này
+
+            if self.monitor is not None:
+                stages = {'capture': t_capture - t_read}
+                stages.update(getattr(self.hand, 'timing', {}))  # preprocess, inference, convert
+                if t_draw is not None:
+                    stages['draw'] = t_draw
+                stages['pipeline'] = t_publish - t_capture
+                self.monitor.record('frame', seq, t_capture, stages)
+
+    def _adapt_interval(self, t, angles):
+        """
+        Cập nhật bộ dự đoán bằng góc vừa đo và trả về khoảng cách tới lần suy luận sau
+        """
+        moving = False
+        for predictor, angle in zip(self._predictors, angles):
+            predictor.update(t, angle)
+            moving |= abs(predictor.velocity) > self.MOTION_SPEED
+        if moving:
+            # Tay đang chuyển động: suy luận mọi frame để không trễ cú vỗ cánh
+            self.inference_interval = 0.0
+        else:
+            self.inference_interval = min(self.inference_interval + self.INTERVAL_STEP, self.MAX_INTERVAL)
+        return self.inference_interval
+
+    def _render_preview(self, img, param, angles):
+        """
+        Vẽ khung xương và góc tay lên bản lật của frame (chạy trong luồng nền)
+        """
+        # Lật hình ảnh vào buffer xem trước (đồng thời là bản sao để vẽ)
+        img = cv2.flip(img, 1, dst=self._preview_pool.next(img.shape))
+        img = self.hand.draw2d(img, param)  # Vẽ kết quả lên hình ảnh
+        # Hiển thị góc của 2 tay trên hình ảnh
+        cv2.putText(img, f"Góc trái: {angles[0] if angles[0] is not None else -1:.1f}", (10,30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0),2)
+        if self.max_num_hands > 1:
+            cv2.putText(img, f"Góc phải: {angles[1] if angles[1] is not None else -1:.1f}", (10,70), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0),2)
+        if self.preview_size is None:
+            return img
+        # Thu nhỏ và đổi sang RGB ngay tại đây để luồng chính chỉ còn tạo bề mặt pygame
+        w, h = self.preview_size
+        img = cv2.resize(img, (w, h), dst=self._thumb_pool.next((h, w, 3)), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._rgb_pool.next((h, w, 3)))
+
+    def latest(self):
+        """
+        Trả về kết quả mới nhất (seq, t_capture, angles, predicted) mà không chờ đợi
+        """
+        return self._latest
+
+    def take_preview(self):
+        """
+        Lấy frame xem trước mới nhất (None nếu chưa có frame mới kể từ lần lấy trước).
+        Buffer sẽ được dùng lại sau vài frame nên cần dùng/sao chép ngay.
+        """
+        img = self._preview_img
+        self._preview_img = None
+        return img
+
+    def show_preview(self):
+        """
+        Hiển thị frame xem trước mới nhất (gọi từ luồng chính vì HighGUI
+        không an toàn khi gọi từ luồng khác trên một số hệ điều hành)
+        """
+        img = self.take_preview()
+        if img is None:
+            return  # Chưa có frame mới kể từ lần hiển thị trước
+        cv2.imshow('Tay', img)  # Hiển thị cửa sổ camera
+        cv2.waitKey(1)
+
+    def stop(self, timeout=1.0):
+        """
+        Dừng luồng và giải phóng camera
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        if self.cap is not None:
+            self.cap.release()
@@ -0,0 +1,100 @@
+"""
+Registry các backend điều khiển: 'keyboard', 'autopilot', 'mock' và 'mediapipe'.
+
+Backend chỉ được import khi thực sự cần: 'keyboard' không import OpenCV hay
+MediaPipe, còn hand_factory() trả về hàm tạo để GesturePipeline gọi trong
+luồng nền sau khi đã tìm thấy camera, nên việc import MediaPipe (vài giây,
+hàng trăm MB) không bao giờ chặn vòng lặp game và không xảy ra khi máy không
+có camera. 'auto' thử MediaPipe thật rồi mới đến mock. 'autopilot' cũng không
+dùng camera: game tự chơi bằng autopilot.Autopilot (chế độ demo).
+"""
+
+# Import các thư viện cần thiết
+import time  # Đo thời gian import backend
+
+BACKENDS = {}  # Tên backend -> hàm import trả về lớp hand tracking (None = chỉ bàn phím)
+LOAD_TIMES = {}  # Tên backend -> thời gian import (giây)
+NO_CAMERA = set()  # Backend không cần camera
+
+
+def register(name, camera=True):
+    """
+    Đăng ký hàm import của một backend
+    """
+    def decorator(loader):
+        BACKENDS[name] = loader
+        if not camera:
+            NO_CAMERA.add(name)
+        return loader
+    return decorator
+
+
+@register('keyboard', camera=False)
+def _keyboard():
+    return None  # Không camera, không hand tracking
+
+
+@register('autopilot', camera=False)
+def _autopilot():
+    return None  # Không hand tracking; game tạo Autopilot từ GameConfig
+
+
+@register('mock')
+def _mock():
+    from utils_mediapipe_mock import MediaPipeHand
+    return MediaPipeHand
+
+
+@register('mediapipe')
+def _mediapipe():
+    # utils_mediapipe chỉ import MediaPipe khi tạo MediaPipeHand: nạp ngay ở đây
+    # để lỗi xảy ra lúc load() và 'auto' chuyển sang mock nếu thiếu MediaPipe
+    import mediapipe
+    from utils_mediapipe import MediaPipeHand
+    return MediaPipeHand
+
+
+def choices():
+    """
+    Các giá trị hợp lệ cho --input
+    """
+    return ('auto',) + tuple(BACKENDS)
+
+
+def uses_camera(name):
+    """
+    Backend name có cần camera (và luồng hand tracking) hay không
+    """
+    return name not in NO_CAMERA
+
+
+def load(name):
+    """
+    Import backend. Trả về (tên backend thực tế, lớp hand tracking hoặc None)
+    """
+    if name == 'auto':
+        try:
+            return load('mediapipe')
+        except Exception as err:
+            print("[INFO] Sử dụng mock MediaPipe hand tracking (MediaPipe thật không khả dụng):", err)
+            return load('mock')
+    if name not in BACKENDS:
+        raise ValueError(f"Backend không hợp lệ: {name}")
+    t_start = time.perf_counter()
+    cls = BACKENDS[name]()
+    LOAD_TIMES[name] = time.perf_counter() - t_start
+    return name, cls
+
+
+def hand_factory(name, profiler=None, **options):
+    """
+    Hàm không tham số tạo đối tượng hand tracking của backend name (import lúc
+    được gọi). options được truyền cho MediaPipeHand; profiler
+    (assets.StartupProfiler) ghi lại thời gian import nếu có.
+    """
+    def create():
+        backend, cls = load(name)
+        if profiler is not None:
+            profiler.note(f'import {backend}', LOAD_TIMES[backend])
+        return cls(**options) if cls is not None else None
+    return create
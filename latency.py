@@ -0,0 +1,88 @@
+"""
+Đo độ trễ điều khiển bằng cử chỉ tay theo từng giai đoạn.
+
+Mỗi frame camera được đo ở luồng GesturePipeline:
+    capture    : chờ cap.read() trả frame
+    preprocess : thu nhỏ / cắt ROI / đổi sang RGB
+    inference  : MediaPipe xử lý
+    convert    : chuyển kết quả thành tham số tay (landmark, góc)
+    draw       : vẽ ảnh xem trước
+    pipeline   : tổng từ lúc nhận frame đến lúc công bố góc
+Mỗi cú vỗ cánh bằng cử chỉ được đo ở vòng lặp game:
+    pickup     : từ lúc nhận frame đến lúc vòng lặp game phát hiện góc vượt ngưỡng
+    apply      : từ lúc phát hiện đến lúc bước mô phỏng áp dụng vận tốc vỗ cánh
+    total      : từ lúc nhận frame đến lúc áp dụng (độ trễ người chơi cảm nhận)
+
+LatencyMonitor giữ cửa sổ trượt các mẫu gần nhất của từng giai đoạn để tính
+phân vị, và có thể ghi từng mẫu ra file CSV hoặc JSONL (theo đuôi file).
+"""
+
+# Import các thư viện cần thiết
+import csv  # Ghi file CSV
+import json  # Ghi file JSONL
+import threading  # Khóa vì hai luồng cùng ghi mẫu
+from collections import deque  # Cửa sổ trượt các mẫu gần nhất
+
+FRAME_STAGES = ('capture', 'preprocess', 'inference', 'convert', 'draw', 'pipeline')
+FLAP_STAGES = ('pickup', 'apply', 'total')
+STAGES = FRAME_STAGES + FLAP_STAGES
+
+
+# Lớp LatencyMonitor - thống kê độ trễ theo giai đoạn
+class LatencyMonitor:
+    def __init__(self, window=300, export_path=None):
+        self.window = window  # Số mẫu gần nhất giữ cho mỗi giai đoạn
+        self._samples = {stage: deque(maxlen=window) for stage in STAGES}  # Đơn vị ms
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None  # csv.DictWriter, None nếu ghi JSONL
+        if export_path:
+            self._file = open(export_path, 'w', newline='')
+            if not export_path.endswith('.jsonl'):
+                self._writer = csv.DictWriter(self._file, ['event', 'seq', 't'] + list(STAGES))
+                self._writer.writeheader()
+
+    def record(self, event, seq, t, stages):
+        """
+        Ghi một mẫu: event ('frame' hoặc 'flap'), số thứ tự kết quả, thời điểm
+        nhận frame và thời gian (giây) của từng giai đoạn
+        """
+        ms = {stage: seconds * 1000 for stage, seconds in stages.items()}
+        with self._lock:
+            for stage, value in ms.items():
+                self._samples[stage].append(value)
+            if self._file is None:
+                return
+            row = {'event': event, 'seq': seq, 't': round(t, 6)}
+            row.update((stage, round(value, 3)) for stage, value in ms.items())
+            if self._writer is not None:
+                self._writer.writerow(row)
+            else:
+                self._file.write(json.dumps(row) + '\n')
+
+    def percentiles(self, stage, qs=(50, 95, 99)):
+        """
+        Các phân vị (ms) của giai đoạn trong cửa sổ trượt, None nếu chưa có mẫu
+        """
+        with self._lock:
+            data = sorted(self._samples[stage])
+        if not data:
+            return None
+        return tuple(data[min(len(data) - 1, int(q / 100 * len(data)))] for q in qs)
+
+    def summary(self, stages=STAGES):
+        """
+        Các dòng tóm tắt p50/p95/p99 cho những giai đoạn đã có mẫu
+        """
+        lines = []
+        for stage in stages:
+            p = self.percentiles(stage)
+            if p is not None:
+                lines.append(f"{stage:<10} p50 {p[0]:6.1f}  p95 {p[1]:6.1f}  p99 {p[2]:6.1f} ms")
+        return lines
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
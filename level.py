@@ -0,0 +1,137 @@
+"""
+Sinh màn chơi theo seed: dãy ống được tính trước theo từng khối.
+
+LevelGenerator là một iterator trả về từng ống (khoảng cách tới ống trước, y
+ống trên, y ống dưới). Mỗi lần bộ đệm cạn, cả một khối CHUNK ống được sinh một
+lần, nên lúc thêm ống vào game chỉ còn là lấy phần tử đầu bộ đệm. Kích thước
+khe và khoảng cách giữa các ống thay đổi tuyến tính theo số thứ tự ống (tức
+điểm số khi chim tới ống đó) từ giá trị đầu đến giá trị cuối của GameConfig.
+
+Cùng config và seed luôn cho cùng một màn chơi, nên có thể phát hành màn
+"seed trong ngày" (daily_seed) và đánh giá độ khó offline:
+    python level.py --daily --pipes 200
+"""
+
+# Import các thư viện cần thiết
+import argparse  # Đọc tham số dòng lệnh
+import datetime  # Seed theo ngày
+import random  # Tạo số ngẫu nhiên
+from collections import deque  # Bộ đệm ống đã sinh sẵn
+
+CHUNK = 32  # Số ống sinh sẵn mỗi lần
+
+
+def difficulty(config, n):
+    """
+    (kích thước khe, khoảng cách tới ống trước) của ống thứ n (bắt đầu từ 0)
+    """
+    t = min(1.0, n / config.difficulty_ramp) if config.difficulty_ramp > 0 else 0.0
+    gap = config.pipe_gap + (config.pipe_gap_end - config.pipe_gap) * t
+    spacing = config.pipe_spacing + (config.pipe_spacing_end - config.pipe_spacing) * t
+    return gap, spacing
+
+
+# Lớp LevelGenerator - dãy ống của một màn chơi, sinh theo khối
+class LevelGenerator:
+    def __init__(self, config, seed=None, chunk=CHUNK):
+        self.config = config
+        self.rng = random.Random(seed)  # Bộ sinh số ngẫu nhiên riêng của màn chơi
+        self.chunk = chunk
+        self.generated = 0  # Số ống đã sinh (kể cả còn trong bộ đệm)
+        self._buffer = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._buffer:
+            self._fill()
+        return self._buffer.popleft()
+
+    def peek(self, count):
+        """
+        count ống kế tiếp mà không lấy ra (màn chơi không đổi)
+        """
+        while len(self._buffer) < count:
+            self._fill()
+        return [self._buffer[i] for i in range(count)]
+
+    def _fill(self):
+        """
+        Sinh thêm một khối ống vào bộ đệm
+        """
+        config = self.config
+        randrange = self.rng.randrange
+        # Khe nằm trong [0, chiều cao màn hình - mặt đất - 1.2 x khe) như trước đây
+        limit = config.screen_height - config.base_height
+        for n in range(self.generated, self.generated + self.chunk):
+            gap, spacing = difficulty(config, n)
+            top = randrange(0, max(1, int(limit - 1.2 * gap)))  # Đáy ống trên
+            self._buffer.append((spacing, top - config.pipe_height, top + gap))
+        self.generated += self.chunk
+
+
+def course(config, seed, count):
+    """
+    count ống đầu tiên của màn chơi (danh sách (khoảng cách, y ống trên, y ống dưới))
+    """
+    level = LevelGenerator(config, seed, chunk=count)
+    return [next(level) for _ in range(count)]
+
+
+def daily_seed(date=None):
+    """
+    Seed của màn chơi trong ngày (mặc định hôm nay), ví dụ 20240131
+    """
+    date = date or datetime.date.today()
+    return date.year * 10000 + date.month * 100 + date.day
+
+
+def describe(config, seed, count):
+    """
+    Thống kê độ khó của count ống đầu tiên: khe, khoảng cách và độ dốc (điểm
+    ảnh theo chiều dọc chim phải đi mỗi frame giữa hai khe liên tiếp)
+    """
+    pipes = course(config, seed, count)
+    gaps = [lower - upper - config.pipe_height for _, upper, lower in pipes]
+    slopes = []
+    for (_, upper0, lower0), (spacing, upper1, lower1) in zip(pipes, pipes[1:]):
+        frames = spacing / -config.pipe_vel_x
+        slopes.append(abs((upper1 + lower1) - (upper0 + lower0)) / 2 / frames)
+    return {
+        'pipes': count,
+        'min_gap': min(gaps),
+        'mean_gap': sum(gaps) / count,
+        'min_spacing': min(spacing for spacing, _, _ in pipes),
+        'mean_slope': sum(slopes) / len(slopes) if slopes else 0.0,
+        'max_slope': max(slopes, default=0.0),
+    }
+
+
+if __name__ == "__main__":
+    from game_engine import GameConfig, GameState, step, greedy_policy
+
+    parser = argparse.ArgumentParser(description='Xem và đánh giá độ khó màn chơi offline')
+    parser.add_argument('--seed', type=int, default=0, help='Seed của màn chơi')
+    parser.add_argument('--daily', action='store_true', help='Dùng seed của ngày hôm nay')
+    parser.add_argument('--pipes', type=int, default=100, help='Số ống để thống kê')
+    parser.add_argument('--gap', type=float, help='Kích thước khe ban đầu')
+    parser.add_argument('--gap-end', type=float, help='Kích thước khe sau --ramp ống')
+    parser.add_argument('--spacing', type=float, help='Khoảng cách giữa các ống ban đầu')
+    parser.add_argument('--spacing-end', type=float, help='Khoảng cách giữa các ống sau --ramp ống')
+    parser.add_argument('--ramp', type=int, default=0, help='Số ống để độ khó tăng từ đầu đến cuối')
+    args = parser.parse_args()
+
+    config = GameConfig(pipe_gap=args.gap, pipe_gap_end=args.gap_end, pipe_spacing=args.spacing,
+                        pipe_spacing_end=args.spacing_end, difficulty_ramp=args.ramp)
+    seed = daily_seed() if args.daily else args.seed
+    stats = describe(config, seed, args.pipes)
+    print(f"[LEVEL] seed {seed}, {stats['pipes']} ống: khe nhỏ nhất {stats['min_gap']:.0f} "
+          f"(TB {stats['mean_gap']:.0f}), khoảng cách nhỏ nhất {stats['min_spacing']:.0f}, "
+          f"độ dốc TB {stats['mean_slope']:.2f} / lớn nhất {stats['max_slope']:.2f} px/frame")
+
+    # Chính sách tham lam của engine chơi thử màn này
+    state = GameState(config, seed=seed)
+    while not state.crashed and state.score < args.pipes:
+        step(state, greedy_policy(state))
+    print(f"[LEVEL] Chính sách tham lam đạt {state.score} điểm sau {state.frame} frame")
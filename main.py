@@ -24,6 +24,9 @@ CÁCH ĐIỀU KHIỂN:
    - Giơ tay lên cao (góc > 55 độ) để vỗ cánh
    - Hỗ trợ 2 tay, chỉ cần 1 tay là đủ
 
+3. AUTOPILOT (--input autopilot):
+   - Game tự chơi (chế độ demo), tự bắt đầu ván mới sau màn hình chào mừng
+
 TÍNH NĂNG CHÍNH:
 ---------------
 - Hand tracking với MediaPipe (hoặc mock nếu không có)
@@ -36,9 +39,12 @@ CẤU TRÚC CODE:
 --------------
 - welcomeScreen(): Màn hình chào mừng
 - mainGame(): Logic game chính
-- isCollide(): Kiểm tra va chạm
-- getRandomPipe(): Tạo ống ngẫu nhiên
+- runHeadless(): Mô phỏng không màn hình (--headless)
 - main: Khởi tạo và vòng lặp chính
+- game_engine.py: GameState, step(), spawn_pipes()
+- level.py: LevelGenerator (dãy ống theo seed, độ khó tăng dần)
+- collision.py: Collider (va chạm quét theo bước, mặt nạ điểm ảnh tùy chọn)
+- autopilot.py: Autopilot (tự chơi bằng bảng khả năng tới được tính sẵn)
 
 THƯ VIỆN SỬ DỤNG:
 ---------------
@@ -51,58 +57,127 @@ THƯ VIỆN SỬ DỤNG:
 """
 
 # Import các thư viện cần thiết
-import cv2  # Thư viện xử lý hình ảnh và camera
+import time  # Đo thời gian (import đầu tiên để đo cả thời gian import)
+STARTUP_T0 = time.perf_counter()  # Thời điểm bắt đầu khởi động
+import os  # Tạo thư mục lưu replay
 import sys  # Sử dụng sys.exit để thoát chương trình
-import random  # Tạo số ngẫu nhiên
+import random  # Tạo seed ngẫu nhiên cho mỗi ván
+import argparse  # Đọc tham số dòng lệnh
 import pygame  # Thư viện game chính
-import numpy as np  # Thư viện xử lý mảng số
 
 from pygame.locals import *  # Import các hằng số cơ bản của pygame
-
-# Thử import MediaPipe thật; nếu không được thì dùng mock
-using_mock = False
-try:
-    from utils_mediapipe import MediaPipeHand
-except Exception as e:
-    from utils_mediapipe_mock import MediaPipeHand
-    using_mock = True
-    print("[INFO] Sử dụng mock MediaPipe hand tracking (MediaPipe thật không khả dụng):", e)
+from game_engine import GameConfig, GameState, step, run_headless, EVENT_FLAP, EVENT_POINT, EVENT_HIT  # Engine mô phỏng
+from replay import Replay, simulate  # Ghi và phát lại ván chơi
+from collision import Collider, SpriteMasks  # Va chạm theo hộp bao hoặc mặt nạ điểm ảnh
+from level import daily_seed  # Seed của màn chơi trong ngày
+from assets import AssetManager, LazySounds, StartupProfiler  # Nạp tài nguyên và đo thời gian khởi động
+from audio import configure_mixer, AudioEngine  # Bộ đệm mixer nhỏ, phát âm thanh qua hàng đợi
+from gesture_filter import GestureFilter  # Lọc góc tay và phát hiện vỗ cánh
+import input_backends  # Registry backend điều khiển (chỉ import OpenCV/MediaPipe khi cần)
+from renderer import sprite_metrics, ScoreHUD, Renderer, Compositor, CameraPreview, LatencyOverlay  # Bảng kích thước sprite, HUD điểm số, dirty-rect renderer
 
 # Biến toàn cục cho game
-FPS = 32  # Số khung hình mỗi giây
+FPS = 32  # Số bước mô phỏng mỗi giây (tốc độ game, không phụ thuộc tốc độ vẽ)
+RENDER_FPS = 60  # Số khung hình vẽ tối đa mỗi giây (0 = không giới hạn)
+MAX_FRAME_TIME = 0.25  # Thời gian tối đa (giây) tính cho một khung hình bị chậm
 SCREENWIDTH = 289  # Chiều rộng màn hình
 SCREENHEIGHT = 511  # Chiều cao màn hình
-SCREEN = pygame.display.set_mode((SCREENWIDTH, SCREENHEIGHT))  # Tạo cửa sổ game
+SCREEN = None  # Cửa sổ game (tạo trong main, không tạo khi chạy headless)
 GROUNDY = SCREENHEIGHT * 0.8  # Vị trí Y của mặt đất
 GAME_SPRITES = {}  # Từ điển chứa các sprite (hình ảnh) của game
-GAME_SOUNDS = {}  # Từ điển chứa các âm thanh của game
-IS_MUTED = False  # Tắt tất cả âm thanh nếu True
+GAME_SOUNDS = {}  # Từ điển chứa các âm thanh của game (LazySounds khi chạy)
+SPRITE_METRICS = {}  # Kích thước (rộng, cao) của sprite, tính một lần khi tải
+SCORE_HUD = None  # HUD điểm số có cache (tạo sau khi tải sprite)
+RENDERER = None  # Renderer chỉ cập nhật vùng thay đổi (tạo sau khi tải sprite)
+BOARDS = []  # Renderer của từng bảng chơi ([RENDERER] khi chơi một người)
+COMPOSITOR = None  # Ghép các bảng chơi khi nhiều người chơi
+IS_MUTED = False  # Tắt tất cả âm thanh nếu True (mixer không được khởi tạo)
+AUDIO = None  # Phát âm thanh trong luồng nền (audio.AudioEngine), None khi tắt tiếng
 GOD_MODE = False  # Nếu True, chim không bao giờ chết
+PIXEL_COLLISION = False  # Va chạm theo điểm ảnh của sprite thay vì hộp bao (không ghi replay)
+COLLIDER = None  # Collider dùng mặt nạ điểm ảnh, None = hộp bao mặc định của engine
+DAILY = False  # Mọi ván dùng màn chơi của ngày hôm nay (level.daily_seed) thay vì seed ngẫu nhiên
+LEVEL = {  # Độ khó màn chơi (tham số của GameConfig, None = mặc định)
+    'pipe_gap': None,  # Khe giữa ống trên và ống dưới ban đầu (mặc định 1/3 chiều cao màn hình)
+    'pipe_gap_end': None,  # Khe sau difficulty_ramp ống
+    'pipe_spacing': None,  # Khoảng cách giữa các ống ban đầu (mặc định 1/2 chiều rộng màn hình)
+    'pipe_spacing_end': None,  # Khoảng cách sau difficulty_ramp ống
+    'difficulty_ramp': 0,  # Số ống để độ khó tăng từ đầu đến cuối (0 = không đổi)
+}
+SHOW_RENDER_TIME = False  # In thời gian vẽ trung bình mỗi frame khi hết ván
+PREVIEW = 'full'  # Xem trước camera: 'off' = tắt, 'full' = mọi frame, số N = tối đa N frame/giây
+PREVIEW_IN_GAME = False  # Vẽ xem trước ở góc cửa sổ game thay vì cửa sổ OpenCV riêng
+PREVIEW_SIZE = (96, 72)  # Kích thước ảnh xem trước trong cửa sổ game
+CAMERA_PREVIEW = None  # Ảnh xem trước trong cửa sổ game (renderer.CameraPreview)
+GESTURE_THRESHOLD = 55  # Ngưỡng góc (độ) để kích hoạt vỗ cánh
+GESTURE_RELEASE = GESTURE_THRESHOLD  # Góc phải hạ xuống mức này mới vỗ cánh được lần tiếp theo (bằng ngưỡng: một ngưỡng đơn như trước)
+FLAP_REFRACTORY = 0  # Khoảng cách tối thiểu (giây) giữa hai cú vỗ cánh bằng cử chỉ (0 = không giới hạn)
+GESTURE_FILTER = 'none'  # Làm mượt góc tay: 'one_euro', 'ema' hoặc 'none' (không làm mượt)
+GESTURE_CALIBRATION = False  # Tự hiệu chỉnh khoảng góc của từng tay
+ADAPTIVE_TRACKING = False  # Chỉ xử lý vùng quanh tay và giảm tần suất suy luận khi tay đứng yên
+SHOW_LATENCY = False  # Hiển thị độ trễ cử chỉ tay (p50/p95) trên màn hình game
+LATENCY_LOG = None  # File .csv hoặc .jsonl ghi từng mẫu độ trễ (None = không ghi)
+LATENCY = None  # Bộ đo độ trễ (latency.LatencyMonitor), None nếu tắt
+LATENCY_OVERLAY = None  # Bảng độ trễ trên màn hình
+RECORD_REPLAYS = True  # Ghi replay của mỗi ván vào REPLAY_DIR
+REPLAY_DIR = 'replays'  # Thư mục lưu replay
+TELEMETRY_DB = 'telemetry.db'  # File SQLite lưu thống kê các ván (None = tắt)
+TELEMETRY = None  # Bộ đệm + luồng nền ghi telemetry (telemetry.TelemetryStore)
 PLAYER = 'gallery/sprites/bird.png'  # Đường dẫn đến hình chim
 BACKGROUND = 'gallery/sprites/background.png'  # Đường dẫn đến hình nền
 PIPE = 'gallery/sprites/pipe.png'  # Đường dẫn đến hình ống
-
-# Khởi tạo camera và MediaPipe
-# Thử tìm camera khả dụng, bắt đầu từ index 0
-cap = None
-for i in range(5):  # Thử camera 0-4
-    test_cap = cv2.VideoCapture(i)
-    if test_cap.isOpened():
-        ret, frame = test_cap.read()
-        if ret:
-            cap = test_cap
-            print(f"Tìm thấy camera tại index {i}")
-            break
-        else:
-            test_cap.release()
-    else:
-        test_cap.release()
-
-if cap is None:
-    print("Không tìm thấy camera - chạy ở chế độ chỉ bàn phím")
-
-# Khởi tạo đối tượng MediaPipe cho hand tracking
-hand = MediaPipeHand(static_image_mode=False, max_num_hands=2)
+BASE = 'gallery/sprites/base.png'  # Đường dẫn đến hình mặt đất
+MESSAGE = 'gallery/sprites/message.png'  # Đường dẫn đến hình thông điệp chào mừng
+NUMBERS = tuple(f'gallery/sprites/{i}.png' for i in range(10))  # Đường dẫn đến hình các chữ số
+ASSET_CACHE_DIR = '.asset_cache'  # Thư mục cache ảnh đã giải mã (None = tắt)
+STARTUP = None  # Bộ đo thời gian khởi động
+ENGINE_CONFIG = None  # Thông số engine (tạo từ sprite sau khi tải)
+
+INPUT = 'auto'  # Backend điều khiển: 'auto', 'keyboard', 'autopilot', 'mock' hoặc 'mediapipe' (input_backends)
+AUTOPILOT = None  # Policy tự chơi (autopilot.Autopilot) khi INPUT là 'autopilot'
+ATTRACT_DELAY = 2.0  # Số giây màn hình chào mừng hiển thị trước khi autopilot tự bắt đầu ván
+gesture = None  # Luồng nền tìm camera và nhận diện tay (None nếu tắt camera)
+TRACKERS = None  # Các tiến trình hand tracking khi nhiều người chơi (multiplayer.TrackerPool)
+PLAYERS = []  # Nguồn cử chỉ của từng người chơi khi nhiều người chơi (None = chỉ bàn phím)
+
+def initHandTracking(camera_index=None):
+    """
+    Khởi động luồng nền tìm camera (chỉ gọi khi chơi có màn hình và INPUT cần
+    camera). Game bắt đầu ngay ở chế độ bàn phím và tự chuyển sang cử chỉ
+    tay khi có camera; backend INPUT (MediaPipe) chỉ được import trong luồng nền
+    sau khi đã tìm thấy camera.
+    """
+    global gesture
+    from camera import CameraSource  # Tìm camera trong nền
+    from gesture_pipeline import GesturePipeline  # Luồng nền cho camera và hand tracking
+
+    factory = input_backends.hand_factory(INPUT, profiler=STARTUP, static_image_mode=False,
+                                          max_num_hands=2, roi=ADAPTIVE_TRACKING)
+    # Luồng nền tìm camera (index đã nhớ trước, các index khác song song) rồi nhận diện tay
+    gesture = GesturePipeline(CameraSource(force_index=camera_index), None, max_num_hands=2,
+                              preview=PREVIEW, preview_size=PREVIEW_SIZE if PREVIEW_IN_GAME else None,
+                              adaptive=ADAPTIVE_TRACKING, monitor=LATENCY, hand_factory=factory)
+    gesture.start()
+
+def quitGame():
+    """
+    Dừng luồng camera và thoát game
+    """
+    if gesture is not None:
+        gesture.stop()
+    if TRACKERS is not None:
+        TRACKERS.stop()
+    if AUDIO is not None:
+        AUDIO.close()
+    if TELEMETRY is not None:
+        TELEMETRY.close()  # Ghi nốt bộ đệm, ván đang chơi được lưu với kết thúc 'quit'
+    if LATENCY is not None:
+        LATENCY.close()
+        print("[LATENCY] Độ trễ cử chỉ tay:")
+        for line in LATENCY.summary():
+            print("  " + line)
+    pygame.quit()
+    sys.exit()
 
 def welcomeScreen():
     """
@@ -110,260 +185,486 @@ def welcomeScreen():
     """
     # Vị trí ban đầu của chim trên màn hình
     playerx = int(SCREENWIDTH/5)
-    playery = int((SCREENHEIGHT - GAME_SPRITES['player'].get_height())/2)
+    playery = int((SCREENHEIGHT - SPRITE_METRICS['player'][1])/2)
     # Vị trí của thông điệp chào mừng
-    messagex = int((SCREENWIDTH - GAME_SPRITES['message'].get_width())/2)
+    messagex = int((SCREENWIDTH - SPRITE_METRICS['message'][0])/2)
     messagey = int(SCREENHEIGHT*0.13)
-    basex = 0  # Vị trí X của mặt đất
+    redraw = True  # Cảnh tĩnh: chỉ vẽ khi vào màn hình hoặc cửa sổ cần vẽ lại
+    shownAt = time.perf_counter()  # Thời điểm vào màn hình chào mừng
     while True:
+        # Chế độ demo: autopilot tự bắt đầu ván sau ATTRACT_DELAY giây
+        if AUTOPILOT is not None and time.perf_counter() - shownAt >= ATTRACT_DELAY:
+            return
         # Xử lý các sự kiện pygame
         for event in pygame.event.get():
             # Nếu người dùng nhấn nút đóng hoặc ESC, thoát game
             if event.type == QUIT or (event.type==KEYDOWN and event.key == K_ESCAPE):
-                pygame.quit()
-                sys.exit()
+                quitGame()
 
             # Nếu người dùng nhấn SPACE hoặc UP, bắt đầu game
             elif event.type==KEYDOWN and (event.key==K_SPACE or event.key == K_UP):
                 return
-            else:
-                # Vẽ nền, chim, thông điệp và mặt đất
-                SCREEN.blit(GAME_SPRITES['background'], (0, 0))
-                SCREEN.blit(GAME_SPRITES['player'], (playerx, playery))
-                SCREEN.blit(GAME_SPRITES['message'], (messagex,messagey ))
-                SCREEN.blit(GAME_SPRITES['base'], (basex, GROUNDY))
-                pygame.display.update()  # Cập nhật màn hình
-                FPSCLOCK.tick(FPS)  # Giữ tốc độ khung hình
-
-
-def mainGame():
-    # Khởi tạo điểm số và vị trí chim
-    score = 0
-    playerx = int(SCREENWIDTH/5)  # Vị trí X của chim
-    playery = int(SCREENWIDTH/2)  # Vị trí Y ban đầu của chim
-    basex = 0  # Vị trí X của mặt đất
-
-    # Tạo 2 ống ngẫu nhiên cho màn hình
-    newPipe1 = getRandomPipe()
-    newPipe2 = getRandomPipe()
-
-    # Danh sách các ống trên (upper pipes)
-    upperPipes = [
-        {'x': SCREENWIDTH+200, 'y':newPipe1[0]['y']},
-        {'x': SCREENWIDTH+200+(SCREENWIDTH/2), 'y':newPipe2[0]['y']},
-    ]
-    # Danh sách các ống dưới (lower pipes)
-    lowerPipes = [
-        {'x': SCREENWIDTH+200, 'y':newPipe1[1]['y']},
-        {'x': SCREENWIDTH+200+(SCREENWIDTH/2), 'y':newPipe2[1]['y']},
-    ]
-
-    # Tốc độ di chuyển của ống
-    pipeVelX = -4
-
-    # Các thông số vật lý của chim
-    playerVelY = -9  # Tốc độ Y ban đầu
-    playerMaxVelY = 10  # Tốc độ Y tối đa
-    playerMinVelY = -8  # Tốc độ Y tối thiểu
-    playerAccY = 1  # Gia tốc Y
-
-    playerFlapAccv = -8  # Tốc độ khi vỗ cánh
-    playerFlapped = False  # True khi chim đang vỗ cánh
-    GESTURE_THRESHOLD = 55  # Ngưỡng góc (độ) để kích hoạt vỗ cánh
-    prev_angle_above = [False, False]  # Theo dõi trạng thái góc của 2 tay
+            # Cửa sổ bị che rồi hiện lại: cần vẽ lại
+            elif event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+                redraw = True
+
+        if redraw:
+            # Vẽ nền + mặt đất (lớp tĩnh), chim và thông điệp trên mọi bảng chơi
+            for renderer in BOARDS:
+                renderer.invalidate()
+                renderer.begin_frame()
+                renderer.blit(GAME_SPRITES['player'], (playerx, playery))
+                renderer.blit(GAME_SPRITES['message'], (messagex,messagey ))
+                renderer.end_frame()
+            redraw = False
+            if STARTUP is not None:
+                STARTUP.finish()  # Khung hình tương tác đầu tiên đã hiển thị
+        FPSCLOCK.tick(FPS)  # Nghỉ giữa các lần kiểm tra sự kiện
+
+
+def saveReplay(recorder, score):
+    """
+    Lưu replay của ván vừa kết thúc vào REPLAY_DIR
+    """
+    recorder.score = score
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{recorder.seed}.fbr")
+    recorder.save(path)
+    print(f"Đã lưu replay: {path}")
+
+
+def gameStep(state, flap, session=None, gestureFlap=False):
+    """
+    Một bước mô phỏng của ván đang chơi: bước engine, telemetry và âm thanh.
+    Trả về bitmask EVENT_* của bước
+    """
+    events = step(state, flap)
+    if session is not None:
+        session.step(events & EVENT_FLAP, events & EVENT_POINT, gestureFlap)
+    if AUDIO is not None:
+        if events & EVENT_FLAP:
+            AUDIO.play('wing')  # Phát âm thanh vỗ cánh
+        if events & EVENT_HIT:
+            AUDIO.play('hit')  # Phát âm thanh va chạm
+        elif events & EVENT_POINT:
+            AUDIO.play('point')  # Phát âm thanh ghi điểm
+    return events
+
+
+def renderFrame(state, prevPlayerY, alpha):
+    """
+    Vẽ một khung hình của ván: nội suy chim và ống giữa bước mô phỏng trước
+    và bước hiện tại theo phần thời gian còn dư alpha (0..1)
+    """
+    playerY = prevPlayerY + (state.player_y - prevPlayerY) * alpha
+    pipeOffset = state.config.pipe_vel_x * (alpha - 1)  # Ống đi đều pipe_vel_x mỗi bước
+    RENDERER.begin_frame()  # Xóa sprite của frame trước bằng lớp nền + mặt đất
+    drawBoard(RENDERER, state, playerY, pipeOffset)
+    if CAMERA_PREVIEW is not None:
+        CAMERA_PREVIEW.draw(RENDERER)  # Vẽ ảnh camera ở góc màn hình
+    if LATENCY_OVERLAY is not None:
+        LATENCY_OVERLAY.draw(RENDERER, time.perf_counter())  # Bảng độ trễ cử chỉ tay
+    RENDERER.end_frame()  # Cập nhật màn hình chỉ ở các vùng thay đổi
+
+
+def mainGame(replay=None, speed=1.0):
+    """
+    Chạy một ván chơi. Nếu có replay thì phát lại ván đó (bỏ qua input) với
+    tốc độ speed lần tốc độ thật; nếu không thì ghi replay khi RECORD_REPLAYS.
+    """
+    # Khởi tạo ván chơi mới trong engine (vật lý, ống, điểm số) với seed riêng
+    recorder = None  # Bộ ghi replay của ván này
+    session = None  # Telemetry của ván này (không ghi khi phát lại replay)
+    if replay is not None:
+        state = GameState(replay.config, seed=replay.seed)
+    else:
+        seed = newSeed()
+        state = GameState(ENGINE_CONFIG, seed=seed, collider=COLLIDER)
+        if RECORD_REPLAYS and COLLIDER is None:  # Replay được mô phỏng lại bằng hộp bao
+            recorder = Replay(seed, ENGINE_CONFIG)
+        if TELEMETRY is not None:
+            session = TELEMETRY.begin(INPUT, seed=seed)
+    RENDERER.invalidate()  # Frame đầu tiên vẽ lại toàn màn hình
+
+    gestureFilter = newGestureFilter()  # Lọc góc tay và phát hiện vỗ cánh
+    lastGestureSeq = 0  # Số thứ tự kết quả cử chỉ đã đưa vào bộ lọc
+    renderTime = 0.0  # Tổng thời gian vẽ (giây) để đo hiệu năng
+    renderFrames = 0  # Số khung hình đã vẽ
+
+    # Vòng lặp bước cố định: mô phỏng đúng FPS bước mỗi giây, vẽ nhanh nhất có thể
+    # (tối đa RENDER_FPS) và nội suy vị trí giữa hai bước mô phỏng
+    dt = 1.0 / FPS  # Thời gian của một bước mô phỏng
+    accumulator = 0.0  # Thời gian thực chưa được mô phỏng
+    prevPlayerY = state.player_y  # Vị trí Y của chim ở bước mô phỏng trước
+    flap = False  # True nếu người chơi vỗ cánh và bước mô phỏng chưa xử lý
+    gestureFlap = False  # True nếu lần vỗ cánh đang chờ đến từ cử chỉ tay
+    flapCapture = None  # Thời điểm nhận frame camera của cú vỗ cánh bằng cử chỉ đang chờ (đo độ trễ)
+    flapDetect = 0.0  # Thời điểm vòng lặp game phát hiện cú vỗ cánh đó
+    flapSeq = 0  # Số thứ tự kết quả cử chỉ của cú vỗ cánh đó
+    prevTime = time.perf_counter()
 
     while True:
-        # Reset góc cho 2 tay mỗi frame
-        angles = [None, None]
-        # Nếu có camera, xử lý hình ảnh để nhận diện tay
-        if cap is not None:
-            ret, img = cap.read()
-            if ret:
-                img = cv2.flip(img, 1)  # Lật hình ảnh ngang
-                try:
-                    param = hand.forward(img)  # Xử lý hand tracking
-                except Exception as err:
-                    print("[ERROR] Lỗi xử lý tay:", err)
-                    param = []
-                # Lấy góc cho từng tay (tối đa 2 tay)
-                for i in range(min(2, len(param))):
-                    if param[i]['class'] is not None:
-                        angles[i] = float(np.mean(param[i]['angle']))
-                img = hand.draw2d(img.copy(), param)  # Vẽ kết quả lên hình ảnh
-                # Hiển thị góc của 2 tay trên hình ảnh
-                cv2.putText(img, f"Góc trái: {angles[0] if angles[0] is not None else -1:.1f}", (10,30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0),2)
-                cv2.putText(img, f"Góc phải: {angles[1] if angles[1] is not None else -1:.1f}", (10,70), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0),2)
-                cv2.imshow('Tay', img)  # Hiển thị cửa sổ camera
-                cv2.waitKey(1)
-        # Nếu không có camera hoặc dùng mock, chỉ lấy tay đầu tiên
-        if (cap is None or using_mock) and 'param' not in locals():
-            try:
-                param = hand.forward(np.zeros((480,640,3), dtype=np.uint8))
-                angles[0] = float(np.mean(param[0]['angle']))
-            except Exception:
-                angles[0] = None
+        now = time.perf_counter()
+        # Giới hạn thời gian một khung hình để tránh mô phỏng dồn dập sau khi bị treo
+        accumulator += min(now - prevTime, MAX_FRAME_TIME) * speed
+        if session is not None:
+            session.frame(now - prevTime, now)  # Thời gian frame (chỉ cộng dồn trong bộ nhớ)
+        prevTime = now
+
+        # Lấy góc mới nhất do luồng camera công bố (không chờ camera hay suy luận)
+        angles = (None, None)
+        if gesture is not None:
+            gestureSeq, gestureTime, angles, predicted = gesture.latest()
+            if CAMERA_PREVIEW is not None:
+                preview = gesture.take_preview()
+                if preview is not None:
+                    CAMERA_PREVIEW.update(preview)  # Frame mới cho ảnh xem trước trong game
+            else:
+                gesture.show_preview()  # Hiển thị frame camera mới nhất nếu có
 
         # Xử lý sự kiện pygame
         for event in pygame.event.get():
             if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-                pygame.quit()
-                sys.exit()
+                quitGame()
             if event.type == KEYDOWN and (event.key == K_SPACE or event.key == K_UP):
-                if playery > 0:
-                    playerVelY = playerFlapAccv  # Đặt tốc độ vỗ cánh
-                    playerFlapped = True
-                    if not IS_MUTED: GAME_SOUNDS['wing'].play()  # Phát âm thanh vỗ cánh
+                flap = True
 
         # Xử lý cử chỉ tay để vỗ cánh (cho 2 tay, chỉ cần 1 tay vượt ngưỡng là nhảy)
-        if cap is not None and not using_mock:
-            for i in range(2):
-                if angles[i] is not None:
-                    angle_above = angles[i] > GESTURE_THRESHOLD  # Kiểm tra góc có vượt ngưỡng
-                    if angle_above and not prev_angle_above[i] and playery > 0:
-                        playerVelY = playerFlapAccv  # Đặt tốc độ vỗ cánh
-                        playerFlapped = True
-                        if not IS_MUTED: GAME_SOUNDS['wing'].play()  # Phát âm thanh vỗ cánh
-                    prev_angle_above[i] = angle_above  # Cập nhật trạng thái trước
-
-        # Kiểm tra va chạm
-        crashTest = isCollide(playerx, playery, upperPipes, lowerPipes)
-        if crashTest and not GOD_MODE:
-            return  # Kết thúc game nếu va chạm và không phải chế độ god
-
-        # Kiểm tra điểm số
-        playerMidPos = playerx + GAME_SPRITES['player'].get_width()/2  # Vị trí giữa của chim
-        for pipe in upperPipes:
-            pipeMidPos = pipe['x'] + GAME_SPRITES['pipe'][0].get_width()/2  # Vị trí giữa của ống
-            if pipeMidPos<= playerMidPos < pipeMidPos +4:  # Chim đi qua ống
-                score +=1
-                print(f"Điểm của bạn là {score}")
-                if not IS_MUTED: GAME_SOUNDS['point'].play()  # Phát âm thanh ghi điểm
-
-        # Áp dụng trọng lực / tốc độ SAU vòng lặp ghi điểm (một lần mỗi frame)
-        if playerVelY <playerMaxVelY and not playerFlapped:
-            playerVelY += playerAccY  # Tăng tốc độ do trọng lực
-        if playerFlapped:
-            playerFlapped = False  # Reset trạng thái vỗ cánh
-        playerHeight = GAME_SPRITES['player'].get_height()
-        # Cập nhật vật lý (loại bỏ ánh xạ trực tiếp từ góc sang Y)
-        playery = playery + min(playerVelY, GROUNDY - playery - playerHeight)
-        # Giữ chim trong màn hình
-        if playery < 0: playery = 0
-        if playery > GROUNDY - playerHeight: playery = GROUNDY - playerHeight
-
-        # Di chuyển ống sang trái
-        for upperPipe , lowerPipe in zip(upperPipes, lowerPipes):
-            upperPipe['x'] += pipeVelX
-            lowerPipe['x'] += pipeVelX
-
-        # Thêm ống mới khi ống đầu tiên sắp ra khỏi màn hình bên trái
-        if 0<upperPipes[0]['x']<5:
-            newpipe = getRandomPipe()
-            upperPipes.append(newpipe[0])
-            lowerPipes.append(newpipe[1])
-
-        # Nếu ống ra khỏi màn hình, xóa nó
-        if upperPipes[0]['x'] < -GAME_SPRITES['pipe'][0].get_width():
-            upperPipes.pop(0)
-            lowerPipes.pop(0)
-
-        # Vẽ các sprite lên màn hình
-        SCREEN.blit(GAME_SPRITES['background'], (0, 0))  # Vẽ nền
-        for upperPipe, lowerPipe in zip(upperPipes, lowerPipes):
-            SCREEN.blit(GAME_SPRITES['pipe'][0], (upperPipe['x'], upperPipe['y']))  # Vẽ ống trên
-            SCREEN.blit(GAME_SPRITES['pipe'][1], (lowerPipe['x'], lowerPipe['y']))  # Vẽ ống dưới
-
-        SCREEN.blit(GAME_SPRITES['base'], (basex, GROUNDY))  # Vẽ mặt đất
-        SCREEN.blit(GAME_SPRITES['player'], (playerx, playery))  # Vẽ chim
-        # Hiển thị điểm số
-        myDigits = [int(x) for x in list(str(score))]  # Chuyển điểm thành danh sách chữ số
-        width = 0
-        for digit in myDigits:
-            width += GAME_SPRITES['numbers'][digit].get_width()  # Tính tổng chiều rộng
-        Xoffset = (SCREENWIDTH - width)/2  # Căn giữa
-
-        for digit in myDigits:
-            SCREEN.blit(GAME_SPRITES['numbers'][digit], (Xoffset, SCREENHEIGHT*0.12))  # Vẽ từng chữ số
-            Xoffset += GAME_SPRITES['numbers'][digit].get_width()
-        pygame.display.update()  # Cập nhật màn hình
-        FPSCLOCK.tick(FPS)  # Giữ tốc độ khung hình
-
-
-def isCollide(playerx, playery, upperPipes, lowerPipes):
-    # Kiểm tra va chạm với mặt đất hoặc trần nhà
-    if playery> GROUNDY - 25  or playery<0:
-        if not GOD_MODE and not IS_MUTED: GAME_SOUNDS['hit'].play()  # Phát âm thanh va chạm
-        return not GOD_MODE  # Trả về True nếu không phải chế độ god
-
-    # Kiểm tra va chạm với ống trên
-    for pipe in upperPipes:
-        pipeHeight = GAME_SPRITES['pipe'][0].get_height()
-        if(playery < pipeHeight + pipe['y'] and abs(playerx - pipe['x']) < GAME_SPRITES['pipe'][0].get_width()):
-            if not GOD_MODE and not IS_MUTED: GAME_SOUNDS['hit'].play()  # Phát âm thanh va chạm
-            return not GOD_MODE  # Trả về True nếu không phải chế độ god
-
-    # Kiểm tra va chạm với ống dưới
-    for pipe in lowerPipes:
-        if (playery + GAME_SPRITES['player'].get_height() > pipe['y']) and abs(playerx - pipe['x']) < GAME_SPRITES['pipe'][0].get_width():
-            if not GOD_MODE and not IS_MUTED: GAME_SOUNDS['hit'].play()  # Phát âm thanh va chạm
-            return not GOD_MODE  # Trả về True nếu không phải chế độ god
-
-    return False  # Không có va chạm
-
-
-def getRandomPipe():
+        # Mỗi kết quả mới từ camera chỉ được đưa vào bộ lọc một lần
+        if gesture is not None and not gesture.using_mock and gestureSeq != lastGestureSeq:
+            lastGestureSeq = gestureSeq
+            if gestureFilter.update(gestureTime, angles, predicted):
+                flap = gestureFlap = True
+                if LATENCY is not None and flapCapture is None:
+                    flapCapture, flapDetect, flapSeq = gestureTime, time.perf_counter(), gestureSeq
+
+        # Mô phỏng các bước cố định: vỗ cánh, va chạm, điểm số, trọng lực, ống
+        while accumulator >= dt:
+            accumulator -= dt
+            if AUTOPILOT is not None and replay is None:
+                flap = AUTOPILOT(state)  # Autopilot quyết định thay cho người chơi
+            if replay is not None:
+                if state.frame >= replay.ticks:
+                    return  # Hết replay
+                flap = replay.flap_at(state.frame)  # Vỗ cánh theo replay
+            elif recorder is not None:
+                recorder.record(flap, angles)  # Ghi input của bước này
+            prevPlayerY = state.player_y
+            events = gameStep(state, flap, session, gestureFlap)
+            flap = gestureFlap = False  # Lần vỗ cánh chỉ áp dụng cho một bước
+            if flapCapture is not None:
+                if events & EVENT_FLAP:
+                    # Độ trễ từ frame camera đến lúc vận tốc vỗ cánh được áp dụng
+                    t_apply = time.perf_counter()
+                    LATENCY.record('flap', flapSeq, flapCapture, {
+                        'pickup': flapDetect - flapCapture,
+                        'apply': t_apply - flapDetect,
+                        'total': t_apply - flapCapture,
+                    })
+                flapCapture = None
+            if events & EVENT_HIT:
+                if replay is None:
+                    print(f"Điểm của bạn là {state.score}")
+                if session is not None:
+                    session.end(state.score, state.collision.kind)
+                if recorder is not None:
+                    saveReplay(recorder, state.score)
+                if SHOW_RENDER_TIME and renderFrames > 0:
+                    print(f"[PERF] Thời gian vẽ trung bình: {renderTime / renderFrames * 1000:.3f} ms/frame")
+                return  # Kết thúc game khi va chạm (engine đã bỏ qua va chạm nếu GOD_MODE)
+
+        # Vẽ các sprite lên màn hình, nội suy theo phần thời gian còn dư
+        t_render = time.perf_counter()
+        renderFrame(state, prevPlayerY, accumulator / dt)
+        renderTime += time.perf_counter() - t_render
+        renderFrames += 1
+        FPSCLOCK.tick(RENDER_FPS)  # Giới hạn tốc độ vẽ (không ảnh hưởng tốc độ game)
+
+
+def previewMode(value):
+    """
+    Kiểu tham số --preview: 'off', 'full' hoặc số frame xem trước mỗi giây
+    """
+    if value in ('off', 'full'):
+        return value
+    try:
+        hz = float(value)
+    except ValueError:
+        hz = 0
+    if hz <= 0:
+        raise argparse.ArgumentTypeError(f"phải là 'off', 'full' hoặc số lớn hơn 0: {value}")
+    return hz
+
+
+def newSeed():
+    """
+    Seed của ván mới: màn chơi trong ngày nếu DAILY, nếu không thì ngẫu nhiên
     """
-    Tạo vị trí của hai ống (một ống thẳng dưới và một ống xoay trên) để vẽ lên màn hình
+    return daily_seed() if DAILY else random.randrange(2**31)
+
+
+def newGestureFilter():
+    """
+    Chuỗi lọc cho từng tay: làm mượt -> [hiệu chỉnh] -> ngưỡng kép -> khoảng nghỉ
+    """
+    return GestureFilter(2, smoothing=GESTURE_FILTER, high=GESTURE_THRESHOLD, low=GESTURE_RELEASE,
+                         refractory=FLAP_REFRACTORY, calibrate=GESTURE_CALIBRATION)
+
+
+def drawBoard(renderer, state, playerY, pipeOffset):
+    """
+    Vẽ ống, chim và điểm số của một ván lên một bảng chơi
     """
-    pipeHeight = GAME_SPRITES['pipe'][0].get_height()  # Chiều cao của ống
-    offset = SCREENHEIGHT/3  # Khoảng cách offset
-    y2 = offset + random.randrange(0, int(SCREENHEIGHT - GAME_SPRITES['base'].get_height()  - 1.2 *offset))  # Vị trí Y của ống dưới
-    pipeX = SCREENWIDTH + 10  # Vị trí X ban đầu của ống
-    y1 = pipeHeight - y2 + offset  # Vị trí Y của ống trên
-    pipe = [
-        {'x': pipeX, 'y': -y1}, # Ống trên (xoay 180 độ)
-        {'x': pipeX, 'y': y2} # Ống dưới
-    ]
-    return pipe
+    pipes = state.pipes
+    for i in pipes.live:
+        pipeX = pipes.x[i] + pipeOffset
+        renderer.blit_play_area(GAME_SPRITES['pipe'][0], (pipeX, pipes.upper_y[i]))  # Vẽ ống trên
+        renderer.blit_play_area(GAME_SPRITES['pipe'][1], (pipeX, pipes.lower_y[i]))  # Vẽ ống dưới
+
+    renderer.blit(GAME_SPRITES['player'], (state.player_x, playerY))  # Vẽ chim
+    renderer.blit(*SCORE_HUD.render(state.score))  # Hiển thị điểm số (một lần blit, có cache)
+
+
+def multiGame(players):
+    """
+    Một ván nhiều người chơi: mỗi người một bảng và một camera (players[i] là
+    SlotReader, None nếu chỉ dùng bàn phím), phím 1..N cho người chơi 1..N.
+    Mọi người chơi dùng cùng seed nên gặp cùng một dãy ống. Ván kết thúc khi
+    tất cả đều va chạm.
+    """
+    seed = newSeed()
+    states = [GameState(ENGINE_CONFIG, seed=seed, collider=COLLIDER) for _ in players]
+    filters = [newGestureFilter() for _ in players]
+    lastSeq = [0] * len(players)  # Số thứ tự kết quả cử chỉ đã đưa vào bộ lọc của từng người
+    flaps = [False] * len(players)
+    gestureFlaps = [False] * len(players)  # Lần vỗ cánh đang chờ có đến từ cử chỉ tay không
+    sessions = [None] * len(players)  # Telemetry của từng người chơi
+    if TELEMETRY is not None:
+        sessions = [TELEMETRY.begin(INPUT, seed=seed, players=len(players), player=i) for i in range(len(players))]
+    prevPlayerY = [state.player_y for state in states]
+    COMPOSITOR.invalidate()
+
+    dt = 1.0 / FPS
+    accumulator = 0.0
+    prevTime = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        accumulator += min(now - prevTime, MAX_FRAME_TIME)
+        for session, state in zip(sessions, states):
+            if session is not None and not state.crashed:
+                session.frame(now - prevTime, now)
+        prevTime = now
+
+        for event in pygame.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                quitGame()
+            if event.type == KEYDOWN:
+                if event.key in (K_SPACE, K_UP):
+                    flaps[0] = True
+                elif 0 <= event.key - K_1 < len(players):
+                    flaps[event.key - K_1] = True
+
+        # Kết quả cử chỉ mới của từng người chơi từ shared memory
+        for i, reader in enumerate(players):
+            if reader is None:
+                continue
+            seq, t_capture, angles, predicted = reader.latest()
+            if seq != lastSeq[i]:
+                lastSeq[i] = seq
+                if filters[i].update(t_capture, angles, predicted) and not reader.using_mock:
+                    flaps[i] = gestureFlaps[i] = True
+
+        while accumulator >= dt:
+            accumulator -= dt
+            for i, state in enumerate(states):
+                if state.crashed:
+                    continue
+                prevPlayerY[i] = state.player_y
+                if AUTOPILOT is not None:
+                    flaps[i] = AUTOPILOT(state)
+                events = gameStep(state, flaps[i], sessions[i], gestureFlaps[i])
+                flaps[i] = gestureFlaps[i] = False
+                if events & EVENT_HIT:
+                    print(f"Người chơi {i+1} kết thúc với {state.score} điểm")
+                    if sessions[i] is not None:
+                        sessions[i].end(state.score, state.collision.kind)
+            if all(state.crashed for state in states):
+                return
+
+        # Vẽ mọi bảng rồi cập nhật màn hình một lần
+        alpha = accumulator / dt
+        for renderer, state, y0 in zip(COMPOSITOR.renderers, states, prevPlayerY):
+            renderer.begin_frame()
+            if state.crashed:
+                drawBoard(renderer, state, state.player_y, 0)  # Bảng đã thua đứng yên
+            else:
+                drawBoard(renderer, state, y0 + (state.player_y - y0) * alpha,
+                          state.config.pipe_vel_x * (alpha - 1))
+        COMPOSITOR.end_frame()
+        FPSCLOCK.tick(RENDER_FPS)
+
+
+def runHeadless(args):
+    """
+    Chạy engine không màn hình, không camera và không giới hạn FPS
+    """
+    if args.replay:
+        # Mô phỏng lại replay với tốc độ tối đa và kiểm tra điểm
+        replay = Replay.load(args.replay)
+        t_start = time.perf_counter()
+        state = simulate(replay)
+        elapsed = time.perf_counter() - t_start
+        match = 'khớp' if state.score == replay.score else f'KHÔNG khớp (đã ghi {replay.score})'
+        print(f"[REPLAY] {replay.ticks} bước trong {elapsed*1000:.1f} ms, điểm {state.score} {match}")
+        return
+    config = GameConfig(SCREENWIDTH, SCREENHEIGHT, god_mode=GOD_MODE, **LEVEL)
+    maxFrames = args.frames or sys.maxsize  # --frames 0: không giới hạn
+    if args.batch:
+        from batch_game import run_batch  # Mô phỏng vector hóa bằng NumPy
+        stats = run_batch(args.games, config, seed=args.seed, max_frames=maxFrames)
+    elif args.input == 'autopilot':
+        from autopilot import Autopilot  # Tự chơi bằng bảng tính sẵn
+        stats = run_headless(config, games=args.games, seed=args.seed, max_frames=maxFrames,
+                             policy=Autopilot(config))
+    else:
+        stats = run_headless(config, games=args.games, seed=args.seed, max_frames=maxFrames)
+    print(f"[HEADLESS] {stats['games']} ván, {stats['frames']} frame trong {stats['seconds']:.2f}s "
+          f"({stats['fps']:.0f} frame/s), điểm TB {stats['mean_score']:.2f}, cao nhất {stats['max_score']}")
 
 
 if __name__ == "__main__":
+    # Đọc tham số dòng lệnh
+    parser = argparse.ArgumentParser(description='Flappy Bird điều khiển bằng tay')
+    parser.add_argument('--headless', action='store_true', help='Chạy mô phỏng không màn hình, không camera, không giới hạn FPS')
+    parser.add_argument('--games', type=int, default=100, help='Số ván chơi ở chế độ headless')
+    parser.add_argument('--frames', type=int, default=100000, help='Số frame tối đa mỗi ván ở chế độ headless (0 = không giới hạn)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed ngẫu nhiên của ván đầu tiên ở chế độ headless')
+    parser.add_argument('--batch', action='store_true', help='Chạy tất cả các ván headless song song bằng NumPy (BatchGame)')
+    parser.add_argument('--replay', help='Phát lại file replay (kết hợp --headless để mô phỏng lại với tốc độ tối đa)')
+    parser.add_argument('--speed', type=float, default=1.0, help='Tốc độ phát lại replay (1 = tốc độ thật)')
+    parser.add_argument('--camera', type=int, help='Chỉ dùng camera tại index này')
+    parser.add_argument('--input', choices=input_backends.choices(), default=INPUT, help="Backend điều khiển; 'keyboard' không nạp OpenCV/MediaPipe, 'autopilot' tự chơi (cả với --headless)")
+    parser.add_argument('--no-camera', action='store_true', help='Không dùng camera (giống --input keyboard)')
+    parser.add_argument('--preview', type=previewMode, default=PREVIEW, help="Xem trước camera: 'off', 'full' hoặc số frame mỗi giây")
+    parser.add_argument('--preview-in-game', action='store_true', help='Vẽ xem trước camera ở góc cửa sổ game thay vì cửa sổ riêng')
+    parser.add_argument('--gesture-filter', choices=('one_euro', 'ema', 'none'), default=GESTURE_FILTER, help='Bộ lọc làm mượt góc tay')
+    parser.add_argument('--calibrate', action='store_true', help='Tự hiệu chỉnh khoảng góc của từng tay')
+    parser.add_argument('--adaptive', action='store_true', help='Hand tracking thích ứng: cắt vùng quanh tay, suy luận thưa hơn khi tay đứng yên')
+    parser.add_argument('--latency', action='store_true', help='Hiển thị độ trễ cử chỉ tay trên màn hình game')
+    parser.add_argument('--latency-log', help='Ghi từng mẫu độ trễ ra file .csv hoặc .jsonl')
+    parser.add_argument('--daily', action='store_true', help='Chơi màn chơi của ngày hôm nay (cùng seed cho mọi người)')
+    parser.add_argument('--pixel-collision', action='store_true', help='Va chạm theo điểm ảnh của sprite (không ghi replay)')
+    parser.add_argument('--players', type=int, default=1, help='Số người chơi cạnh nhau, mỗi người một camera')
+    parser.add_argument('--cameras', help='Index camera của từng người chơi, ví dụ 0,2 (mặc định 0..N-1)')
+    parser.add_argument('--mute', action='store_true', help='Tắt âm thanh (không khởi tạo mixer)')
+    parser.add_argument('--telemetry', default=TELEMETRY_DB, help='File SQLite lưu thống kê các ván (xem bằng telemetry.py)')
+    parser.add_argument('--no-telemetry', action='store_true', help='Không ghi thống kê các ván')
+    parser.add_argument('--profile-startup', action='store_true', help='In thời gian và bộ nhớ (RSS) từng giai đoạn khởi động')
+    parser.add_argument('--startup-log', help='Thêm báo cáo khởi động của lần chạy này vào file .jsonl')
+    args = parser.parse_args()
+    if args.headless:
+        if args.batch and args.input == 'autopilot':
+            parser.error('--batch chỉ dùng chính sách tham lam, không kết hợp với --input autopilot')
+        runHeadless(args)
+        sys.exit()
+
     # Đây là điểm bắt đầu chính của game
-    pygame.init()  # Khởi tạo tất cả các module của pygame
-    FPSCLOCK = pygame.time.Clock()  # Đồng hồ để kiểm soát FPS
-    pygame.display.set_caption('Flappy Bird by CodeWithHarry')  # Tiêu đề cửa sổ
-    # Tải các sprite số (0-9)
-    GAME_SPRITES['numbers'] = (
-        pygame.image.load('gallery/sprites/0.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/1.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/2.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/3.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/4.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/5.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/6.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/7.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/8.png').convert_alpha(),
-        pygame.image.load('gallery/sprites/9.png').convert_alpha(),
-    )
-
-    # Tải các sprite khác
-    GAME_SPRITES['message'] =pygame.image.load('gallery/sprites/message.png').convert_alpha()  # Thông điệp chào mừng
-    GAME_SPRITES['base'] =pygame.image.load('gallery/sprites/base.png').convert_alpha()  # Mặt đất
-    GAME_SPRITES['pipe'] =(pygame.transform.rotate(pygame.image.load( PIPE).convert_alpha(), 180),  # Ống trên (xoay)
-    pygame.image.load(PIPE).convert_alpha()  # Ống dưới
-    )
-
-    # Tải âm thanh game
-    GAME_SOUNDS['die'] = pygame.mixer.Sound('gallery/audio/die.wav')  # Âm thanh chết
-    GAME_SOUNDS['hit'] = pygame.mixer.Sound('gallery/audio/hit.wav')  # Âm thanh va chạm
-    GAME_SOUNDS['point'] = pygame.mixer.Sound('gallery/audio/point.wav')  # Âm thanh ghi điểm
-    GAME_SOUNDS['swoosh'] = pygame.mixer.Sound('gallery/audio/swoosh.wav')  # Âm thanh swoosh
-    GAME_SOUNDS['wing'] = pygame.mixer.Sound('gallery/audio/wing.wav')  # Âm thanh vỗ cánh
-
-    GAME_SPRITES['background'] = pygame.image.load(BACKGROUND).convert()  # Nền game
-    GAME_SPRITES['player'] = pygame.image.load(PLAYER).convert_alpha()  # Chim player
+    PREVIEW = args.preview
+    PREVIEW_IN_GAME = PREVIEW_IN_GAME or args.preview_in_game
+    ADAPTIVE_TRACKING = ADAPTIVE_TRACKING or args.adaptive
+    GESTURE_FILTER = args.gesture_filter
+    GESTURE_CALIBRATION = GESTURE_CALIBRATION or args.calibrate
+    SHOW_LATENCY = SHOW_LATENCY or args.latency
+    PIXEL_COLLISION = PIXEL_COLLISION or args.pixel_collision
+    DAILY = DAILY or args.daily
+    LATENCY_LOG = args.latency_log or LATENCY_LOG
+    TELEMETRY_DB = None if args.no_telemetry else args.telemetry
+    IS_MUTED = IS_MUTED or args.mute
+    INPUT = 'keyboard' if args.no_camera else args.input
+    if (SHOW_LATENCY or LATENCY_LOG) and input_backends.uses_camera(INPUT) and args.players == 1:
+        from latency import LatencyMonitor  # Đo độ trễ cử chỉ tay theo giai đoạn
+        LATENCY = LatencyMonitor(export_path=LATENCY_LOG)
+    STARTUP = StartupProfiler(STARTUP_T0, enabled=args.profile_startup, export_path=args.startup_log)
+    STARTUP.add('import', time.perf_counter() - STARTUP_T0)
+    if TELEMETRY_DB:
+        from telemetry import TelemetryStore  # Thống kê các ván, ghi SQLite trong luồng nền
+        TELEMETRY = TelemetryStore(TELEMETRY_DB)
+    # Bắt đầu giải mã ảnh trong nền, song song với tìm camera và tạo cửa sổ
+    ASSETS = AssetManager(cache_dir=ASSET_CACHE_DIR)
+    ASSETS.request(*NUMBERS, MESSAGE, BASE, PIPE, BACKGROUND, PLAYER)
+
+    if args.players > 1:
+        # Nhiều người chơi: mỗi camera một tiến trình hand tracking
+        cameras = [int(c) for c in args.cameras.split(',')] if args.cameras else list(range(args.players))
+        if len(cameras) != args.players:
+            parser.error('--cameras phải có đúng một index cho mỗi người chơi')
+        PLAYERS = [None] * args.players
+        if input_backends.uses_camera(INPUT):
+            from multiplayer import TrackerPool  # Chỉ nạp multiprocessing khi cần
+            with STARTUP.phase('hand tracking'):
+                TRACKERS = TrackerPool(cameras, adaptive=ADAPTIVE_TRACKING, backend=INPUT)
+                PLAYERS = TRACKERS.readers()
+    elif input_backends.uses_camera(INPUT):
+        with STARTUP.phase('hand tracking'):
+            initHandTracking(args.camera)  # Tìm camera trong nền, MediaPipe nạp khi có camera
+    with STARTUP.phase('pygame display'):
+        pygame.display.init()  # Chỉ khởi tạo display; mixer được khởi tạo khi cần âm thanh
+        FPSCLOCK = pygame.time.Clock()  # Đồng hồ để kiểm soát FPS
+        SCREEN = pygame.display.set_mode((SCREENWIDTH * max(1, args.players), SCREENHEIGHT))  # Tạo cửa sổ game (mỗi người chơi một bảng)
+        pygame.display.set_caption('Flappy Bird by CodeWithHarry')  # Tiêu đề cửa sổ
+
+    with STARTUP.phase('sprite'):
+        GAME_SPRITES['numbers'] = tuple(ASSETS.image(path) for path in NUMBERS)  # Các sprite số (0-9)
+        GAME_SPRITES['message'] = ASSETS.image(MESSAGE)  # Thông điệp chào mừng
+        GAME_SPRITES['base'] = ASSETS.image(BASE)  # Mặt đất
+        pipe = ASSETS.image(PIPE)  # Ảnh ống chỉ đọc một lần
+        GAME_SPRITES['pipe'] = (pygame.transform.rotate(pipe, 180), pipe)  # Ống trên (xoay) và ống dưới
+        GAME_SPRITES['background'] = ASSETS.image(BACKGROUND, alpha=False)  # Nền game
+        GAME_SPRITES['player'] = ASSETS.image(PLAYER)  # Chim player
+
+    # Âm thanh game: nạp trong nền; khi tắt tiếng không khởi tạo mixer
+    GAME_SOUNDS = LazySounds({
+        'die': 'gallery/audio/die.wav',  # Âm thanh chết
+        'hit': 'gallery/audio/hit.wav',  # Âm thanh va chạm
+        'point': 'gallery/audio/point.wav',  # Âm thanh ghi điểm
+        'swoosh': 'gallery/audio/swoosh.wav',  # Âm thanh swoosh
+        'wing': 'gallery/audio/wing.wav',  # Âm thanh vỗ cánh
+    }, ASSETS.executor)
+    if not IS_MUTED:
+        configure_mixer()  # Phải đặt trước khi mixer được khởi tạo trong nền
+        GAME_SOUNDS.preload_async()
+        AUDIO = AudioEngine(GAME_SOUNDS)  # Vòng lặp game chỉ đưa sự kiện vào hàng đợi
+
+    SPRITE_METRICS = sprite_metrics(GAME_SPRITES)  # Tính kích thước sprite một lần
+    SCORE_HUD = ScoreHUD(GAME_SPRITES['numbers'], SCREENWIDTH, SCREENHEIGHT*0.12)
+    if PLAYERS:
+        COMPOSITOR = Compositor(SCREEN, len(PLAYERS), GAME_SPRITES['background'], GAME_SPRITES['base'], GROUNDY)
+        BOARDS = COMPOSITOR.renderers
+        RENDERER = BOARDS[0]
+    else:
+        RENDERER = Renderer(SCREEN, GAME_SPRITES['background'], GAME_SPRITES['base'], GROUNDY)
+        BOARDS = [RENDERER]
+    if PREVIEW_IN_GAME and PREVIEW != 'off' and gesture is not None:
+        CAMERA_PREVIEW = CameraPreview()
+    if SHOW_LATENCY and LATENCY is not None:
+        LATENCY_OVERLAY = LatencyOverlay(LATENCY, (4, SCREENHEIGHT - 4))  # Góc dưới bên trái, trên mặt đất
+    ENGINE_CONFIG = GameConfig.from_metrics(SPRITE_METRICS, SCREENWIDTH, SCREENHEIGHT, god_mode=GOD_MODE, **LEVEL)  # Kích thước sprite cho engine
+    if PIXEL_COLLISION:
+        COLLIDER = Collider(ENGINE_CONFIG, SpriteMasks.from_sprites(GAME_SPRITES))  # Mặt nạ tính một lần
+    if INPUT == 'autopilot':
+        from autopilot import Autopilot  # Chỉ nạp khi dùng autopilot
+        with STARTUP.phase('autopilot'):
+            AUTOPILOT = Autopilot(ENGINE_CONFIG)  # Tính sẵn bảng khả năng tới được
+
+    # Phát lại replay rồi thoát
+    if args.replay:
+        mainGame(Replay.load(args.replay), speed=args.speed)
+        quitGame()
 
     # Vòng lặp chính của game
     while True:
         welcomeScreen()  # Hiển thị màn hình chào mừng cho đến khi người dùng nhấn nút
-        mainGame()  # Chạy hàm game chính
+        if PLAYERS:
+            multiGame(PLAYERS)  # Ván nhiều người chơi
+        else:
+            mainGame()  # Chạy hàm game chính
@@ -0,0 +1,183 @@
+"""
+Chế độ nhiều người chơi: mỗi camera một tiến trình hand tracking riêng.
+
+Mỗi tiến trình con chạy GesturePipeline (camera + MediaPipeHand) của một
+người chơi, nên suy luận chạy song song trên nhiều nhân CPU thay vì chung một
+GIL. Kết quả (số thứ tự, thời điểm chụp, góc từng tay, là góc dự đoán) được
+ghi vào một hàng của khối shared memory; tiến trình game đọc các hàng đó qua
+SlotReader, có cùng giao diện latest() như GesturePipeline.
+
+Mỗi hàng được bảo vệ bằng seqlock: version của hàng là số nguyên int64
+trong một vùng riêng ở đầu khối (không nằm chung với dữ liệu float). Tiến
+trình con tăng version lên số lẻ trước khi ghi và lên số chẵn sau khi ghi
+(version được ghi sau cùng); bên đọc đọc version, sao chép cả hàng ra bản
+sao cục bộ, đọc lại version và thử lại nếu version lẻ hoặc đã đổi. Không cần
+khóa giữa các tiến trình.
+
+Giả định về thứ tự bộ nhớ: mỗi lần ghi/đọc version là một lệnh 8 byte căn lề
+(nguyên tử), và CPU không đảo thứ tự các lệnh ghi với nhau hay các lệnh đọc
+với nhau, như trên x86/x86-64 (TSO). Python/NumPy không có memory barrier;
+mỗi phép gán phần tử NumPy là một lời gọi C riêng nên trình biên dịch cũng
+không đảo thứ tự chúng. Trên CPU có thứ tự bộ nhớ yếu (ARM) bên đọc có thể
+thấy dữ liệu cũ cùng version mới; khi đó cần thay seqlock bằng khóa
+(multiprocessing.Lock) cho mỗi hàng.
+"""
+
+# Import các thư viện cần thiết
+import math  # Kiểm tra NaN
+import multiprocessing as mp  # Tiến trình con cho từng camera
+from multiprocessing import shared_memory  # Khe kết quả dùng chung
+import numpy as np  # Thư viện xử lý mảng số
+
+# Các cột của một hàng: số thứ tự, thời điểm chụp, góc dự đoán, dùng mock, góc từng tay
+_SEQ, _TIME, _PREDICTED, _MOCK, _ANGLES = range(5)
+
+
+# Lớp SharedSlots - N hàng kết quả trong shared memory
+class SharedSlots:
+    def __init__(self, count, num_hands=2, name=None):
+        self.count = count
+        self.num_hands = num_hands
+        shape = (count, _ANGLES + num_hands)
+        size = count * 8 + int(np.prod(shape)) * 8  # version int64 của từng hàng, rồi các hàng float64
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Tiến trình con tạo bằng multiprocessing dùng chung resource tracker với
+            # tiến trình chính, nên khối chỉ bị xóa một lần khi tiến trình chính unlink
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.versions = np.ndarray((count,), dtype=np.int64, buffer=self.shm.buf)
+        self.rows = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf, offset=count * 8)
+        if name is None:
+            self.versions[:] = 0
+            self.rows[:] = 0.0
+            self.rows[:, _ANGLES:] = np.nan
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, index, seq, t_capture, angles, predicted=False, mock=False):
+        """
+        Ghi kết quả của người chơi index (chỉ một tiến trình ghi mỗi hàng)
+        """
+        versions, row = self.versions, self.rows[index]
+        version = int(versions[index])
+        versions[index] = version + 1  # Lẻ: đang ghi
+        row[_SEQ] = seq
+        row[_TIME] = t_capture
+        row[_PREDICTED] = predicted
+        row[_MOCK] = mock
+        for i in range(self.num_hands):
+            a = angles[i] if i < len(angles) else None
+            row[_ANGLES + i] = np.nan if a is None else a
+        versions[index] = version + 2  # Chẵn: đã ghi xong (ghi sau cùng)
+
+    def read(self, index):
+        """
+        Đọc một bản sao nhất quán của hàng index: (seq, t_capture, angles, predicted, mock)
+        """
+        versions, row = self.versions, self.rows[index]
+        while True:
+            version = int(versions[index])
+            if version % 2 == 0:
+                copy = row.copy()  # Bản sao cục bộ giữa hai lần đọc version
+                if int(versions[index]) == version:
+                    break
+        angles = tuple(None if math.isnan(a) else float(a) for a in copy[_ANGLES:])
+        return int(copy[_SEQ]), float(copy[_TIME]), angles, bool(copy[_PREDICTED]), bool(copy[_MOCK])
+
+    def close(self, unlink=False):
+        self.versions = self.rows = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# Lớp SlotReader - đọc kết quả của một người chơi như một GesturePipeline
+class SlotReader:
+    def __init__(self, slots, index):
+        self.slots = slots
+        self.index = index
+
+    def latest(self):
+        return self.slots.read(self.index)[:4]  # (seq, t_capture, angles, predicted)
+
+    @property
+    def using_mock(self):
+        return self.slots.read(self.index)[4]
+
+    def take_preview(self):
+        return None  # Tiến trình con không gửi ảnh xem trước
+
+    def show_preview(self):
+        pass
+
+
+# Lớp SlotSink - sink của GesturePipeline ghi mỗi kết quả vào một hàng của SharedSlots
+class SlotSink:
+    def __init__(self, slots, index, pipeline=None):
+        self.slots = slots
+        self.index = index
+        self.pipeline = pipeline  # GesturePipeline ghi vào hàng (để biết có dùng mock không)
+
+    def __call__(self, seq, t_capture, angles, predicted=False):
+        mock = self.pipeline is not None and self.pipeline.using_mock
+        self.slots.write(self.index, seq, t_capture, angles, predicted, mock)
+
+
+def _tracker_main(index, camera_index, slots_name, count, num_hands, adaptive, backend, stop):
+    """
+    Hàm chạy trong tiến trình con: GesturePipeline của một camera ghi vào hàng index
+    """
+    from camera import CameraSource
+    from gesture_pipeline import GesturePipeline
+    from input_backends import hand_factory
+
+    slots = SharedSlots(count, num_hands, name=slots_name)
+    factory = hand_factory(backend, static_image_mode=False, max_num_hands=num_hands, roi=adaptive)
+    sink = SlotSink(slots, index)
+    # Không ghi nhớ camera: mỗi người chơi được gán cố định một index; MediaPipe nạp khi có camera
+    pipeline = GesturePipeline(CameraSource(force_index=camera_index, config_path=None), None,
+                               max_num_hands=num_hands, preview='off', adaptive=adaptive, sink=sink,
+                               hand_factory=factory)
+    sink.pipeline = pipeline
+    pipeline.start()
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    pipeline.stop()
+    slots.close()
+
+
+# Lớp TrackerPool - các tiến trình hand tracking, mỗi camera một tiến trình
+class TrackerPool:
+    def __init__(self, camera_indices, num_hands=2, adaptive=False, backend='auto'):
+        self.camera_indices = list(camera_indices)
+        self.slots = SharedSlots(len(self.camera_indices), num_hands)
+        # 'spawn' để tiến trình con không kế thừa trạng thái pygame/OpenCV của tiến trình chính
+        ctx = mp.get_context('spawn')
+        self._stop = ctx.Event()
+        self.processes = [
+            ctx.Process(target=_tracker_main, name=f'tracker-{i}', daemon=True,
+                        args=(i, cam, self.slots.name, len(self.camera_indices), num_hands, adaptive,
+                              backend, self._stop))
+            for i, cam in enumerate(self.camera_indices)
+        ]
+        for process in self.processes:
+            process.start()
+
+    def readers(self):
+        return [SlotReader(self.slots, i) for i in range(len(self.camera_indices))]
+
+    def stop(self, timeout=2.0):
+        """
+        Dừng các tiến trình con và giải phóng shared memory
+        """
+        self._stop.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.slots.close(unlink=True)
@@ -0,0 +1,374 @@
+"""
+Benchmark hiệu năng các đường nóng của vòng lặp game và hand tracking.
+
+Chạy offline (SDL dùng driver video/âm thanh dummy, không cần cửa sổ hay
+camera) trên dữ liệu tổng hợp hoặc một clip đã ghi bằng gesture_bench.py.
+Mỗi case báo cáo:
+    ns/op   : thời gian một lần gọi (lần đo nhanh nhất trong --repeat lần)
+    op/s    : số lần gọi mỗi giây (với các case 'tick' là số frame/giây)
+    B/op    : bộ nhớ cấp phát tạm thời lớn nhất của một lần gọi (tracemalloc)
+
+Lưu kết quả làm mốc rồi so sánh sau mỗi thay đổi:
+    python perf_bench.py --save bench/baseline.json
+    python perf_bench.py --compare bench/baseline.json        # mã thoát 1 nếu có case chậm đi
+    python perf_bench.py -k collision -k hand --clip clips/a   # chỉ một số case, góc tay đã ghi
+"""
+
+# Import các thư viện cần thiết
+import os  # Biến môi trường SDL
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Không mở cửa sổ thật
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import gc  # Tắt GC khi đo để kết quả ổn định
+import sys  # Mã thoát, phiên bản Python
+import json  # Lưu và đọc file mốc
+import time  # Đo thời gian
+import argparse  # Đọc tham số dòng lệnh
+import platform  # Thông tin máy trong file mốc
+import tracemalloc  # Đo bộ nhớ cấp phát mỗi lần gọi
+
+CASES = {}  # Tên case -> hàm setup(args) trả về hàm op không tham số
+
+
+def case(name):
+    """
+    Đăng ký một case; hàm setup(args) chuẩn bị dữ liệu và trả về hàm op
+    """
+    def decorator(setup):
+        CASES[name] = setup
+        return setup
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+def _playing_state(config, seed=0, frames=120):
+    """
+    Ván chơi đã chạy một lúc (chim ở giữa các ống) bằng chính sách tham lam
+    """
+    from game_engine import GameState, step, greedy_policy
+    state = GameState(config, seed=seed)
+    for _ in range(frames):
+        step(state, greedy_policy(state))
+        if state.crashed:
+            return _playing_state(config, seed + 1, frames)
+    return state
+
+
+@case('collision.check')
+def _collision(args):
+    from game_engine import GameConfig
+    from collision import Collider
+    config = GameConfig()
+    state = _playing_state(config)
+    collider = Collider(config)
+    x, y, pipes = state.player_x, state.player_y, state.pipes
+    return lambda: collider.check(x, y, y + 6, pipes)
+
+
+@case('level.next_pipe')
+def _level(args):
+    from game_engine import GameConfig
+    from level import LevelGenerator
+    level = LevelGenerator(GameConfig(difficulty_ramp=100, pipe_gap_end=120), seed=0)
+    return lambda: next(level)
+
+
+@case('engine.step')
+def _engine_step(args):
+    from game_engine import GameConfig, GameState, step, greedy_policy
+    config = GameConfig()
+    box = [GameState(config, seed=0)]
+
+    def op():
+        state = box[0]
+        if state.crashed:
+            state = box[0] = GameState(config, seed=state.frame)
+        step(state, greedy_policy(state))
+    return op
+
+
+@case('autopilot.decide')
+def _autopilot(args):
+    from game_engine import GameConfig
+    from autopilot import Autopilot
+    config = GameConfig()
+    state = _playing_state(config)
+    pilot = Autopilot(config)
+    return lambda: pilot(state)
+
+
+@case('batch.step[1000]')
+def _batch_step(args):
+    from batch_game import BatchGame, greedy_policy
+    batch = BatchGame(1000, seed=0)
+
+    def op():
+        if not batch.alive.any():
+            batch.reset()
+        batch.step(greedy_policy(batch))
+    return op
+
+
+# ---------------------------------------------------------------------------
+# Vẽ (pygame với driver dummy)
+# ---------------------------------------------------------------------------
+
+def _game_module():
+    """
+    main.py với sprite, HUD và Renderer đã được tạo như khi chạy game
+    """
+    import pygame
+    import main as game
+    if game.RENDERER is None:
+        pygame.display.init()
+        game.SCREEN = pygame.display.set_mode((game.SCREENWIDTH, game.SCREENHEIGHT))
+        load = lambda path: pygame.image.load(path).convert_alpha()
+        pipe = load(game.PIPE)
+        game.GAME_SPRITES.update({
+            'numbers': tuple(load(path) for path in game.NUMBERS),
+            'message': load(game.MESSAGE),
+            'base': load(game.BASE),
+            'pipe': (pygame.transform.rotate(pipe, 180), pipe),
+            'background': pygame.image.load(game.BACKGROUND).convert(),
+            'player': load(game.PLAYER),
+        })
+        game.SPRITE_METRICS = game.sprite_metrics(game.GAME_SPRITES)
+        game.SCORE_HUD = game.ScoreHUD(game.GAME_SPRITES['numbers'], game.SCREENWIDTH, game.SCREENHEIGHT*0.12)
+        game.RENDERER = game.Renderer(game.SCREEN, game.GAME_SPRITES['background'],
+                                      game.GAME_SPRITES['base'], game.GROUNDY)
+        game.ENGINE_CONFIG = game.GameConfig.from_metrics(game.SPRITE_METRICS, game.SCREENWIDTH, game.SCREENHEIGHT)
+    return game
+
+
+@case('game.tick')
+def _game_tick(args):
+    """
+    Một frame của mainGame(): main.gameStep rồi main.renderFrame (ống, chim, điểm số)
+    """
+    from game_engine import GameState, greedy_policy
+    game = _game_module()
+    box = [GameState(game.ENGINE_CONFIG, seed=0)]
+    game.RENDERER.invalidate()
+
+    def op():
+        state = box[0]
+        if state.crashed:
+            state = box[0] = GameState(game.ENGINE_CONFIG, seed=state.frame)
+        prevPlayerY = state.player_y
+        game.gameStep(state, greedy_policy(state))
+        game.renderFrame(state, prevPlayerY, 0.5)
+    return op
+
+
+@case('hud.score[same]')
+def _hud_same(args):
+    game = _game_module()
+    hud, screen = game.SCORE_HUD, game.SCREEN
+    return lambda: screen.blit(*hud.render(42))
+
+
+@case('hud.score[changing]')
+def _hud_changing(args):
+    game = _game_module()
+    hud, screen = game.SCORE_HUD, game.SCREEN
+    counter = iter(range(10**9))
+    return lambda: screen.blit(*hud.render(next(counter) % 1000))
+
+
+# ---------------------------------------------------------------------------
+# Hand tracking
+# ---------------------------------------------------------------------------
+
+def _hand():
+    """
+    Phần NumPy/OpenCV của MediaPipeHand (chạy được cả khi chưa cài MediaPipe)
+    """
+    from utils_mediapipe import HandGeometry
+    return HandGeometry(max_num_hands=2)
+
+
+def _joints(args, count=64):
+    """
+    Khớp 3D chuẩn hóa [count, 2 tay, 21, 3]: từ clip đã ghi hoặc tổng hợp
+    """
+    import numpy as np
+    if args.clip:
+        from gesture_bench import load_clip
+        joint = np.asarray(load_clip(args.clip)['joint'][:count], dtype=np.float64)
+        if len(joint):
+            return joint
+    rng = np.random.default_rng(0)
+    return rng.uniform(0.2, 0.8, size=(count, 2, 21, 3))
+
+
+def _frame(args):
+    """
+    Ảnh camera BGR: frame đầu của clip đã ghi hoặc ảnh 640x480 tổng hợp
+    """
+    import numpy as np
+    if args.clip:
+        from gesture_bench import load_clip
+        frames = load_clip(args.clip)['frames']
+        if frames is not None:
+            return np.array(frames[0])
+    return np.full((480, 640, 3), 96, dtype=np.uint8)
+
+
+def _mediapipe_result(joint):
+    """
+    Kết quả có cùng cấu trúc với kết quả MediaPipe Hands cho các khớp joint [tay,21,3]
+    """
+    from types import SimpleNamespace as NS
+    return NS(
+        multi_hand_landmarks=[NS(landmark=[NS(x=x, y=y, z=z) for x, y, z in hand]) for hand in joint],
+        multi_handedness=[NS(classification=[NS(label=label, score=0.95)])
+                          for label in ('Left', 'Right')[:len(joint)]],
+    )
+
+
+@case('hand.convert_3d_joint_to_angle')
+def _joint_to_angle(args):
+    hand = _hand()
+    joints = _joints(args)
+    counter = iter(range(10**9))
+    return lambda: hand.convert_3d_joint_to_angle(joints[next(counter) % len(joints)])
+
+
+@case('hand.result_to_param')
+def _result_to_param(args):
+    hand = _hand()
+    img = _frame(args)
+    results = [_mediapipe_result(joint) for joint in _joints(args)]
+    counter = iter(range(10**9))
+    return lambda: hand.result_to_param(results[next(counter) % len(results)], img, flip=True)
+
+
+@case('hand.draw2d')
+def _draw2d(args):
+    hand = _hand()
+    img = _frame(args)
+    param = hand.result_to_param(_mediapipe_result(_joints(args)[0]), img)
+    canvas = img.copy()
+    return lambda: hand.draw2d(canvas, param)
+
+
+# ---------------------------------------------------------------------------
+# Đo và so sánh
+# ---------------------------------------------------------------------------
+
+def measure(op, min_time=0.2, repeat=5):
+    """
+    Thời gian (ns) một lần gọi op: tăng số lần gọi đến khi một lượt đo kéo
+    dài ít nhất min_time giây, lấy lượt nhanh nhất trong repeat lượt
+    """
+    number = 1
+    while True:
+        t_start = time.perf_counter_ns()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter_ns() - t_start
+        if elapsed >= min_time * 1e9 / 4 or number >= 1 << 24:
+            break
+        number *= 2
+    number = max(1, int(number * min_time * 1e9 / max(elapsed, 1)))
+    best = float('inf')
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t_start = time.perf_counter_ns()
+            for _ in range(number):
+                op()
+            best = min(best, (time.perf_counter_ns() - t_start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def allocated(op, number=200):
+    """
+    Trung bình bộ nhớ (byte) cấp phát tạm thời lớn nhất của một lần gọi op
+    """
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(number):
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            op()
+            total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return total / number
+
+
+def run(args):
+    """
+    Chạy các case được chọn, in bảng kết quả; trả về {tên: kết quả}
+    """
+    results = {}
+    print(f"{'case':<34} {'ns/op':>12} {'op/s':>12} {'B/op':>9}")
+    for name, setup in CASES.items():
+        if args.k and not any(k in name for k in args.k):
+            continue
+        op = setup(args)
+        op()  # Khởi động (cache, import, cấp phát lần đầu)
+        ns = measure(op, args.min_time, args.repeat)
+        alloc = allocated(op)
+        results[name] = {'ns_per_op': ns, 'ops_per_s': 1e9 / ns, 'alloc_bytes': alloc}
+        print(f"{name:<34} {ns:12.0f} {1e9 / ns:12.0f} {alloc:9.0f}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    So sánh với file mốc; trả về danh sách case chậm hơn mốc quá threshold
+    """
+    regressions = []
+    print(f"\nSo với mốc {baseline['meta'].get('time', '?')} ({baseline['meta'].get('python', '?')}):")
+    print(f"{'case':<34} {'mốc ns/op':>12} {'ns/op':>12} {'thay đổi':>9}")
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<34} {'-':>12} {result['ns_per_op']:12.0f}      mới")
+            continue
+        change = result['ns_per_op'] / base['ns_per_op'] - 1
+        mark = ''
+        if change > threshold:
+            mark = '  CHẬM HƠN'
+            regressions.append(name)
+        print(f"{name:<34} {base['ns_per_op']:12.0f} {result['ns_per_op']:12.0f} {change:+8.1%}{mark}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark vòng lặp game và hand tracking')
+    parser.add_argument('-k', action='append', help='Chỉ chạy case có tên chứa chuỗi này (lặp lại được)')
+    parser.add_argument('--clip', help='Clip gesture_bench.py để lấy khớp tay và ảnh camera thật')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Thời gian tối thiểu (giây) của một lượt đo')
+    parser.add_argument('--repeat', type=int, default=5, help='Số lượt đo mỗi case (lấy lượt nhanh nhất)')
+    parser.add_argument('--save', help='Lưu kết quả làm mốc vào file JSON')
+    parser.add_argument('--compare', help='So sánh với file mốc JSON')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Chậm hơn mốc quá tỉ lệ này là hồi quy')
+    parser.add_argument('--list', action='store_true', help='Liệt kê các case')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(CASES))
+        sys.exit()
+    results = run(args)
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or '.', exist_ok=True)
+        meta = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                'machine': platform.machine(), 'platform': platform.platform()}
+        with open(args.save, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+        print(f"Đã lưu mốc: {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
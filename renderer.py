@@ -0,0 +1,227 @@
+"""
+Các tiện ích vẽ cho game: bảng kích thước sprite, HUD điểm số có cache, ảnh
+camera xem trước và bảng độ trễ trong cửa sổ game, Renderer chỉ cập nhật
+các vùng màn hình thay đổi (dirty rectangles) và Compositor ghép nhiều bảng
+chơi cạnh nhau trong một cửa sổ.
+"""
+
+# Import các thư viện cần thiết
+from collections import OrderedDict  # Cache LRU cho bề mặt điểm số
+import pygame  # Thư viện game chính
+
+
+def sprite_metrics(sprites):
+    """
+    Tính kích thước (rộng, cao) của các sprite một lần khi tải game.
+    Với các nhóm sprite (numbers, pipe) trả về tuple kích thước theo thứ tự.
+    """
+    metrics = {}
+    for name, sprite in sprites.items():
+        if isinstance(sprite, (tuple, list)):
+            metrics[name] = tuple(s.get_size() for s in sprite)
+        else:
+            metrics[name] = sprite.get_size()
+    return metrics
+
+
+# Lớp ScoreHUD - vẽ điểm số bằng sprite chữ số, có cache theo điểm
+class ScoreHUD:
+    """
+    Ghép các chữ số của một điểm thành một bề mặt duy nhất và giữ trong cache
+    LRU nhỏ, nên mỗi frame chỉ cần một lần blit; bề mặt chỉ được dựng lại khi
+    điểm thay đổi.
+    """
+
+    def __init__(self, digits, screen_width, y, maxsize=8):
+        self.digits = digits  # Sprite chữ số 0-9
+        self.digit_widths = [d.get_width() for d in digits]
+        self.height = max(d.get_height() for d in digits)
+        self.screen_width = screen_width
+        self.y = y  # Vị trí Y của điểm số
+        self.maxsize = maxsize  # Số điểm tối đa giữ trong cache
+        self._cache = OrderedDict()  # điểm -> (bề mặt, vị trí)
+
+    def render(self, score):
+        """
+        Trả về (bề mặt, vị trí) của điểm số, dựng mới nếu chưa có trong cache
+        """
+        entry = self._cache.get(score)
+        if entry is not None:
+            self._cache.move_to_end(score)
+            return entry
+
+        myDigits = [int(x) for x in str(score)]  # Chuyển điểm thành danh sách chữ số
+        width = sum(self.digit_widths[digit] for digit in myDigits)  # Tính tổng chiều rộng
+        surface = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        Xoffset = 0
+        for digit in myDigits:
+            surface.blit(self.digits[digit], (Xoffset, 0))  # Vẽ từng chữ số
+            Xoffset += self.digit_widths[digit]
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()  # Cùng định dạng màn hình để blit nhanh
+
+        entry = (surface, ((self.screen_width - width)/2, self.y))  # Căn giữa
+        self._cache[score] = entry
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)  # Bỏ điểm lâu nhất không dùng
+        return entry
+
+
+# Lớp CameraPreview - ảnh camera thu nhỏ vẽ trong cửa sổ game
+class CameraPreview:
+    """
+    Thay cho cửa sổ OpenCV riêng: ảnh xem trước RGB (đã thu nhỏ ở luồng
+    camera) được chuyển thành bề mặt pygame khi có frame mới và vẽ ở góc màn
+    hình mỗi frame như một sprite động.
+    """
+
+    def __init__(self, pos=(4, 4)):
+        self.pos = pos  # Vị trí góc trên bên trái
+        self.surface = None  # Frame xem trước gần nhất
+
+    def update(self, rgb):
+        """
+        Tạo bề mặt từ mảng RGB (cao, rộng, 3); sao chép ngay vì buffer sẽ bị dùng lại
+        """
+        height, width = rgb.shape[:2]
+        surface = pygame.image.frombuffer(rgb, (width, height), 'RGB')
+        if pygame.display.get_surface() is not None:
+            self.surface = surface.convert()  # Bản sao cùng định dạng màn hình
+        else:
+            self.surface = surface.copy()
+
+    def draw(self, renderer):
+        if self.surface is not None:
+            renderer.blit(self.surface, self.pos)
+
+
+# Lớp LatencyOverlay - bảng độ trễ cử chỉ tay vẽ trên màn hình game
+class LatencyOverlay:
+    """
+    Hiển thị p50/p95 của một số giai đoạn từ latency.LatencyMonitor. Bề mặt
+    chữ chỉ được dựng lại mỗi interval giây, các frame khác chỉ blit lại.
+    """
+
+    def __init__(self, monitor, bottomleft, stages=('inference', 'pipeline', 'total'), interval=0.5):
+        self.monitor = monitor
+        self.stages = stages
+        self.interval = interval
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 16)
+        self.height = self.font.get_linesize() * len(stages)
+        self.pos = (bottomleft[0], bottomleft[1] - self.height)  # Vị trí góc trên bên trái
+        self.surface = None
+        self._next = 0.0  # Thời điểm dựng lại bề mặt tiếp theo
+
+    def draw(self, renderer, now):
+        if now >= self._next:
+            self._next = now + self.interval
+            lines = []
+            for stage in self.stages:
+                p = self.monitor.percentiles(stage, (50, 95))
+                lines.append(f"{stage} {p[0]:.1f}/{p[1]:.1f} ms" if p is not None else f"{stage} -")
+            rendered = [self.font.render(line, True, (255, 255, 255), (0, 0, 0)) for line in lines]
+            self.surface = pygame.Surface((max(s.get_width() for s in rendered), self.height))
+            for i, s in enumerate(rendered):
+                self.surface.blit(s, (0, i * self.font.get_linesize()))
+        renderer.blit(self.surface, self.pos)
+
+
+# Lớp Renderer - vẽ theo dirty rectangles trên lớp nền tĩnh dựng sẵn
+class Renderer:
+    """
+    Nền và mặt đất được ghép sẵn thành một bề mặt tĩnh. Mỗi frame, Renderer
+    xóa các vùng đã vẽ ở frame trước bằng lớp tĩnh, vẽ các sprite động (ống,
+    chim, điểm số) và chỉ cập nhật những vùng đó lên màn hình thay vì toàn bộ.
+    """
+
+    def __init__(self, screen, background, base, ground_y):
+        self.screen = screen  # Màn hình hoặc subsurface (một bảng chơi của Compositor)
+        # Vùng của bảng trên màn hình thật (subsurface vẽ theo tọa độ riêng của nó)
+        self.bounds = screen.get_rect(topleft=screen.get_abs_offset())
+        # Lớp tĩnh: nền + mặt đất (vị trí X của mặt đất không đổi)
+        self.static = background.copy()
+        self.static.blit(base, (0, ground_y))
+        if pygame.display.get_surface() is not None:
+            self.static = self.static.convert()  # Cùng định dạng màn hình để blit nhanh
+        # Vùng phía trên mặt đất: ống được cắt theo vùng này để mặt đất luôn nằm trên ống
+        self.play_area = pygame.Rect(0, 0, screen.get_width(), int(ground_y))
+        self._prev = []  # Các vùng đã vẽ ở frame trước
+        self._cur = []  # Các vùng đã vẽ ở frame hiện tại
+        self._full = True  # True nếu frame tiếp theo phải vẽ lại toàn màn hình
+
+    def invalidate(self):
+        """
+        Yêu cầu vẽ lại toàn màn hình ở frame tiếp theo (đổi màn hình, cửa sổ bị che...)
+        """
+        self._full = True
+
+    def begin_frame(self):
+        """
+        Xóa các sprite của frame trước bằng lớp tĩnh
+        """
+        if self._full:
+            self.screen.blit(self.static, (0, 0))
+            self._prev.clear()
+        else:
+            for rect in self._prev:
+                self.screen.blit(self.static, rect, rect)
+
+    def blit(self, surface, pos):
+        """
+        Vẽ một sprite động và ghi nhận vùng bị thay đổi
+        """
+        self._cur.append(self.screen.blit(surface, pos))
+
+    def blit_play_area(self, surface, pos):
+        """
+        Vẽ sprite bị cắt ở mép trên mặt đất (dùng cho ống)
+        """
+        self.screen.set_clip(self.play_area)
+        self._cur.append(self.screen.blit(surface, pos))
+        self.screen.set_clip(None)
+
+    def end_frame(self, update=True):
+        """
+        Cập nhật lên màn hình chỉ các vùng đã thay đổi (vùng cũ + vùng mới).
+        Trả về các vùng đó theo tọa độ màn hình; update=False để người gọi tự
+        cập nhật gộp (Compositor).
+        """
+        if self._full:
+            dirty = [self.bounds]
+            self._full = False
+        else:
+            self._prev.extend(self._cur)
+            dirty = [rect.move(self.bounds.topleft) for rect in self._prev]
+        if update:
+            pygame.display.update(dirty)
+        # Vùng của frame này trở thành vùng cần xóa ở frame sau
+        prev = self._prev
+        prev.clear()
+        self._prev, self._cur = self._cur, prev
+        return dirty
+
+
+# Lớp Compositor - nhiều bảng chơi cạnh nhau trên một cửa sổ
+class Compositor:
+    """
+    Chia màn hình thành các subsurface cạnh nhau, mỗi bảng một Renderer
+    riêng; end_frame() gộp vùng thay đổi của mọi bảng vào một lần cập nhật
+    màn hình.
+    """
+
+    def __init__(self, screen, count, background, base, ground_y):
+        width = screen.get_width() // count
+        height = screen.get_height()
+        self.renderers = [Renderer(screen.subsurface((i * width, 0, width, height)), background, base, ground_y)
+                          for i in range(count)]
+
+    def invalidate(self):
+        for renderer in self.renderers:
+            renderer.invalidate()
+
+    def end_frame(self):
+        dirty = []
+        for renderer in self.renderers:
+            dirty.extend(renderer.end_frame(update=False))
+        pygame.display.update(dirty)
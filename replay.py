@@ -0,0 +1,126 @@
+"""
+Ghi và phát lại ván chơi một cách tất định.
+
+Một replay gồm seed của ván (GameState dùng random.Random(seed) riêng), thông số
+GameConfig, chuỗi bit vỗ cánh cho từng bước mô phỏng và mẫu góc tay của từng
+bước. Vì engine tất định, chạy lại step() với cùng seed và cùng chuỗi vỗ cánh
+cho ra đúng ván chơi đã ghi.
+
+Định dạng file (little-endian):
+    header : magic 'FBRP', version (u16), seed (i64), số bước (u32), điểm (u32), số tay (u16)
+    config : 7 x i32 (kích thước màn hình và sprite) + god_mode (u8)
+             + 4 x f64 (khe, khe cuối, khoảng cách ống, khoảng cách cuối) + số ống tăng độ khó (u32)
+    body   : zlib( bit vỗ cánh (ceil(số bước/8) byte) + góc tay float32 (số bước x số tay, NaN = không có tay) )
+"""
+
+# Import các thư viện cần thiết
+import math  # Kiểm tra NaN
+import struct  # Đóng gói dữ liệu nhị phân
+import sys  # Kiểm tra thứ tự byte của máy
+import zlib  # Nén phần thân replay
+from array import array  # Mảng float32 gọn nhẹ cho góc tay
+
+from game_engine import GameConfig, GameState, step
+
+MAGIC = b'FBRP'
+VERSION = 3  # 2: va chạm quét theo bước (collision.Collider), 3: màn chơi theo level.LevelGenerator
+_HEADER = struct.Struct('<4sHqIIH')
+_CONFIG = struct.Struct('<7iB4dI')
+
+
+# Lớp Replay - dữ liệu một ván chơi đã ghi
+class Replay:
+    def __init__(self, seed, config, num_hands=2):
+        self.seed = seed
+        self.config = config
+        self.num_hands = num_hands
+        self.ticks = 0  # Số bước mô phỏng đã ghi
+        self.score = 0  # Điểm cuối ván (để kiểm tra khi phát lại)
+        self.flaps = bytearray()  # Chuỗi bit vỗ cánh, 1 bit mỗi bước
+        self.angles = array('f')  # Góc tay của từng bước (NaN = không có tay)
+
+    def record(self, flap, angles=None):
+        """
+        Ghi một bước mô phỏng: có vỗ cánh hay không và góc của từng tay
+        """
+        byte, bit = divmod(self.ticks, 8)
+        if bit == 0:
+            self.flaps.append(0)
+        if flap:
+            self.flaps[byte] |= 1 << bit
+        for i in range(self.num_hands):
+            a = angles[i] if angles is not None and i < len(angles) else None
+            self.angles.append(float('nan') if a is None else a)
+        self.ticks += 1
+
+    def flap_at(self, tick):
+        """
+        Bước thứ tick có vỗ cánh hay không
+        """
+        byte, bit = divmod(tick, 8)
+        return bool(self.flaps[byte] >> bit & 1)
+
+    def angles_at(self, tick):
+        """
+        Góc của từng tay ở bước thứ tick (None nếu không có tay)
+        """
+        start = tick * self.num_hands
+        return tuple(None if math.isnan(a) else a for a in self.angles[start:start + self.num_hands])
+
+    def save(self, path):
+        """
+        Ghi replay ra file nhị phân
+        """
+        c = self.config
+        angles = array('f', self.angles)
+        if angles.itemsize != 4:
+            raise RuntimeError("array('f') phải là float32")
+        if sys.byteorder == 'big':
+            angles.byteswap()  # Luôn lưu little-endian
+        body = bytes(self.flaps) + angles.tobytes()
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.seed, self.ticks, self.score, self.num_hands))
+            f.write(_CONFIG.pack(int(c.screen_width), int(c.screen_height),
+                                 int(c.player_width), int(c.player_height),
+                                 int(c.pipe_width), int(c.pipe_height), int(c.base_height),
+                                 int(c.god_mode), c.pipe_gap, c.pipe_gap_end,
+                                 c.pipe_spacing, c.pipe_spacing_end, c.difficulty_ramp))
+            f.write(zlib.compress(body))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Đọc replay từ file nhị phân
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, seed, ticks, score, num_hands = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"File replay không hợp lệ: {path}")
+        sw, sh, pw, ph, pipew, pipeh, baseh, god, gap, gap_end, spacing, spacing_end, ramp = \
+            _CONFIG.unpack_from(data, _HEADER.size)
+        config = GameConfig(sw, sh, pw, ph, pipew, pipeh, baseh, god_mode=bool(god),
+                            pipe_gap=gap, pipe_gap_end=gap_end, pipe_spacing=spacing,
+                            pipe_spacing_end=spacing_end, difficulty_ramp=ramp)
+        body = zlib.decompress(data[_HEADER.size + _CONFIG.size:])
+
+        replay = cls(seed, config, num_hands)
+        replay.ticks = ticks
+        replay.score = score
+        nbytes = (ticks + 7) // 8
+        replay.flaps = bytearray(body[:nbytes])
+        replay.angles = array('f')
+        replay.angles.frombytes(body[nbytes:])
+        if sys.byteorder == 'big':
+            replay.angles.byteswap()
+        return replay
+
+
+def simulate(replay):
+    """
+    Mô phỏng lại replay không màn hình với tốc độ tối đa, trả về GameState cuối
+    """
+    state = GameState(replay.config, seed=replay.seed)
+    for tick in range(replay.ticks):
+        step(state, replay.flap_at(tick))
+    return state
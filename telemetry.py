@@ -0,0 +1,342 @@
+"""
+Lưu thống kê các ván chơi vào file SQLite cục bộ.
+
+Vòng lặp game chỉ cộng dồn số liệu vào đối tượng Session (không I/O, không
+khóa): mỗi giây một dòng tổng hợp (số frame vẽ, số bước mô phỏng, thời gian
+frame trung bình / lớn nhất, số lần vỗ cánh, điểm) và histogram thời gian frame
+của cả ván. Các dòng được đưa vào bộ đệm trong bộ nhớ; luồng nền của
+TelemetryStore ghi chúng theo lô (một transaction mỗi lần flush) vào SQLite ở
+chế độ WAL. sqlite3 cũng chỉ được import trong luồng nền. Nếu không mở được
+file, lỗi được lưu trong error, luồng nền dừng và các dòng sau đó bị bỏ qua.
+
+Các bảng:
+    sessions   : mỗi ván của mỗi người chơi (điểm, thời gian, backend điều khiển, ...)
+    seconds    : tổng hợp theo từng giây của ván
+    frame_hist : histogram thời gian frame (ô 1 ms) của ván
+
+Xem lại:
+    python telemetry.py scores --limit 10
+    python telemetry.py frames --last 5
+    python telemetry.py sessions
+"""
+
+# Import các thư viện cần thiết
+import os  # Kiểm tra file cơ sở dữ liệu
+import time  # Thời điểm bắt đầu / kết thúc ván
+import uuid  # Mã ván tạo ngay ở luồng game
+import argparse  # Đọc tham số dòng lệnh
+import threading  # Luồng nền ghi SQLite
+from collections import deque  # Bộ đệm dòng chờ ghi (append an toàn giữa các luồng)
+
+DEFAULT_PATH = 'telemetry.db'  # File SQLite mặc định
+HIST_BUCKETS = 100  # Số ô histogram thời gian frame (1 ms mỗi ô, ô cuối gồm mọi frame chậm hơn)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    started REAL, ended REAL, duration REAL,
+    score INTEGER, input TEXT, players INTEGER, player INTEGER, seed INTEGER,
+    steps INTEGER, frames INTEGER, flaps INTEGER, gesture_flaps INTEGER,
+    crash TEXT
+);
+CREATE TABLE IF NOT EXISTS seconds (
+    session TEXT, second INTEGER, frames INTEGER, steps INTEGER,
+    frame_ms_mean REAL, frame_ms_max REAL, flaps INTEGER, points INTEGER
+);
+CREATE TABLE IF NOT EXISTS frame_hist (
+    session TEXT, bucket INTEGER, count INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_score ON sessions(score DESC);
+CREATE INDEX IF NOT EXISTS seconds_session ON seconds(session);
+CREATE INDEX IF NOT EXISTS frame_hist_session ON frame_hist(session);
+"""
+
+INSERTS = {
+    'sessions': "INSERT OR REPLACE INTO sessions VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+    'seconds': "INSERT INTO seconds VALUES (?,?,?,?,?,?,?,?)",
+    'frame_hist': "INSERT INTO frame_hist VALUES (?,?,?)",
+}
+
+
+# Lớp Session - số liệu của một ván, cộng dồn trong luồng game
+class Session:
+    """
+    Chỉ có phép cộng và so sánh trong mỗi frame; dòng tổng hợp của một giây
+    được đưa vào bộ đệm của store khi sang giây mới.
+    """
+
+    def __init__(self, store, input_name, seed=None, players=1, player=0):
+        self.store = store
+        self.id = uuid.uuid4().hex
+        self.input = input_name
+        self.seed = seed
+        self.players = players
+        self.player = player
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.ended = False
+        # Tổng của cả ván
+        self.steps = 0
+        self.frames = 0
+        self.flaps = 0
+        self.gesture_flaps = 0
+        self.points = 0
+        self.hist = [0] * HIST_BUCKETS
+        # Tổng của giây hiện tại
+        self._second = 0
+        self._frames = 0
+        self._steps = 0
+        self._frame_sum = 0.0
+        self._frame_max = 0.0
+        self._flaps = 0
+        self._points = 0
+
+    def frame(self, dt, now=None):
+        """
+        Một khung hình đã vẽ, dt là thời gian (giây) từ khung hình trước
+        """
+        self._roll(now)
+        ms = dt * 1000
+        self.frames += 1
+        self.hist[min(int(ms), HIST_BUCKETS - 1)] += 1
+        self._frames += 1
+        self._frame_sum += ms
+        if ms > self._frame_max:
+            self._frame_max = ms
+
+    def step(self, flap=False, point=False, gesture=False):
+        """
+        Một bước mô phỏng: có vỗ cánh (gesture=True nếu do cử chỉ tay) / ghi điểm không
+        """
+        self.steps += 1
+        self._steps += 1
+        if flap:
+            self.flaps += 1
+            self._flaps += 1
+            if gesture:
+                self.gesture_flaps += 1
+        if point:
+            self.points += 1
+            self._points += 1
+
+    def _roll(self, now=None):
+        """
+        Sang giây mới thì đưa dòng tổng hợp của giây trước vào bộ đệm
+        """
+        second = int((now if now is not None else time.perf_counter()) - self._t0)
+        if second != self._second:
+            self._push_second()
+            self._second = second
+
+    def _push_second(self):
+        if self._frames or self._steps:
+            mean = self._frame_sum / self._frames if self._frames else 0.0
+            self.store.put('seconds', (self.id, self._second, self._frames, self._steps,
+                                       round(mean, 3), round(self._frame_max, 3), self._flaps, self._points))
+        self._frames = self._steps = self._flaps = self._points = 0
+        self._frame_sum = self._frame_max = 0.0
+
+    def end(self, score=None, crash=None):
+        """
+        Kết thúc ván: đưa giây cuối, histogram và dòng sessions vào bộ đệm.
+        score mặc định là số điểm đã ghi qua step(); crash là loại va chạm
+        """
+        if self.ended:
+            return
+        self.ended = True
+        self._push_second()
+        for bucket, count in enumerate(self.hist):
+            if count:
+                self.store.put('frame_hist', (self.id, bucket, count))
+        ended = time.time()
+        score = self.points if score is None else score
+        self.store.put('sessions', (self.id, self.started, ended, round(ended - self.started, 3),
+                                    score, self.input, self.players, self.player, self.seed,
+                                    self.steps, self.frames, self.flaps, self.gesture_flaps, crash))
+        self.store.sessions.discard(self)
+
+
+# Lớp TelemetryStore - bộ đệm trong bộ nhớ và luồng nền ghi SQLite theo lô
+class TelemetryStore:
+    def __init__(self, path=DEFAULT_PATH, flush_interval=2.0):
+        self.path = path
+        self.flush_interval = flush_interval  # Số giây tối đa một dòng nằm trong bộ đệm
+        self.sessions = set()  # Các ván chưa kết thúc (kết thúc khi đóng store)
+        self.error = None  # Lỗi ghi SQLite gần nhất (telemetry không được làm hỏng game)
+        self._dead = False  # True khi luồng nền đã dừng: không ai lấy dòng khỏi bộ đệm
+        self._buffer = deque()  # (bảng, dòng) chờ ghi
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self._thread.start()
+
+    def begin(self, input_name, seed=None, players=1, player=0):
+        """
+        Bắt đầu ghi một ván mới, trả về Session
+        """
+        session = Session(self, input_name, seed, players, player)
+        self.sessions.add(session)
+        return session
+
+    def put(self, table, row):
+        """
+        Đưa một dòng vào bộ đệm (không chờ I/O); bỏ qua khi luồng nền đã dừng
+        """
+        if self._dead:
+            return  # Không giữ dòng trong bộ nhớ khi không còn luồng ghi
+        self._buffer.append((table, row))
+
+    def flush(self):
+        """
+        Yêu cầu luồng nền ghi bộ đệm ngay (không chờ ghi xong)
+        """
+        self._wake.set()
+
+    def close(self, timeout=2.0):
+        """
+        Kết thúc các ván còn dở, ghi nốt bộ đệm rồi dừng luồng nền
+        """
+        for session in list(self.sessions):
+            session.end(crash='quit')
+        self._stop = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            self._dead = True
+            self._buffer.clear()
+
+    def _loop(self):
+        import sqlite3  # Chỉ import khi luồng nền chạy
+        try:
+            db = sqlite3.connect(self.path)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')  # Đủ an toàn với WAL, không fsync mỗi commit
+            db.executescript(SCHEMA)
+        except sqlite3.Error as err:
+            self.error = err
+            print(f"[TELEMETRY] Không mở được {self.path}: {err}")
+            return
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stop = self._stop
+            self._write(db)
+            if stop:
+                break
+        db.close()
+
+    def _write(self, db):
+        """
+        Lấy hết bộ đệm và ghi trong một transaction
+        """
+        rows = {}
+        buffer = self._buffer
+        while buffer:
+            table, row = buffer.popleft()
+            rows.setdefault(table, []).append(row)
+        if not rows:
+            return
+        try:
+            with db:
+                for table, values in rows.items():
+                    db.executemany(INSERTS[table], values)
+        except Exception as err:
+            self.error = err
+            print(f"[TELEMETRY] Lỗi ghi {self.path}: {err}")
+
+
+# ---------------------------------------------------------------------------
+# CLI truy vấn
+# ---------------------------------------------------------------------------
+
+def connect(path):
+    import sqlite3
+    if not os.path.exists(path):
+        raise SystemExit(f"Chưa có dữ liệu telemetry: {path}")
+    return sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+
+
+def show_scores(db, args):
+    """
+    Điểm cao nhất (có thể lọc theo backend điều khiển)
+    """
+    query = "SELECT score, input, duration, flaps, started FROM sessions WHERE score IS NOT NULL"
+    params = []
+    if args.input:
+        query += " AND input = ?"
+        params.append(args.input)
+    query += " ORDER BY score DESC, duration LIMIT ?"
+    params.append(args.limit)
+    print(f"{'#':>3} {'điểm':>6} {'input':<10} {'thời gian':>10} {'vỗ cánh':>8}  ngày")
+    for rank, (score, input_name, duration, flaps, started) in enumerate(db.execute(query, params), 1):
+        day = time.strftime('%Y-%m-%d %H:%M', time.localtime(started))
+        print(f"{rank:>3} {score:>6} {input_name or '-':<10} {duration:>9.1f}s {flaps:>8}  {day}")
+
+
+def show_frames(db, args):
+    """
+    Histogram thời gian frame của các ván gần nhất (hoặc một ván)
+    """
+    if args.session:
+        sessions = [row[0] for row in db.execute("SELECT id FROM sessions WHERE id LIKE ?", (args.session + '%',))]
+    else:
+        sessions = [row[0] for row in db.execute(
+            "SELECT id FROM sessions ORDER BY started DESC LIMIT ?", (args.last,))]
+    if not sessions:
+        print("Chưa có ván nào")
+        return
+    marks = ','.join('?' * len(sessions))
+    hist = dict(db.execute(f"SELECT bucket, SUM(count) FROM frame_hist WHERE session IN ({marks}) "
+                           "GROUP BY bucket ORDER BY bucket", sessions).fetchall())
+    total = sum(hist.values())
+    if not total:
+        print("Chưa có frame nào")
+        return
+    print(f"{len(sessions)} ván, {total} frame")
+    peak = max(hist.values())
+    cumulative = 0
+    for bucket in range(min(hist), max(hist) + 1):
+        count = hist.get(bucket, 0)
+        cumulative += count
+        label = f">={bucket}" if bucket == HIST_BUCKETS - 1 else f"{bucket}-{bucket + 1}"
+        bar = '#' * round(40 * count / peak)
+        print(f"{label:>7} ms {count:>8} {cumulative / total:7.1%} {bar}")
+
+
+def show_sessions(db, args):
+    """
+    Các ván gần nhất
+    """
+    print(f"{'ván':<12} {'ngày':<16} {'input':<10} {'điểm':>5} {'giây':>7} {'frame':>7} {'bước':>7} {'vỗ':>5} {'tay':>5}  kết thúc")
+    for row in db.execute("SELECT id, started, input, score, duration, frames, steps, flaps, gesture_flaps, crash "
+                          "FROM sessions ORDER BY started DESC LIMIT ?", (args.last,)):
+        sid, started, input_name, score, duration, frames, steps, flaps, gesture_flaps, crash = row
+        day = time.strftime('%Y-%m-%d %H:%M', time.localtime(started))
+        score = '-' if score is None else score
+        print(f"{sid[:12]:<12} {day:<16} {input_name or '-':<10} {score:>5} {duration:>7.1f} {frames:>7} "
+              f"{steps:>7} {flaps:>5} {gesture_flaps:>5}  {crash or '-'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Xem thống kê các ván chơi')
+    parser.add_argument('--db', default=DEFAULT_PATH, help='File SQLite telemetry')
+    commands = parser.add_subparsers(dest='command', required=True)
+    scores = commands.add_parser('scores', help='Điểm cao nhất')
+    scores.add_argument('--limit', type=int, default=10, help='Số dòng')
+    scores.add_argument('--input', help="Chỉ các ván dùng backend này (ví dụ 'mediapipe')")
+    frames = commands.add_parser('frames', help='Histogram thời gian frame')
+    frames.add_argument('--last', type=int, default=1, help='Gộp số ván gần nhất này')
+    frames.add_argument('--session', help='Mã (hoặc phần đầu mã) một ván, xem lệnh sessions')
+    sessions = commands.add_parser('sessions', help='Các ván gần nhất')
+    sessions.add_argument('--last', type=int, default=20, help='Số ván')
+    args = parser.parse_args()
+
+    db = connect(args.db)
+    try:
+        {'scores': show_scores, 'frames': show_frames, 'sessions': show_sessions}[args.command](db, args)
+    finally:
+        db.close()
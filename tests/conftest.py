@@ -0,0 +1,11 @@
+"""
+Cấu hình chung cho test: chạy không cần màn hình, loa, camera hay mediapipe.
+"""
+
+# Import các thư viện cần thiết
+import os  # Biến môi trường của SDL
+import sys  # Đường dẫn import các module ở thư mục gốc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # pygame không mở cửa sổ
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')  # pygame không mở thiết bị âm thanh
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,118 @@
+"""
+Test AudioEngine với mixer giả: giới hạn tần suất, kênh dành riêng, luồng đã dừng.
+"""
+
+import time
+
+import pygame
+import pytest
+
+import audio
+from audio import AudioEngine, CHANNELS
+
+
+# Lớp FakeMixer - thay các hàm pygame.mixer mà AudioEngine dùng, ghi lại lần phát trên từng kênh
+class FakeMixer:
+    def __init__(self, num_channels=8, fail=False):
+        self.num_channels = num_channels
+        self.reserved = None
+        self.fail = fail  # True: set_reserved báo lỗi như khi mixer không khởi tạo được
+        self.plays = []  # (chỉ số kênh, âm thanh)
+
+    def get_num_channels(self):
+        return self.num_channels
+
+    def set_num_channels(self, count):
+        self.num_channels = count
+
+    def set_reserved(self, count):
+        if self.fail:
+            raise pygame.error('mixer not initialized')
+        self.reserved = count
+
+    def Channel(self, index):
+        mixer = self
+
+        # Lớp FakeChannel - kênh giả chỉ ghi lại âm thanh được phát
+        class FakeChannel:
+            def play(self, sound):
+                mixer.plays.append((index, sound))
+
+        return FakeChannel()
+
+
+def install(monkeypatch, fake):
+    for name in ('get_num_channels', 'set_num_channels', 'set_reserved', 'Channel'):
+        monkeypatch.setattr(audio.pygame.mixer, name, getattr(fake, name))
+    return fake
+
+
+@pytest.fixture
+def mixer(monkeypatch):
+    return install(monkeypatch, FakeMixer())
+
+
+SOUNDS = {name: f'<{name}>' for name in CHANNELS}
+
+
+def run_events(engine, events):
+    """
+    Đưa thẳng (tên, thời điểm) vào hàng đợi để khoảng cách giữa các sự kiện
+    không phụ thuộc tốc độ máy, rồi dừng luồng
+    """
+    now = time.perf_counter()
+    for name, dt in events:
+        engine._queue.put_nowait((name, now + dt))
+    engine.close()
+    assert not engine._thread.is_alive()
+
+
+def test_reserved_channel_routing(mixer):
+    engine = AudioEngine(SOUNDS)
+    run_events(engine, [('point', 0.0), ('hit', 0.0), ('die', 0.0), ('swoosh', 0.0)])
+    reserved = sum(count for count, _ in CHANNELS.values())
+    assert mixer.num_channels >= reserved and mixer.reserved == reserved
+    # Kênh 0-1 cho wing, sau đó mỗi loại một kênh theo thứ tự CHANNELS
+    assert mixer.plays == [(2, '<point>'), (3, '<hit>'), (4, '<die>'), (5, '<swoosh>')]
+    assert engine.played == 4 and engine.dropped == 0
+
+
+def test_wing_alternates_channels(mixer):
+    engine = AudioEngine(SOUNDS)
+    run_events(engine, [('wing', 0.0), ('wing', 0.07), ('wing', 0.14)])
+    assert mixer.plays == [(0, '<wing>'), (1, '<wing>'), (0, '<wing>')]
+
+
+def test_rate_limit_per_sound(mixer):
+    engine = AudioEngine(SOUNDS)
+    interval = CHANNELS['wing'][1]
+    run_events(engine, [('wing', 0.0), ('wing', interval / 2),  # Quá sớm: bỏ qua
+                        ('point', interval / 2),  # Loại khác không bị giới hạn bởi wing
+                        ('wing', interval + 0.001)])
+    assert mixer.plays == [(0, '<wing>'), (2, '<point>'), (1, '<wing>')]
+    assert engine.played == 3 and engine.dropped == 1
+
+
+def test_stale_event_dropped(mixer):
+    engine = AudioEngine(SOUNDS)
+    run_events(engine, [('point', -1.0)])  # Chờ lâu hơn MAX_DELAY
+    assert mixer.plays == [] and engine.dropped == 1
+
+
+def test_missing_sound_skipped(mixer):
+    engine = AudioEngine({'point': '<point>'})
+    run_events(engine, [('wing', 0.0), ('point', 0.0)])
+    assert mixer.plays == [(2, '<point>')]
+
+
+def test_play_after_thread_died(monkeypatch):
+    fake = install(monkeypatch, FakeMixer(fail=True))
+    engine = AudioEngine(SOUNDS)
+    engine._thread.join(1.0)
+    assert engine._dead
+    for _ in range(1000):
+        engine.play('wing')
+    assert engine.dropped == 1000
+    assert engine._queue.empty()  # Không tích lũy sự kiện khi không còn luồng đọc
+    engine.close()  # Không chặn khi luồng đã dừng
+    assert fake.plays == []
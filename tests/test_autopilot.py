@@ -0,0 +1,58 @@
+"""
+Test autopilot.Autopilot: chim tự chơi sống sót trên nhiều seed, kể cả màn có độ khó tăng dần.
+"""
+
+# Import các thư viện cần thiết
+import pytest  # Chạy test
+
+from game_engine import GameConfig, GameState, step
+from level import LevelGenerator
+from autopilot import Autopilot
+
+# Màn tăng độ khó vẫn còn vượt qua được (khe 170 -> 155, khoảng cách 144.5 -> 125)
+RAMP = dict(pipe_gap_end=155, pipe_spacing_end=125, difficulty_ramp=30)
+
+
+def play(config, seed, frames, pilot=None):
+    """
+    Cho autopilot chơi một ván tối đa frames bước, trả về GameState cuối
+    """
+    pilot = pilot or Autopilot(config)
+    state = GameState(config, seed=seed)
+    while not state.crashed and state.frame < frames:
+        step(state, pilot(state))
+    return state
+
+
+@pytest.mark.parametrize('kwargs', [{}, RAMP], ids=['default', 'ramp'])
+def test_survives_many_seeds(kwargs):
+    config = GameConfig(**kwargs)
+    pilot = Autopilot(config)  # Dùng chung cho nhiều ván như chế độ nhiều người chơi
+    for seed in range(8):
+        state = play(config, seed, 3000, pilot)
+        assert not state.crashed, (seed, state.frame, state.collision)
+
+
+@pytest.mark.parametrize('seed, frames', [(5, 6000), (11, 15500)])
+def test_survives_past_former_crashes(seed, frames):
+    # Trước đây chim chạm ống trên ở frame 5085 (seed 5) và 15200 (seed 11)
+    state = play(GameConfig(), seed, frames)
+    assert not state.crashed, (state.frame, state.collision)
+
+
+def test_impossible_course_survives_longest():
+    # Khe 95 với các ống lệch nhau tới 286 điểm ảnh: không dãy vỗ cánh nào sống
+    # qua frame 1184 (seed 0, tìm vét cạn); greedy_policy chết ở frame 140,
+    # autopilot phải đi gần tới giới hạn đó
+    config = GameConfig(pipe_gap=150, pipe_gap_end=95, pipe_spacing=160, pipe_spacing_end=110,
+                        difficulty_ramp=40)
+    state = play(config, 0, 3000)
+    assert state.crashed
+    assert state.frame >= 1100 and state.score >= 28, (state.frame, state.score)
+
+
+def test_peek_keeps_course():
+    config = GameConfig(**RAMP)
+    level, peeked = LevelGenerator(config, seed=3, chunk=4), LevelGenerator(config, seed=3, chunk=4)
+    ahead = peeked.peek(10)  # Vượt qua nhiều khối
+    assert ahead == [next(peeked) for _ in range(10)] == [next(level) for _ in range(10)]
@@ -0,0 +1,95 @@
+"""
+Test batch_game: BatchGame một ván trùng với game_engine.step() khi dùng cùng dãy ống.
+"""
+
+import random
+import numpy as np
+
+from game_engine import GameConfig, GameState, EVENT_POINT, step, greedy_policy
+from batch_game import BatchGame, greedy_policy as batch_policy, run_batch
+
+
+# Lớp SameCourse - rng cho BatchGame lấy số giống LevelGenerator(seed)
+class SameCourse:
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def integers(self, low, high, size=None):
+        highs = np.broadcast_to(high, np.shape(high) if size is None else (size,))
+        return np.array([self.random.randrange(low, int(h)) for h in highs])
+
+
+def batch_like(config, seed):
+    batch = BatchGame(1, config)
+    batch.rng = SameCourse(seed)
+    batch.reset()
+    return batch
+
+
+def compare(config, seed, frames):
+    state = GameState(config, seed=seed)
+    batch = batch_like(config, seed)
+    while not state.crashed and state.frame < frames:
+        flap = greedy_policy(state)
+        events = step(state, flap)
+        scored = batch.step(np.array([flap]))
+        assert bool(scored[0]) == bool(events & EVENT_POINT)
+        assert batch.player_y[0] == state.player_y
+        assert batch.player_vel_y[0] == state.player_vel_y
+        assert batch.score[0] == state.score
+        assert bool(batch.alive[0]) != state.crashed
+    assert batch.frame[0] == state.frame
+    return state
+
+
+def test_matches_scalar_step():
+    config = GameConfig()
+    for seed in range(4):
+        assert compare(config, seed, 3000).score > 0
+
+
+def test_matches_scalar_crash():
+    config = GameConfig()
+    state = GameState(config, seed=1)
+    batch = batch_like(config, 1)
+    while not state.crashed:  # Không vỗ cánh: rơi xuống đất
+        step(state, False)
+        batch.step(False)
+    assert not batch.alive[0]
+    assert batch.frame[0] == state.frame
+    assert batch.player_y[0] == state.player_y
+
+
+
+def test_matches_scalar_with_ramp():
+    config = GameConfig(pipe_gap_end=150, pipe_spacing_end=130, difficulty_ramp=10)
+    compare(config, 2, 3000)
+
+
+def test_compact_keeps_games():
+    full = BatchGame(64, seed=4)
+    compacted = BatchGame(64, seed=4)
+    while np.count_nonzero(full.alive) > 20:
+        full.step(batch_policy(full))
+        compacted.step(batch_policy(compacted))
+    score, frame = compacted.compact()
+    dead = ~full.alive
+    assert (score == full.score[dead]).all() and (frame == full.frame[dead]).all()
+    assert compacted.n == np.count_nonzero(full.alive) and compacted.alive.all()
+    # Các ván còn lại chạy tiếp giống hệt (cùng thứ tự lấy số ngẫu nhiên)
+    while full.alive.any():
+        full.step(batch_policy(full))
+        compacted.step(batch_policy(compacted))
+    alive = ~dead
+    assert (compacted.score == full.score[alive]).all()
+    assert (compacted.frame == full.frame[alive]).all()
+
+
+def test_run_batch_totals():
+    batch = BatchGame(300, seed=2)
+    while batch.alive.any():
+        batch.step(batch_policy(batch))
+    stats = run_batch(300, seed=2)
+    assert stats['frames'] == batch.frame.sum()
+    assert stats['max_score'] == batch.score.max()
+    assert stats['mean_score'] == batch.score.mean()
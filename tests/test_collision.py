@@ -0,0 +1,78 @@
+"""
+Test collision: va chạm quét theo bước và tìm cửa sổ ống bằng chia đôi.
+"""
+
+import random
+
+from game_engine import GameConfig, PipeRing
+from collision import Collider, pipe_window, GROUND, UPPER_PIPE, LOWER_PIPE
+
+PX = 57  # Vị trí X của chim (int(screen_width/5))
+
+
+def ring(*pipes):
+    out = PipeRing(4)
+    for x, upper_y, lower_y in pipes:
+        out.push(x, upper_y, lower_y)
+    return out
+
+
+def gap_pipe(config, x, top, bottom):
+    """
+    Cặp ống tại x với khe [top, bottom] cho y của chim
+    """
+    return (x, top - config.pipe_height, bottom + config.player_height)
+
+
+def test_pipe_passing_within_one_step():
+    # Ống đi qua hết chim trong một bước: vị trí cuối không chồng lên ống
+    config = GameConfig()
+    config.pipe_vel_x = -100
+    pipes = ring(gap_pipe(config, PX + config.player_width + 1, 200, 300))
+    hit = Collider(config).check(PX, 100, 100, pipes)
+    assert hit.kind == UPPER_PIPE and hit.slot == 0
+    assert abs(hit.t - 0.01) < 1e-9
+    assert not Collider(config, swept=False).check(PX, 100, 100, pipes)
+
+
+def test_leaving_pipe_at_normal_speed():
+    # Đầu bước chim còn chồng lên ống 2 px, cuối bước ống đã ở phía sau
+    config = GameConfig()
+    pipes = ring(gap_pipe(config, PX + 2 - config.pipe_width, 200, 300))
+    hit = Collider(config).check(PX, 310, 315, pipes)
+    assert hit.kind == LOWER_PIPE and hit.t == 0.0
+    assert not Collider(config, swept=False).check(PX, 310, 315, pipes)
+
+
+def test_falling_out_of_gap_mid_step():
+    config = GameConfig()
+    pipes = ring(gap_pipe(config, PX, 200, 300))
+    hit = Collider(config).check(PX, 290, 299, pipes)
+    assert not hit  # Vẫn trong khe ở cuối bước
+    hit = Collider(config).check(PX, 290, 310, pipes)
+    assert hit.kind == LOWER_PIPE and abs(hit.t - 0.5) < 1e-9
+
+
+def test_ground():
+    config = GameConfig()
+    floor = config.ground_y - config.player_height - 1
+    hit = Collider(config).check(PX, floor - 5, floor + 5, ring())
+    assert hit.kind == GROUND and abs(hit.t - 0.5) < 1e-9
+
+
+def test_pipe_window_matches_scan():
+    rnd = random.Random(0)
+    width = 52
+    for _ in range(500):
+        pipes = PipeRing(6)
+        for _ in range(rnd.randrange(6)):  # Đẩy rồi xóa để head quay vòng
+            pipes.push(0.0, 0.0, 0.0)
+            pipes.pop_front()
+        x = rnd.uniform(-100, 100)
+        for _ in range(rnd.randrange(7)):
+            pipes.push(x, 0.0, 0.0)
+            x += rnd.choice((width, rnd.uniform(1, 200)))
+        left = rnd.uniform(-150, 400)
+        right = left + rnd.uniform(0, 100)
+        expected = tuple(i for i in pipes.live if pipes.x[i] + width > left and pipes.x[i] < right)
+        assert pipe_window(pipes, left, right, width) == expected
@@ -0,0 +1,66 @@
+"""
+Test game_engine: mô phỏng tất định theo seed, ring buffer ống.
+"""
+
+import pytest
+
+from game_engine import GameConfig, GameState, PipeRing, step, run_headless, greedy_policy
+
+
+def trajectory(config, seed, frames=600):
+    """
+    (y, vận tốc, điểm) của từng bước khi chơi bằng greedy_policy
+    """
+    state = GameState(config, seed=seed)
+    out = []
+    while not state.crashed and state.frame < frames:
+        step(state, greedy_policy(state))
+        out.append((state.player_y, state.player_vel_y, state.score))
+    return out
+
+
+def test_same_seed_same_game():
+    config = GameConfig()
+    assert trajectory(config, 7) == trajectory(config, 7)
+    assert trajectory(config, 7) != trajectory(config, 8)
+
+
+def test_run_headless_deterministic():
+    config = GameConfig()
+    keys = ('games', 'frames', 'mean_score', 'max_score')  # Bỏ thời gian chạy
+    first = run_headless(config, games=5, seed=3, max_frames=2000)
+    second = run_headless(config, games=5, seed=3, max_frames=2000)
+    assert [first[k] for k in keys] == [second[k] for k in keys]
+    assert first['frames'] > 0
+
+
+def ring_xs(ring):
+    return [ring.x[i] for i in ring]
+
+
+def test_pipe_ring_order_and_wrap():
+    ring = PipeRing(3)
+    for x in (10.0, 20.0, 30.0):
+        ring.push(x, x + 1, x + 2)
+    with pytest.raises(RuntimeError):
+        ring.push(40.0, 0.0, 0.0)
+    # Xóa đầu, thêm cuối nhiều vòng: head quay vòng qua mọi ô
+    for k in range(7):
+        ring.pop_front()
+        x = 40.0 + 10 * k
+        ring.push(x, x + 1, x + 2)
+        assert ring_xs(ring) == [x - 20, x - 10, x]
+        assert ring.front_x() == x - 20
+        assert [ring.upper_y[i] - ring.x[i] for i in ring] == [1.0] * 3
+    assert len(ring) == 3 and ring.live == tuple(ring)
+
+
+def test_pipe_ring_move_and_empty():
+    ring = PipeRing(4)
+    ring.push(100.0, 0.0, 0.0)
+    ring.push(200.0, 0.0, 0.0)
+    ring.move(-4)
+    assert ring_xs(ring) == [96.0, 196.0]
+    ring.pop_front()
+    ring.pop_front()
+    assert len(ring) == 0 and ring.live == ()
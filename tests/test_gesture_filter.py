@@ -0,0 +1,72 @@
+"""
+Test gesture_filter: ngưỡng kép, khoảng nghỉ và góc dự đoán.
+"""
+
+from gesture_filter import Calibration, Hysteresis, Refractory, GestureFilter
+
+
+def test_hysteresis_fires_once_until_low():
+    stage = Hysteresis(high=55.0, low=45.0)
+    fired = [stage(0.0, x) for x in (40, 56, 60, 50, 56, 45, 54, 56)]
+    # Chỉ kích hoạt lại sau khi xuống tới low (45), không phải khi dưới high
+    assert fired == [False, True, False, False, False, False, False, True]
+
+
+def test_single_threshold():
+    stage = Hysteresis(high=50.0, low=50.0)
+    assert [stage(0.0, x) for x in (51, 50, 51, 49, 51)] == [True, False, True, False, True]
+
+
+def test_refractory_period():
+    stage = Refractory(period=0.15)
+    times = (0.0, 0.1, 0.149, 0.15, 0.2, 0.31)
+    assert [stage(t, True) for t in times] == [True, False, False, True, False, True]
+    assert stage(1.0, False) is False
+
+
+def test_filter_refractory_across_hands():
+    gesture = GestureFilter(num_hands=2, smoothing='none', high=55.0, low=45.0, refractory=0.15)
+    assert gesture.update(0.00, (60.0, None))
+    assert not gesture.update(0.05, (40.0, None))
+    assert not gesture.update(0.10, (60.0, None))  # Vượt ngưỡng trong khoảng nghỉ
+    assert gesture.update(0.12, (40.0, 60.0))  # Mỗi tay có khoảng nghỉ riêng
+
+
+def test_baseline_defaults():
+    # Như mặc định của main.py: ngưỡng đơn 55 độ, không làm mượt, không khoảng nghỉ
+    gesture = GestureFilter(num_hands=1, smoothing='none', high=55, low=55, refractory=0)
+    assert [gesture.update(i / 100, (x,)) for i, x in enumerate((56, 54, 56, 56, 54, 56))] == \
+        [True, False, True, False, False, True]
+
+
+def test_predicted_never_flaps():
+    gesture = GestureFilter(num_hands=1, smoothing='one_euro', high=55.0, low=45.0, refractory=0.15)
+    assert not gesture.update(0.0, (40.0,))
+    assert not gesture.update(0.1, (80.0,), predicted=True)
+    assert not gesture.update(0.2, (80.0,), predicted=True)
+    # Góc dự đoán không làm thay đổi trạng thái ngưỡng: góc đo được kế tiếp vẫn kích hoạt
+    assert gesture.update(0.3, (80.0,))
+
+
+def test_predicted_keeps_threshold_and_refractory():
+    gesture = GestureFilter(num_hands=1, smoothing='none', high=55.0, low=45.0, refractory=0.15)
+    assert not gesture.update(0.0, (40.0,))
+    # Nếu đi qua ngưỡng kép và khoảng nghỉ, cú vỗ dự đoán ở 0.2 sẽ chặn cú vỗ thật ở 0.3
+    assert not gesture.update(0.2, (80.0,), predicted=True)
+    assert not gesture.update(0.25, (40.0,), predicted=True)
+    assert gesture.update(0.3, (80.0,))
+    # Đang giơ tay: góc dự đoán thấp không mở lại ngưỡng
+    assert not gesture.update(0.5, (30.0,), predicted=True)
+    assert not gesture.update(0.6, (80.0,))
+
+
+def test_predicted_keeps_calibration():
+    gesture = GestureFilter(num_hands=1, smoothing='none', calibrate=True, refractory=0)
+    chain = gesture.chains[0]
+    for k, x in enumerate((20.0, 60.0, 20.0, 60.0)):
+        gesture.update(k * 0.1, (x,))
+    before = [dict(vars(stage)) for stage in chain.stages]
+    assert any(isinstance(stage, Calibration) for stage in chain.stages)
+    for k, x in enumerate((-50.0, 170.0, -50.0)):
+        assert not gesture.update(1.0 + k * 0.1, (x,), predicted=True)
+    assert [vars(stage) for stage in chain.stages] == before
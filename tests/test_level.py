@@ -0,0 +1,59 @@
+"""
+Test level: màn chơi theo seed không phụ thuộc cách sinh theo khối.
+"""
+
+import datetime
+import itertools
+
+import pytest
+
+from game_engine import GameConfig, GameState, step
+from level import LevelGenerator, course, daily_seed, difficulty
+
+RAMP = GameConfig(pipe_gap_end=120, pipe_spacing_end=110, difficulty_ramp=50)
+
+
+@pytest.mark.parametrize('config', [GameConfig(), RAMP])
+def test_same_course_for_any_chunk(config):
+    expected = course(config, 7, 100)
+    for chunk in (1, 3, 32, 64):
+        level = LevelGenerator(config, 7, chunk=chunk)
+        assert list(itertools.islice(level, 100)) == expected
+    assert course(config, 8, 100) != expected
+
+
+def test_peek_then_next():
+    level = LevelGenerator(RAMP, 3, chunk=4)
+    ahead = level.peek(10)  # Vượt qua ranh giới khối
+    assert [next(level) for _ in range(10)] == ahead == course(RAMP, 3, 10)
+
+
+def test_difficulty_ramp():
+    pipes = course(RAMP, 1, 80)
+    gaps = [lower - upper - RAMP.pipe_height for _, upper, lower in pipes]
+    assert gaps[0] == pytest.approx(RAMP.pipe_gap)
+    assert gaps[50:] == pytest.approx([120] * 30)
+    assert [spacing for spacing, _, _ in pipes[50:]] == pytest.approx([110] * 30)
+    assert difficulty(RAMP, 25) == pytest.approx(((RAMP.pipe_gap + 120) / 2, (RAMP.pipe_spacing + 110) / 2))
+
+
+def test_game_uses_course():
+    config = GameConfig(god_mode=True)
+    state = GameState(config, seed=5)
+    pipes = state.pipes
+    spawned, last_x = [], float('-inf')
+    while state.frame < 1000:
+        if pipes.live:
+            tail = pipes.live[-1]
+            if pipes.x[tail] > last_x:  # Ống mới ở cuối ring (các ống khác chỉ dịch sang trái)
+                spawned.append((pipes.upper_y[tail], pipes.lower_y[tail]))
+            last_x = pipes.x[tail]
+        step(state, state.frame % 20 == 0)
+    assert len(spawned) > 10
+    assert spawned == [(upper, lower) for _, upper, lower in course(config, 5, len(spawned))]
+
+
+def test_daily_seed():
+    assert daily_seed(datetime.date(2024, 1, 31)) == 20240131
+    assert daily_seed(datetime.date(2025, 12, 1)) == 20251201
+    assert daily_seed() == daily_seed(datetime.date.today())
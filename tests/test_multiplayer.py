@@ -0,0 +1,131 @@
+"""
+Test multiplayer: khe kết quả trong shared memory và seqlock của từng hàng.
+"""
+
+import time
+import threading
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from gesture_pipeline import GesturePipeline
+from multiplayer import SharedSlots, SlotReader, SlotSink
+from utils_mediapipe_mock import MediaPipeHand as MockHand
+
+
+@pytest.fixture
+def slots():
+    slots = SharedSlots(2, num_hands=2)
+    yield slots
+    slots.close(unlink=True)
+
+
+def pipeline_for(slots, index, hand=None):
+    """
+    GesturePipeline (không chạy luồng) có sink ghi vào hàng index
+    """
+    sink = SlotSink(slots, index)
+    pipeline = GesturePipeline(None, hand, max_num_hands=2, preview='off', sink=sink)
+    sink.pipeline = pipeline
+    return pipeline
+
+
+def test_sink_to_reader(slots):
+    reader = SlotReader(slots, 1)
+    assert reader.latest() == (0, 0.0, (None, None), False)
+    pipeline = pipeline_for(slots, 1)
+    pipeline._publish(7, 12.5, (31.5, None))
+    assert reader.latest() == (7, 12.5, (31.5, None), False) == pipeline.latest()
+    assert not reader.using_mock
+    pipeline._publish(8, 12.6, (None, 44.0), predicted=True)
+    assert reader.latest() == (8, 12.6, (None, 44.0), True)
+    assert SlotReader(slots, 0).latest() == (0, 0.0, (None, None), False)  # Hàng khác không đổi
+
+
+def test_mock_column(slots):
+    pipeline = pipeline_for(slots, 0, hand=MockHand(max_num_hands=2))
+    pipeline._publish(1, 0.5, (10.0, 20.0))
+    assert SlotReader(slots, 0).using_mock
+    assert slots.read(0) == (1, 0.5, (10.0, 20.0), False, True)
+
+
+def test_integer_versions(slots):
+    assert slots.versions.dtype == np.int64 and slots.rows.dtype == np.float64
+    assert not np.shares_memory(slots.versions, slots.rows)
+    for k in range(3):
+        slots.write(0, k, 0.0, ())
+    assert list(slots.versions) == [6, 0]  # Mỗi lần ghi tăng 2, hàng khác không đổi
+    slots.versions[0] = 2 ** 53 + 2  # Vượt độ chính xác của float64
+    slots.write(0, 9, 1.0, (1.0, 2.0, 3.0))  # Góc thừa bị bỏ
+    assert slots.versions[0] == 2 ** 53 + 4
+    assert slots.read(0)[:3] == (9, 1.0, (1.0, 2.0))
+
+
+def read_in_thread(slots, index):
+    out = []
+    thread = threading.Thread(target=lambda: out.append(slots.read(index)), daemon=True)
+    thread.start()
+    return thread, out
+
+
+def test_read_waits_for_odd_version(slots):
+    slots.write(0, 1, 1.0, (10.0, 10.0))
+    # Người ghi dừng giữa chừng: version lẻ, hàng mới ghi một nửa
+    slots.versions[0] += 1
+    slots.rows[0, 0] = 2
+    thread, out = read_in_thread(slots, 0)
+    thread.join(0.05)
+    assert thread.is_alive() and not out  # Không trả về hàng đang ghi dở
+    slots.rows[0, 1] = 2.0
+    slots.versions[0] += 1
+    thread.join(5)
+    assert out == [(2, 2.0, (10.0, 10.0), False, False)]
+
+
+# Lớp ChangingVersions - version đổi giữa hai lần đọc (người ghi chen vào lúc sao chép hàng)
+class ChangingVersions:
+    def __init__(self, slots, values):
+        self.slots = slots
+        self.values = list(values)
+
+    def __getitem__(self, index):
+        value = self.values.pop(0)
+        if len(self.values) == 2:  # Lần đọc thứ hai: người ghi đã ghi xong hàng mới
+            self.slots.rows[index, 0] = 5
+        return value
+
+
+def test_read_retries_when_version_changes(slots):
+    slots.write(0, 4, 4.0, ())
+    versions, slots.versions = slots.versions, ChangingVersions(slots, [2, 4, 4, 4])
+    try:
+        assert slots.read(0)[0] == 5  # Lần đầu bị bỏ, đọc lại được hàng mới
+        assert slots.versions.values == []
+    finally:
+        slots.versions = versions
+
+
+def _writer(name, count, rounds):
+    slots = SharedSlots(count, 2, name=name)
+    for seq in range(1, rounds + 1):
+        slots.write(0, seq, float(seq), (float(seq), -float(seq)), seq % 2 == 0, seq % 3 == 0)
+    slots.close()
+
+
+def test_concurrent_reads_are_consistent(slots):
+    process = mp.get_context('spawn').Process(target=_writer, args=(slots.name, slots.count, 200000))
+    process.start()
+    deadline = time.monotonic() + 30
+    reads = last = 0
+    while process.is_alive() and time.monotonic() < deadline:
+        seq, t, angles, predicted, mock = slots.read(0)
+        # Mọi cột của một lần đọc thuộc cùng một lần ghi
+        assert (t, angles, predicted, mock) == (seq, (seq, -seq) if seq else (None, None),
+                                                seq > 0 and seq % 2 == 0, seq > 0 and seq % 3 == 0)
+        assert seq >= last
+        last = seq
+        reads += 1
+    process.join(5)
+    assert process.exitcode == 0 and reads > 0
+    assert slots.read(0)[0] == 200000
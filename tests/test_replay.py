@@ -0,0 +1,61 @@
+"""
+Test replay: ghi, lưu, đọc lại và mô phỏng lại một ván.
+"""
+
+import pytest
+
+from game_engine import GameConfig, GameState, step, greedy_policy
+from replay import Replay, simulate, MAGIC, VERSION, _HEADER
+
+
+def play(config, seed, frames=1500):
+    """
+    Chơi một ván bằng greedy_policy và ghi lại từng bước
+    """
+    state = GameState(config, seed=seed)
+    replay = Replay(seed, config, num_hands=2)
+    while not state.crashed and state.frame < frames:
+        flap = greedy_policy(state)
+        step(state, flap)
+        replay.record(flap, (0.5 if flap else None, 1.25))
+    replay.score = state.score
+    return state, replay
+
+
+def test_round_trip(tmp_path):
+    config = GameConfig(pipe_height=300, pipe_gap_end=150, difficulty_ramp=20)
+    state, replay = play(config, seed=42)
+    path = tmp_path / 'game.fbr'
+    replay.save(path)
+
+    loaded = Replay.load(path)
+    assert (loaded.seed, loaded.ticks, loaded.score, loaded.num_hands) == \
+        (42, replay.ticks, state.score, 2)
+    assert loaded.config.pipe_height == 300
+    assert loaded.config.pipe_gap_end == 150 and loaded.config.difficulty_ramp == 20
+    assert [loaded.flap_at(i) for i in range(loaded.ticks)] == \
+        [replay.flap_at(i) for i in range(replay.ticks)]
+    assert loaded.angles_at(0) == replay.angles_at(0)
+    assert loaded.angles_at(0)[1] == 1.25
+
+    final = simulate(loaded)
+    assert (final.frame, final.score, final.player_y, final.crashed) == \
+        (state.frame, state.score, state.player_y, state.crashed)
+
+
+def rewrite_header(path, magic=MAGIC, version=VERSION):
+    data = bytearray(path.read_bytes())
+    _, _, seed, ticks, score, num_hands = _HEADER.unpack_from(data, 0)
+    _HEADER.pack_into(data, 0, magic, version, seed, ticks, score, num_hands)
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize('header', [dict(version=VERSION - 1), dict(version=VERSION + 1),
+                                    dict(magic=b'XXXX')])
+def test_rejects_other_formats(tmp_path, header):
+    _, replay = play(GameConfig(), seed=0, frames=50)
+    path = tmp_path / 'game.fbr'
+    replay.save(path)
+    rewrite_header(path, **header)
+    with pytest.raises(ValueError):
+        Replay.load(path)
@@ -0,0 +1,79 @@
+"""
+Test telemetry: ghi ván chơi qua luồng nền vào SQLite.
+"""
+
+import sqlite3
+import time
+
+from telemetry import TelemetryStore, HIST_BUCKETS
+
+
+def query(path, sql):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute(sql).fetchall()
+    finally:
+        db.close()
+
+
+def test_session_rows(tmp_path):
+    path = str(tmp_path / 'telemetry.db')
+    store = TelemetryStore(path, flush_interval=60)
+    session = store.begin('keyboard', seed=7, players=2, player=1)
+    t0 = session._t0
+    for k in range(3):  # Ba frame trong giây 0, một frame trong giây 1
+        session.frame(0.016, now=t0 + 0.1 * k)
+        session.step(flap=k == 0, point=k == 2, gesture=True)
+    session.frame(0.5, now=t0 + 1.2)
+    session.step()
+    session.end(score=3, crash='upper')
+    store.close()
+    assert store.error is None
+
+    [row] = query(path, "SELECT input, seed, players, player, score, steps, frames, flaps, "
+                        "gesture_flaps, crash FROM sessions")
+    assert row == ('keyboard', 7, 2, 1, 3, 4, 4, 1, 1, 'upper')
+    assert query(path, "SELECT second, frames, steps, flaps, points FROM seconds ORDER BY second") == \
+        [(0, 3, 3, 1, 1), (1, 1, 1, 0, 0)]
+    assert query(path, "SELECT bucket, count FROM frame_hist ORDER BY bucket") == \
+        [(16, 3), (HIST_BUCKETS - 1, 1)]
+
+
+def test_flush_writes_before_interval(tmp_path):
+    path = str(tmp_path / 'telemetry.db')
+    store = TelemetryStore(path, flush_interval=60)
+    store.begin('mock').end(score=5)
+    store.flush()
+    deadline = time.monotonic() + 5
+    rows = []
+    while not rows and time.monotonic() < deadline:
+        time.sleep(0.01)
+        try:
+            rows = query(path, "SELECT score FROM sessions")
+        except sqlite3.OperationalError:  # Luồng nền chưa tạo bảng
+            pass
+    assert rows == [(5,)]
+    store.close()
+
+
+def test_close_ends_open_sessions(tmp_path):
+    path = str(tmp_path / 'telemetry.db')
+    store = TelemetryStore(path, flush_interval=60)
+    session = store.begin('mediapipe')
+    session.step(point=True)
+    store.close()
+    assert session.ended and not store.sessions
+    assert query(path, "SELECT score, crash FROM sessions") == [(1, 'quit')]
+
+
+def test_unwritable_path(tmp_path):
+    store = TelemetryStore(str(tmp_path / 'missing' / 'telemetry.db'), flush_interval=60)
+    store._thread.join(5)  # Luồng nền dừng ngay khi không mở được file
+    assert store.error is not None and store._dead
+    session = store.begin('keyboard')
+    for k in range(1000):  # Ván dài: không dòng nào được giữ lại trong bộ nhớ
+        session.frame(0.016, now=session._t0 + k)
+        session.step(flap=True)
+    session.end()
+    assert len(store._buffer) == 0
+    store.close()
@@ -0,0 +1,137 @@
+"""
+Test utils_mediapipe.HandGeometry: so với cách xử lý từng landmark ban đầu, vẽ khung xương.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils_mediapipe import HandGeometry
+
+WIDTH, HEIGHT = 640, 480
+
+# Chỉ số của góc khớp như trong vòng lặp gốc
+PARENT = [0,1,2,3,0,5,6,7,0,9,10,11,0,13,14,15,0,17,18,19]
+CHILD = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20]
+BONE_A = [0,1,2,4,5,6,8,9,10,12,13,14,16,17,18]
+BONE_B = [1,2,3,5,6,7,9,10,11,13,14,15,17,18,19]
+
+
+def fake_result(joints, labels):
+    """
+    Kết quả giống mediapipe.solutions.hands: landmark chuẩn hóa và nhãn tay
+    """
+    landmarks = [SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in joint])
+                 for joint in joints]
+    handedness = [SimpleNamespace(classification=[SimpleNamespace(label=label, score=0.9 - 0.1 * i)])
+                  for i, label in enumerate(labels)]
+    return SimpleNamespace(multi_hand_landmarks=landmarks, multi_handedness=handedness)
+
+
+def reference(result, max_num_hands, flip=False, roi=None):
+    """
+    Vòng lặp gốc trên từng landmark; flip lật ảnh trước khi xử lý, roi là vùng cắt đưa vào MediaPipe
+    """
+    out = []
+    for i, (res, hand) in enumerate(zip(result.multi_hand_landmarks, result.multi_handedness)):
+        if i > max_num_hands - 1:
+            break
+        keypt, joint = np.zeros((21, 2)), np.zeros((21, 3))
+        for j, lm in enumerate(res.landmark):
+            x, y, z = lm.x, lm.y, lm.z
+            if roi is not None:
+                x0, y0, x1, y1 = roi
+                x = (x0 + x * (x1 - x0)) / WIDTH
+                y = (y0 + y * (y1 - y0)) / HEIGHT
+                z = z * (x1 - x0) / WIDTH
+            if flip:
+                x = 1 - x
+            keypt[j] = x * WIDTH, y * HEIGHT
+            joint[j] = x, y, z
+        v = joint[CHILD] - joint[PARENT]
+        v = v / np.linalg.norm(v, axis=1)[:, np.newaxis]
+        angle = np.degrees(np.arccos(np.clip(np.einsum('nt,nt->n', v[BONE_A], v[BONE_B]), -1, 1)))
+        label = hand.classification[0].label
+        if flip:
+            label = 'Right' if label == 'Left' else 'Left'
+        out.append((label, hand.classification[0].score, keypt, joint, angle))
+    return out
+
+
+@pytest.mark.parametrize('flip', [False, True])
+@pytest.mark.parametrize('roi', [None, (100, 60, 420, 300)])
+@pytest.mark.parametrize('hands', [1, 2, 3])
+def test_result_to_param_matches_loop(flip, roi, hands):
+    rng = np.random.default_rng(hands)
+    joints = rng.uniform(0.05, 0.95, (hands, 21, 3)) * (1, 1, 0.2)
+    result = fake_result(joints, ['Left', 'Right', 'Left'][:hands])
+    geometry = HandGeometry(max_num_hands=2)
+    img = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    param = geometry.result_to_param(result, img, flip=flip, roi=roi)
+
+    expected = reference(result, 2, flip, roi)
+    assert len(expected) == min(hands, 2)
+    for p, (label, score, keypt, joint, angle) in zip(param, expected):
+        assert (p['class'], p['score']) == (label, score)
+        np.testing.assert_allclose(p['keypt'], keypt, rtol=1e-12, atol=1e-9)
+        np.testing.assert_allclose(p['joint'], joint, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(p['angle'], angle, rtol=1e-9, atol=1e-9)
+    for p in param[len(expected):]:
+        assert p['class'] is None
+
+
+def test_no_hands_resets_class():
+    geometry = HandGeometry(max_num_hands=2)
+    img = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    result = fake_result(np.random.default_rng(0).uniform(0, 1, (2, 21, 3)), ['Left', 'Right'])
+    geometry.result_to_param(result, img)
+    empty = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    assert [p['class'] for p in geometry.result_to_param(empty, img)] == [None, None]
+
+
+def drawn_hand(keypt):
+    geometry = HandGeometry(max_num_hands=1)
+    p = geometry.param[0]
+    p['class'], p['keypt'][:] = 'Right', keypt
+    p['angle'][:] = 0
+    img = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    return geometry.draw2d(img, geometry.param)
+
+
+def hand_keypoints():
+    """
+    Bàn tay mở trong ảnh: cổ tay ở dưới, mỗi ngón 4 khớp thẳng lên
+    """
+    keypt = np.zeros((21, 2))
+    keypt[0] = 320, 400
+    for f in range(5):
+        for k in range(4):
+            keypt[1 + f * 4 + k] = 200 + 60 * f, 330 - 50 * k
+    return keypt
+
+
+def test_draw2d_skips_segments_outside_image():
+    keypt = hand_keypoints()
+    keypt[8] = 2000, 180  # Đầu ngón trỏ ra ngoài bên phải ảnh
+    keypt[12] = 440, -500  # Đầu ngón giữa ra ngoài phía trên
+    img = drawn_hand(keypt)
+    # Không có đường kẻ từ khớp cuối còn trong ảnh (260, 230) và (320, 230) tới mép ảnh
+    assert not img[210:235, 460:].any()
+    assert not img[:150, :].any()
+    # Các đoạn còn lại của hai ngón vẫn được vẽ
+    assert img[250:270, 258:263].any() and img[250:270, 318:323].any()
+
+
+def test_draw2d_all_inside():
+    img = drawn_hand(hand_keypoints())
+    for f in range(5):  # Giữa khớp đầu và khớp cuối của mỗi ngón có nét vẽ
+        x = 200 + 60 * f
+        assert img[200:230, x - 2:x + 3].any()
+
+
+def test_visible_runs():
+    points = np.arange(10).reshape(5, 2)
+    runs = HandGeometry._visible_runs(points, np.array([True, True, False, True, True]))
+    assert [run.tolist() for run in runs] == [[[0, 1], [2, 3]], [[6, 7], [8, 9]]]
+    assert HandGeometry._visible_runs(points, np.array([False, True, False, True, False])) == []
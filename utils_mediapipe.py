@@ -1,45 +1,25 @@
 # Import các thư viện cần thiết
+import time  # Đo thời gian từng giai đoạn xử lý
 import cv2  # Thư viện xử lý hình ảnh
 import numpy as np  # Thư viện xử lý mảng số
-import mediapipe as mp  # Thư viện MediaPipe cho AI
 
-# Lớp MediaPipeHand - wrapper cho nhận diện tay của MediaPipe
-class MediaPipeHand:
-    def __init__(self, static_image_mode=True, max_num_hands=1):
-        # Gọi constructor của lớp cha
-        super(MediaPipeHand, self).__init__()
+# Lớp HandGeometry - tham số tay, góc khớp, khung xương và ROI từ landmark (chỉ cần NumPy/OpenCV)
+class HandGeometry:
+    def __init__(self, max_num_hands=1, inference_size=None, roi=False, roi_padding=0.3):
         # Số lượng tay tối đa để nhận diện
         self.max_num_hands = max_num_hands
-
-        # Truy cập MediaPipe Solutions Python API
-        mp_hands = mp.solutions.hands
-
-        # Khởi tạo MediaPipe Hands
-        # static_image_mode:
-        #   Cho xử lý video đặt thành False:
-        #   Sẽ sử dụng frame trước để định vị tay, giảm độ trễ
-        #   Cho hình ảnh không liên quan đặt thành True:
-        #   Cho phép nhận diện tay chạy trên mọi hình ảnh đầu vào
-        
-        # max_num_hands:
-        #   Số lượng tay tối đa để nhận diện
-        
-        # min_detection_confidence:
-        #   Giá trị confidence [0,1] từ model nhận diện tay
-        #   để việc nhận diện được coi là thành công
-        
-        # min_tracking_confidence:
-        #   Giá trị confidence tối thiểu [0,1] từ model theo dõi landmark
-        #   để landmark tay được coi là được theo dõi thành công,
-        #   nếu không thì nhận diện tay sẽ được gọi tự động ở frame tiếp theo.
-        #   Đặt cao hơn có thể tăng độ robust nhưng tăng độ trễ.
-        #   Bỏ qua nếu static_image_mode là true, khi đó nhận diện tay chạy trên mọi hình ảnh.
-
-        self.pipe = mp_hands.Hands(
-            static_image_mode=static_image_mode,
-            max_num_hands=max_num_hands,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5)
+        # Kích thước (rộng, cao) ảnh đưa vào MediaPipe; None = giữ nguyên kích thước camera
+        self.inference_size = inference_size
+        # Buffer cấp phát sẵn cho tiền xử lý (tránh tạo bản sao mới mỗi frame)
+        self._small = None  # Ảnh thu nhỏ (BGR)
+        self._rgb = None  # Ảnh RGB đưa vào MediaPipe
+        # Chế độ ROI: chỉ xử lý vùng quanh tay ở frame trước (có lề roi_padding x kích thước tay)
+        self.roi = roi
+        self.roi_padding = roi_padding
+        self._roi = None  # (x0, y0, x1, y1) pixel trên ảnh camera gốc; None = xử lý toàn ảnh
+        # Thời gian (giây) các giai đoạn của lần forward gần nhất: preprocess, inference, convert
+        self.timing = {}
+        self._t_prev = None  # Thời điểm xử lý frame trước (để tính fps)
 
         # Định nghĩa các tham số của tay
         self.param = []
@@ -79,60 +59,99 @@ class MediaPipeHand:
         self.color[:,[0,2]] = self.color[:,[2,0]] # Cho OpenCV BGR
         self.color = self.color.tolist()            
 
+        # Chỉ số khớp dùng để tính góc, tạo một lần thay vì mỗi lần gọi
+        self.joint_parent = np.array([0,1,2,3,0,5,6,7,0,9,10,11,0,13,14,15,0,17,18,19]) # Khớp parent
+        self.joint_child = np.arange(1, 21) # Khớp child
+        self.angle_a = np.array([0,1,2,4,5,6,8,9,10,12,13,14,16,17,18]) # Xương thứ nhất của mỗi góc
+        self.angle_b = self.angle_a + 1 # Xương thứ hai của mỗi góc
+
+        # Khung xương vẽ theo ngón: cổ tay -> 4 khớp của ngón, mỗi ngón một đường gấp khúc
+        self.fingers = [np.array([0, f*4+1, f*4+2, f*4+3, f*4+4]) for f in range(5)]
+        self.finger_color = [self.color[f*4+2] for f in range(5)] # Màu khớp giữa của ngón
 
-    def result_to_param(self, result, img):
+
+    def result_to_param(self, result, img, flip=False, roi=None):
         # Chuyển đổi kết quả tay MediaPipe thành tham số của riêng mình
+        # flip=True: lật ngang tọa độ landmark (tương đương lật ảnh trước khi xử lý)
+        # roi=(x0, y0, x1, y1): kết quả được tính trên vùng cắt này của img
         img_height, img_width, _ = img.shape
 
+        # Số frame xử lý mỗi giây (làm mượt)
+        t = time.perf_counter()
+        fps = self.param[0]['fps'] if self.param else -1
+        if self._t_prev is not None and t > self._t_prev:
+            fps = 1 / (t - self._t_prev) if fps <= 0 else 0.9 * fps + 0.1 / (t - self._t_prev)
+        self._t_prev = t
+
         # Reset tham số
         for p in self.param:
             p['class'] = None
+            p['fps'] = fps
 
         if result.multi_hand_landmarks is not None:
             # Duyệt qua các tay khác nhau
             for i, res in enumerate(result.multi_handedness):
                 if i>self.max_num_hands-1: break # Lưu ý: Cần kiểm tra nếu vượt quá số tay tối đa
-                self.param[i]['class'] = res.classification[0].label
+                label = res.classification[0].label
+                if flip:  # Ảnh lật ngang thì tay trái/phải cũng đổi chỗ
+                    label = 'Right' if label == 'Left' else 'Left'
+                self.param[i]['class'] = label
                 self.param[i]['score'] = res.classification[0].score
 
-            # Duyệt qua các tay khác nhau
-            for i, res in enumerate(result.multi_hand_landmarks):
-                if i>self.max_num_hands-1: break # Lưu ý: Cần kiểm tra nếu vượt quá số tay tối đa
-                # Duyệt qua 21 landmark cho mỗi tay
-                for j, lm in enumerate(res.landmark):
-                    self.param[i]['keypt'][j,0] = lm.x * img_width # Chuyển tọa độ chuẩn hóa thành pixel [0,1] -> [0,width]
-                    self.param[i]['keypt'][j,1] = lm.y * img_height # Chuyển tọa độ chuẩn hóa thành pixel [0,1] -> [0,height]
-
-                    self.param[i]['joint'][j,0] = lm.x
-                    self.param[i]['joint'][j,1] = lm.y
-                    self.param[i]['joint'][j,2] = lm.z
-
-                    # Bỏ qua https://github.com/google/mediapipe/issues/1320
-                    # self.param[i]['visible'][j] = lm.visibility
-                    # self.param[i]['presence'][j] = lm.presence
-
-                # Chuyển đổi khớp 3D tương đối thành góc
-                self.param[i]['angle'] = self.convert_3d_joint_to_angle(self.param[i]['joint'])
+            # Chuyển 21 landmark của tất cả các tay thành một mảng [số tay,21,3] trong một lần
+            # Lưu ý: Cần kiểm tra nếu vượt quá số tay tối đa
+            hands = result.multi_hand_landmarks[:self.max_num_hands]
+            joint = np.array([[(lm.x, lm.y, lm.z) for lm in res.landmark] for res in hands])
+            if roi is not None:
+                # Đổi tọa độ chuẩn hóa theo vùng cắt thành tọa độ chuẩn hóa theo ảnh gốc
+                x0, y0, x1, y1 = roi
+                joint *= ((x1-x0) / img_width, (y1-y0) / img_height, (x1-x0) / img_width)
+                joint[:,:,0] += x0 / img_width
+                joint[:,:,1] += y0 / img_height
+            if flip:
+                joint[:,:,0] = 1 - joint[:,:,0] # Lật ngang tọa độ chuẩn hóa
+            # Bỏ qua visibility/presence: https://github.com/google/mediapipe/issues/1320
+
+            # Chuyển đổi khớp 3D tương đối thành góc cho tất cả các tay cùng lúc
+            angle = self.convert_3d_joint_to_angle(joint) # [số tay,15]
+
+            for i in range(len(hands)):
+                self.param[i]['joint'][:] = joint[i]
+                # Chuyển tọa độ chuẩn hóa thành pixel [0,1] -> [0,width], [0,height]
+                np.multiply(joint[i,:,:2], (img_width, img_height), out=self.param[i]['keypt'])
+                self.param[i]['angle'] = angle[i]
 
         return self.param
 
 
     def convert_3d_joint_to_angle(self, joint):
+        # joint: [21,3] cho một tay, hoặc [...,21,3] cho nhiều tay / cả chuỗi frame đã ghi
         # Lấy vector hướng của xương từ parent đến child
-        v1 = joint[[0,1,2,3,0,5,6,7,0,9,10,11,0,13,14,15,0,17,18,19],:] # Khớp parent
-        v2 = joint[[1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20],:] # Khớp child
-        v = v2 - v1 # [20,3]
+        v = joint[...,self.joint_child,:] - joint[...,self.joint_parent,:] # [...,20,3]
         # Chuẩn hóa v
-        v = v/np.linalg.norm(v, axis=1)[:, np.newaxis]
+        v = v/np.linalg.norm(v, axis=-1, keepdims=True)
 
         # Lấy góc sử dụng arcos của tích vô hướng
-        angle = np.arccos(np.einsum('nt,nt->n',
-            v[[0,1,2,4,5,6,8,9,10,12,13,14,16,17,18],:], 
-            v[[1,2,3,5,6,7,9,10,11,13,14,15,17,18,19],:])) # [15,]
+        dot = np.einsum('...nt,...nt->...n', v[...,self.angle_a,:], v[...,self.angle_b,:])
+        angle = np.arccos(np.clip(dot, -1.0, 1.0)) # [...,15]
 
         return np.degrees(angle) # Chuyển radian thành độ
 
 
+    @staticmethod
+    def _visible_runs(points, visible):
+        # Tách đường gấp khúc thành các đoạn liên tiếp chỉ gồm điểm nằm trong ảnh
+        runs, start = [], None
+        for k, ok in enumerate(visible.tolist() + [False]):
+            if ok and start is None:
+                start = k
+            elif not ok and start is not None:
+                if k - start > 1:
+                    runs.append(points[start:k])
+                start = None
+        return runs
+
+
     def draw2d(self, img, param):
         # Lấy kích thước hình ảnh
         img_height, img_width, _ = img.shape
@@ -154,29 +173,30 @@ class MediaPipeHand:
                 cv2.putText(img, 'Góc TB %d độ' % (np.mean(p['angle'])), (x, y), 
                     cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,255), 2) # Đỏ
                 
-                # Duyệt qua điểm then chốt cho mỗi tay
-                for i in range(21):
-                    x = int(p['keypt'][i,0])
-                    y = int(p['keypt'][i,1])
-                    if x>0 and y>0 and x<img_width and y<img_height:
-                        # Vẽ khung xương
-                        start = p['keypt'][self.ktree[i],:]
-                        x_ = int(start[0])
-                        y_ = int(start[1])
-                        if x_>0 and y_>0 and x_<img_width and y_<img_height:
-                            cv2.line(img, (x_, y_), (x, y), self.color[i], 2) 
-
-                        # Vẽ điểm then chốt
-                        cv2.circle(img, (x, y), 5, self.color[i], -1)
-                        # cv2.circle(img, (x, y), 3, self.color[i], -1)
-
-                        # # Đánh số điểm then chốt
-                        # cv2.putText(img, '%d' % (i), (x, y), 
-                        #     cv2.FONT_HERSHEY_SIMPLEX, 1, self.color[i])
-
-                        # # Gắn nhãn tầm nhìn và sự hiện diện
-                        # cv2.putText(img, '%.1f, %.1f' % (p['visible'][i], p['presence'][i]),
-                        #     (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1, self.color[i])
+                # Điểm then chốt nằm trong ảnh (kiểm tra biên cho cả 21 điểm một lần)
+                keypt = p['keypt'].astype(np.int32)
+                inside = np.all((keypt > 0) & (keypt < (img_width, img_height)), axis=1)
+
+                # Vẽ khung xương: mỗi ngón một lệnh polylines, chỉ các đoạn có hai đầu nằm trong ảnh
+                for finger, color in zip(self.fingers, self.finger_color):
+                    visible = inside[finger]
+                    if visible.all():
+                        cv2.polylines(img, [keypt[finger]], False, color, 2)
+                    elif visible.any():
+                        cv2.polylines(img, self._visible_runs(keypt[finger], visible), False, color, 2)
+
+                # Vẽ điểm then chốt nằm trong ảnh
+                for i, (x, y) in zip(np.flatnonzero(inside).tolist(), keypt[inside].tolist()):
+                    cv2.circle(img, (x, y), 5, self.color[i], -1)
+                    # cv2.circle(img, (x, y), 3, self.color[i], -1)
+
+                    # # Đánh số điểm then chốt
+                    # cv2.putText(img, '%d' % (i), (x, y), 
+                    #     cv2.FONT_HERSHEY_SIMPLEX, 1, self.color[i])
+
+                    # # Gắn nhãn tầm nhìn và sự hiện diện
+                    # cv2.putText(img, '%.1f, %.1f' % (p['visible'][i], p['presence'][i]),
+                    #     (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1, self.color[i])
                 
                 # Gắn nhãn cử chỉ
                 if p['gesture'] is not None:
@@ -199,16 +219,114 @@ class MediaPipeHand:
         return img
 
 
-    def forward(self, img):
-        # Tiền xử lý hình ảnh
-        # img = cv2.flip(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), 1)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    def update_roi(self, img, param, flip=False):
+        # Cập nhật vùng ROI theo khung bao các điểm then chốt của tất cả các tay.
+        # Vùng chỉ đổi khi tay tới gần mép vùng cũ, để MediaPipe (chế độ video)
+        # tiếp tục theo dõi trên cùng một vùng cắt qua nhiều frame.
+        img_height, img_width, _ = img.shape
+        keypt = [p['keypt'] for p in param if p['class'] is not None]
+        if not keypt:
+            self._roi = None # Mất tay: frame sau xử lý toàn ảnh
+            return
+        keypt = np.concatenate(keypt)
+        x = img_width - keypt[:,0] if flip else keypt[:,0] # Về tọa độ ảnh chưa lật
+        bx0, bx1 = x.min(), x.max()
+        by0, by1 = keypt[:,1].min(), keypt[:,1].max()
+        pad = self.roi_padding * max(bx1-bx0, by1-by0)
+
+        if self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            margin = pad / 2
+            if bx0-margin >= x0 and by0-margin >= y0 and bx1+margin <= x1 and by1+margin <= y1:
+                return # Tay vẫn nằm gọn trong vùng cũ
+
+        # Kích thước làm tròn lên bội số 32 để buffer tiền xử lý ít phải cấp phát lại
+        w = min(img_width, int(np.ceil((bx1-bx0 + 2*pad) / 32)) * 32)
+        h = min(img_height, int(np.ceil((by1-by0 + 2*pad) / 32)) * 32)
+        x0 = int(np.clip((bx0+bx1)/2 - w/2, 0, img_width-w))
+        y0 = int(np.clip((by0+by1)/2 - h/2, 0, img_height-h))
+        if w == img_width and h == img_height:
+            self._roi = None # Vùng phủ cả ảnh: không cần cắt
+        else:
+            self._roi = (x0, y0, x0+w, y0+h)
+
+
+# Lớp MediaPipeHand - wrapper cho nhận diện tay của MediaPipe
+class MediaPipeHand(HandGeometry):
+    def __init__(self, static_image_mode=True, max_num_hands=1, inference_size=None, roi=False, roi_padding=0.3):
+        # Gọi constructor của lớp cha
+        super(MediaPipeHand, self).__init__(max_num_hands, inference_size, roi, roi_padding)
+
+        # Chỉ import MediaPipe khi tạo đối tượng: HandGeometry dùng được khi chưa cài MediaPipe
+        import mediapipe as mp  # Thư viện MediaPipe cho AI
+
+        # Truy cập MediaPipe Solutions Python API
+        mp_hands = mp.solutions.hands
+
+        # Khởi tạo MediaPipe Hands
+        # static_image_mode:
+        #   Cho xử lý video đặt thành False:
+        #   Sẽ sử dụng frame trước để định vị tay, giảm độ trễ
+        #   Cho hình ảnh không liên quan đặt thành True:
+        #   Cho phép nhận diện tay chạy trên mọi hình ảnh đầu vào
+        
+        # max_num_hands:
+        #   Số lượng tay tối đa để nhận diện
+        
+        # min_detection_confidence:
+        #   Giá trị confidence [0,1] từ model nhận diện tay
+        #   để việc nhận diện được coi là thành công
+        
+        # min_tracking_confidence:
+        #   Giá trị confidence tối thiểu [0,1] từ model theo dõi landmark
+        #   để landmark tay được coi là được theo dõi thành công,
+        #   nếu không thì nhận diện tay sẽ được gọi tự động ở frame tiếp theo.
+        #   Đặt cao hơn có thể tăng độ robust nhưng tăng độ trễ.
+        #   Bỏ qua nếu static_image_mode là true, khi đó nhận diện tay chạy trên mọi hình ảnh.
+
+        self.pipe = mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5)
+
+
+    def forward(self, img, flip=False):
+        # Tiền xử lý hình ảnh vào các buffer cấp phát sẵn (dst=) thay vì tạo bản sao mới
+        # flip=True: kết quả như khi lật ngang ảnh, nhưng chỉ lật tọa độ landmark
+        t0 = time.perf_counter()
+        roi = self._roi if self.roi else None
+        src = img
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            src = img[y0:y1, x0:x1] # Vùng cắt là view, không sao chép
+        elif self.inference_size is not None:
+            w, h = self.inference_size
+            if self._small is None or self._small.shape != (h, w, 3):
+                self._small = np.empty((h, w, 3), dtype=np.uint8)
+            src = cv2.resize(img, (w, h), dst=self._small, interpolation=cv2.INTER_AREA)
+        if self._rgb is None or self._rgb.shape != src.shape:
+            self._rgb = np.empty(src.shape, dtype=np.uint8)
+        rgb = cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._rgb)
+
+        t1 = time.perf_counter()
 
         # Trích xuất kết quả tay
-        result = self.pipe.process(img)
+        result = self.pipe.process(rgb)
+        t2 = time.perf_counter()
+        if roi is not None and result.multi_hand_landmarks is None:
+            # Tay ra khỏi vùng ROI: tìm lại trên toàn ảnh ngay trong frame này
+            self._roi = None
+            param = self.forward(img, flip)
+            self.timing['inference'] += t2 - t0 # Lần thử trên vùng ROI cũng tính vào suy luận
+            return param
 
         # Chuyển đổi kết quả tay thành tham số của riêng mình
-        param = self.result_to_param(result, img)
+        # (tọa độ pixel theo kích thước ảnh camera gốc, không phải ảnh thu nhỏ hay vùng cắt)
+        param = self.result_to_param(result, img, flip, roi)
+        if self.roi:
+            self.update_roi(img, param, flip)
+        self.timing = {'preprocess': t1 - t0, 'inference': t2 - t1, 'convert': time.perf_counter() - t2}
 
         return param
 
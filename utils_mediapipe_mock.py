@@ -4,7 +4,9 @@ import numpy as np  # Thư viện xử lý mảng số
 
 # Lớp MediaPipeHand mock - giả lập chức năng nhận diện tay
 class MediaPipeHand:
-    def __init__(self, static_image_mode=True, max_num_hands=1):
+    is_mock = True  # Góc tay là giả lập, không dùng để điều khiển
+
+    def __init__(self, static_image_mode=True, max_num_hands=1, inference_size=None, roi=False, roi_padding=0.3):
         # Gọi constructor của lớp cha
         super(MediaPipeHand, self).__init__()
         # Số lượng tay tối đa để nhận diện
@@ -25,7 +27,7 @@ class MediaPipeHand:
             }
             self.param.append(p)
 
-    def forward(self, img):
+    def forward(self, img, flip=False):
         """
         Hàm forward mock giả lập việc nhận diện tay
         Trả về các tham số tay mock tĩnh (không tự động vỗ cánh)
@@ -54,3 +56,35 @@ class MediaPipeHand:
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
         
         return img
+
+
+# Lớp ReplayHand - phát lại kết quả hand tracking đã ghi (gesture_bench.py)
+class ReplayHand(MediaPipeHand):
+    """
+    Mỗi lần gọi forward() trả về tham số tay của frame kế tiếp trong clip đã
+    ghi, bỏ qua ảnh đầu vào, nên chạy được trên máy không có camera và luôn
+    cho cùng một kết quả. Hết clip thì trả về "không có tay".
+    """
+
+    HANDEDNESS = (None, 'Left', 'Right')  # Mã trong hand.npy -> nhãn tay
+    is_mock = False  # Góc tay được ghi từ người chơi thật
+
+    def __init__(self, clip, max_num_hands=None):
+        # clip: dict các mảng 'hand' [T,tay], 'angle' [T,tay,15], 'joint' [T,tay,21,3], 'keypt' [T,tay,21,2]
+        num_hands = clip['hand'].shape[1]
+        super(ReplayHand, self).__init__(max_num_hands=max_num_hands or num_hands)
+        self.clip = clip
+        self.index = 0  # Frame tiếp theo sẽ trả về
+
+    def forward(self, img, flip=False):
+        # Kết quả trong clip đã được lật lúc ghi (forward(flip=True)), flip ở đây bị bỏ qua
+        i = self.index
+        self.index += 1
+        for h, p in enumerate(self.param):
+            code = self.clip['hand'][i, h] if i < len(self.clip['hand']) and h < self.clip['hand'].shape[1] else 0
+            p['class'] = self.HANDEDNESS[code]
+            if code:
+                p['angle'] = np.asarray(self.clip['angle'][i, h], dtype=np.float64)
+                p['joint'][:] = self.clip['joint'][i, h]
+                p['keypt'][:] = self.clip['keypt'][i, h]
+        return self.param